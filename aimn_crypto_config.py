@@ -20,7 +20,11 @@ SYMBOLS = [
 
 # Trading Parameters
 CAPITAL_PER_TRADE = 0.30  # 30% of capital per trade
-SCAN_INTERVAL = 30  # Seconds between scans
+SCAN_INTERVAL = 30  # Seconds between scans (when BAR_CLOSE_SCAN is off)
+BAR_CLOSE_SCAN = True  # Run each cycle when a new bar closes instead of every SCAN_INTERVAL
+BAR_SETTLE_SECONDS = 2.0  # Delay after the bar close before fetching it
+BAR_RETRY_SECONDS = 2.0  # Refetch interval for symbols whose bar is late
+BAR_MAX_WAIT_SECONDS = 20.0  # Stop waiting for a late bar this long after the close
 TIMEFRAME = '1Min'  # Bar timeframe for crypto
 
 # Risk Management Defaults
@@ -48,62 +52,56 @@ SYMBOL_CONFIGS = {
 # Symbol-Specific Parameters
 SYMBOL_PARAMS = {
     'BTC/USD': {
-        'rsi_period': 14,
         'rsi_oversold': 45,
         'rsi_overbought': 55,
         'macd_fast': 5,
         'macd_slow': 13,
         'macd_signal': 5,
-        'volume_ma_period': 20,
         'volume_threshold': 0.01,
         'atr_period': 14,
         'atr_threshold': 0.01,
-        'stop_loss': 2.0,
+        'stop_loss_percent': 2.0,
         'early_trail_start': 1.0,
         'early_trail_minus': 15.0,
         'peak_trail_start': 5.0,
         'peak_trail_minus': 0.5,
         'use_rsi_exit': True,
-        'rsi_exit_threshold': 1.0
+        'rsi_exit_min_profit': 1.0  # Min profit (%) for the RSI reversal exit
     },
     'ETH/USD': {
-        'rsi_period': 14,
         'rsi_oversold': 45,
         'rsi_overbought': 55,
         'macd_fast': 5,
         'macd_slow': 13,
         'macd_signal': 5,
-        'volume_ma_period': 20,
         'volume_threshold': 0.01,
         'atr_period': 14,
         'atr_threshold': 0.01,
-        'stop_loss': 2.5,
+        'stop_loss_percent': 2.5,
         'early_trail_start': 1.0,
         'early_trail_minus': 20.0,
         'peak_trail_start': 5.0,
         'peak_trail_minus': 0.7,
         'use_rsi_exit': True,
-        'rsi_exit_threshold': 1.0
+        'rsi_exit_min_profit': 1.0  # Min profit (%) for the RSI reversal exit
     },
     # Default parameters for other symbols
     'DEFAULT': {
-        'rsi_period': 14,
         'rsi_oversold': 45,
         'rsi_overbought': 55,
         'macd_fast': 5,
         'macd_slow': 13,
         'macd_signal': 5,
-        'volume_ma_period': 20,
         'volume_threshold': 0.01,
         'atr_period': 14,
         'atr_threshold': 0.01,
-        'stop_loss': DEFAULT_STOP_LOSS,
+        'stop_loss_percent': DEFAULT_STOP_LOSS,
         'early_trail_start': DEFAULT_EARLY_TRAIL_START,
         'early_trail_minus': DEFAULT_EARLY_TRAIL_MINUS,
         'peak_trail_start': DEFAULT_PEAK_TRAIL_START,
         'peak_trail_minus': DEFAULT_PEAK_TRAIL_MINUS,
         'use_rsi_exit': True,
-        'rsi_exit_threshold': 1.0
+        'rsi_exit_min_profit': 1.0  # Min profit (%) for the RSI reversal exit
     }
 }
 
@@ -119,9 +117,12 @@ LOG_FILE = 'aimn_crypto_trading.log'
 # Performance Tracking
 TRACK_PERFORMANCE = True
 PERFORMANCE_FILE = 'aimn_crypto_performance.csv'
+STORE_BARS = True  # Keep every fetched bar on disk for backtests (see bar_store)
+BAR_STORE_DIR = 'bar_store'  # Directory of the on-disk bar store
+SCAN_SNAPSHOT_FILE = 'aimn_scan_snapshot.json'  # Latest scan result, read by the dashboards
 
 # Volume Confirmation Settings
-VOLUME_CONFIRMATION = True  # Enable volume confirmation
+VOLUME_CONFIRMATION = True  # Enable volume confirmation (symbols without their own 'volume_confirmation')
 VOLUME_SETTINGS = {
     'min_volume_ratio': 0.5,  # Minimum volume vs average
     'spike_threshold': 2.0,   # Standard deviations for spike detection
@@ -137,7 +138,33 @@ SCORING_WEIGHTS = {
 
 # Additional Settings
 MAX_POSITIONS = 1  # Maximum concurrent positions
+ENTRY_CANDIDATES = 3  # Ranked candidates tried in turn when an entry order is rejected
 MIN_BARS_REQUIRED = 50  # Minimum bars needed for indicator calculation
+LOOKBACK_MARGIN = 10  # Extra bars fetched on top of the indicator lookback
+BATCH_FETCH = True  # Fetch all crypto (and all equity) bars in one multi-symbol request
+INCREMENTAL_FETCH = True  # Batched fetches: keep bars per symbol and request only newer ones
+BATCH_SCAN = True  # Compute indicators for all symbols in one vectorized pass
+SCAN_WORKERS = 0  # Worker processes for parallel scans (0 = serial)
+PARALLEL_SCAN_MIN_SYMBOLS = 50  # Smaller universes are always scanned serially
+PREFILTER_SCAN = True  # 'tail' mode: reject on volume/RSI/ATR before computing MACD and OBV
+ADAPTIVE_SCAN = True  # Scan near-trigger / volatile symbols more often than quiet ones
+CADENCE_MIN_INTERVAL = 60  # Seconds between scans of symbols at an RSI threshold or high ATR
+CADENCE_MAX_INTERVAL = 300  # Seconds between scans of the quietest symbols
+CADENCE_RSI_BAND = 15.0  # RSI points from a threshold at which a symbol counts as quiet
+SCAN_REQUEST_BUDGET = 60  # Symbol data requests per minute, across all symbols
+CONDITION_HISTORY_SCANS = 1440  # Scans of entry-condition bitmasks kept for diagnostics
+INDICATOR_CACHE_MB = 64  # Memory cap for cached indicator results
+INDICATOR_CACHE_COMPACT = False  # Store cached indicator frames as float32 (about half the memory); 'full' mode only, 'tail' caches latest-row dicts as is
+INDICATOR_MODE = 'tail'  # 'tail' (latest bar only), 'stream' (incremental) or 'full'
+CONFIRM_TIMEFRAME = None  # '5Min', '15Min', '1Hour' or '1Day': entries need MACD/RSI Real agreement on bars resampled from 1Min (None = off)
+
+# Tiered Universe Scanning
+TIERED_SCAN = False  # Scan a watchlist picked from every tradable asset instead of SYMBOLS only
+UNIVERSE_ASSET_CLASS = 'crypto'  # Alpaca asset class of the universe
+COARSE_SCAN_INTERVAL = 900  # Seconds between coarse scans of the universe
+COARSE_TIMEFRAME = '1Hour'  # Bars used by the coarse scan
+WATCHLIST_SIZE = 20  # Symbols promoted to the 30 second scan (SYMBOLS are always kept)
+MIN_DOLLAR_VOLUME = 0.0  # Minimum average close * volume over the last 20 coarse bars
 
 # Broker Settings
 ALPACA_RETRY_ATTEMPTS = 3
@@ -69,6 +69,11 @@ def load_trades():
 # Get data
 events, positions = parse_log()
 trades = load_trades()
+try:
+    from scan_snapshot import load_snapshot
+    snapshot = load_snapshot(getattr(config, 'SCAN_SNAPSHOT_FILE', 'aimn_scan_snapshot.json'))
+except Exception:
+    snapshot = None
 
 # Sidebar
 st.sidebar.header("⚙️ System Status")
@@ -99,7 +104,7 @@ with col4:
     st.metric("Active Positions", len(positions))
 
 # Tabs
-tab1, tab2, tab3 = st.tabs(["📊 Positions", "📈 Performance", "📰 Events"])
+tab1, tab2, tab3, tab4 = st.tabs(["📊 Positions", "📈 Performance", "📰 Events", "🔍 Signals"])
 
 with tab1:
     st.subheader("Active Positions")
@@ -140,6 +145,29 @@ with tab3:
         elif event_type == 'exit':
             st.warning(message)
 
+with tab4:
+    st.subheader("Latest Scan")
+    if snapshot:
+        st.caption(f"Scanned at {snapshot['time']}")
+        rows = []
+        for symbol, info in snapshot['summary'].items():
+            row = {'symbol': symbol, 'status': info['status']}
+            if info['status'] == 'ready':
+                row.update({
+                    'price': info['price'],
+                    'rsi': info['rsi'],
+                    'volume_ratio': info['volume_ratio'],
+                    'atr_ratio': info['atr_ratio'],
+                    'buy_ready': info['buy_ready'],
+                    'sell_ready': info['sell_ready'],
+                    'missing_buy': ', '.join(info['missing_buy']),
+                    'missing_sell': ', '.join(info['missing_sell']),
+                })
+            rows.append(row)
+        st.dataframe(pd.DataFrame(rows))
+    else:
+        st.info("No scan snapshot yet")
+
 # Auto refresh
 if st.sidebar.checkbox("Auto-refresh", value=True):
     import time
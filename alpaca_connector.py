@@ -3,17 +3,72 @@
 Fixed version that handles after-hours data properly
 """
 
+import math
 import pandas as pd
 import numpy as np
 from datetime import datetime, timedelta
 import alpaca_trade_api as tradeapi
-from typing import Optional, Dict
+from typing import Optional, Dict, List, Mapping
 import os
 from dotenv import load_dotenv
+from indicators import AIMnIndicators
+from bar_batch import split_bars
 
 # Load environment variables
 load_dotenv()
 
+# Bar length of each supported timeframe, in minutes
+TIMEFRAME_MINUTES = {
+    '1Min': 1,
+    '5Min': 5,
+    '15Min': 15,
+    '1Hour': 60,
+    '1Day': 1440
+}
+
+# Calendar days added to equity request windows (weekends, holidays)
+EQUITY_WINDOW_DAYS = 4
+
+# Request windows span this many times the bars' own trading time: thin
+# crypto pairs have minutes without a trade, so fewer bars than minutes
+WINDOW_FACTOR = 3
+
+# Regular equity session (extended-hours bars are not counted on)
+SESSION_MINUTES = 390
+
+# Times a lookback window is doubled for symbols that still got too few bars
+WINDOW_WIDENINGS = 2
+
+
+def lookback_window(bars: int, timeframe: str, crypto: bool) -> timedelta:
+    """
+    Calendar span of a request expected to return at least `bars` bars
+    
+    Crypto trades around the clock, so the span is WINDOW_FACTOR times the
+    bars' duration. Equities trade SESSION_MINUTES a day (one bar a day on
+    1Day) and five days a week, plus EQUITY_WINDOW_DAYS for holidays.
+    """
+    bar_minutes = TIMEFRAME_MINUTES.get(timeframe, 1)
+    if crypto:
+        return timedelta(minutes=bars * bar_minutes * WINDOW_FACTOR)
+    if bar_minutes >= TIMEFRAME_MINUTES['1Day']:
+        sessions = bars * bar_minutes // TIMEFRAME_MINUTES['1Day']
+    else:
+        sessions = math.ceil(bars * bar_minutes / SESSION_MINUTES)
+    return timedelta(days=math.ceil(sessions * WINDOW_FACTOR * 7 / 5) + EQUITY_WINDOW_DAYS)
+
+
+def alpaca_timeframe(timeframe: str):
+    """Alpaca TimeFrame for a timeframe name ('1Min', '5Min', '15Min', '1Hour', '1Day')"""
+    timeframe_map = {
+        '1Min': tradeapi.TimeFrame.Minute,
+        '5Min': tradeapi.TimeFrame(5, tradeapi.TimeFrameUnit.Minute),
+        '15Min': tradeapi.TimeFrame(15, tradeapi.TimeFrameUnit.Minute),
+        '1Hour': tradeapi.TimeFrame.Hour,
+        '1Day': tradeapi.TimeFrame.Day
+    }
+    return timeframe_map.get(timeframe, tradeapi.TimeFrame.Minute)
+
 
 class AlpacaConnector:
     """
@@ -30,6 +85,8 @@ class AlpacaConnector:
         # Get credentials from environment or config
         self.api_key = os.getenv('APCA_API_KEY_ID', 'your_api_key_here')
         self.secret_key = os.getenv('APCA_API_SECRET_KEY', 'your_secret_key_here')
+        # Optional AIMnBarResampler fed by get_latest_bars (see bar_resampler)
+        self.resampler = None
         # Use paper or live URL
         if paper_trading:
             self.base_url = 'https://paper-api.alpaca.markets'
@@ -75,21 +132,10 @@ class AlpacaConnector:
         print(f"   Bars requested: {limit}")
         
         try:
-            # Convert timeframe to Alpaca format
-            timeframe_map = {
-                '1Min': tradeapi.TimeFrame.Minute,
-                '5Min': tradeapi.TimeFrame(5, tradeapi.TimeFrameUnit.Minute),
-                '15Min': tradeapi.TimeFrame(15, tradeapi.TimeFrameUnit.Minute),
-                '1Hour': tradeapi.TimeFrame.Hour,
-                '1Day': tradeapi.TimeFrame.Day
-            }
-            
-            alpaca_timeframe = timeframe_map.get(timeframe, tradeapi.TimeFrame.Minute)
-            
             # Get bars without specifying start time - let Alpaca handle it
             bars = self.api.get_bars(
                 symbol,
-                alpaca_timeframe,
+                alpaca_timeframe(timeframe),
                 limit=limit,
                 adjustment='raw'  # Same as TradingView
             ).df
@@ -130,6 +176,84 @@ class AlpacaConnector:
             print(f"❌ Error fetching data: {e}")
             raise
             
+    def get_multi_bars(self, symbols: List[str], timeframe: str,
+                       limits: Mapping[str, int],
+                       start: Optional[datetime] = None) -> Dict[str, pd.DataFrame]:
+        """
+        Get bars for many symbols with one request per asset class
+        
+        Crypto symbols (containing '/') go to the crypto bar endpoint and
+        equities to the stock endpoint, each as one multi-symbol request
+        that the API pages through. The response is split per symbol in
+        one pass (see bar_batch.split_bars).
+        
+        Without start, the window is sized by lookback_window; symbols that
+        still return fewer than their limit (a very thin market) are asked
+        again over a doubled window, up to WINDOW_WIDENINGS times.
+        
+        Args:
+            symbols: Symbols to fetch
+            timeframe: '1Min', '5Min', '15Min', '1Hour', '1Day'
+            limits: Bars needed per symbol (the latest ones are kept)
+            start: Fetch bars from this time on instead of the lookback
+                window (incremental updates, see bar_buffer); naive times are UTC
+            
+        Returns:
+            {symbol: DataFrame with timestamp and OHLCV columns}; symbols
+            without bars are missing
+        """
+        end_time = datetime.utcnow()
+        if start is not None:
+            start = pd.Timestamp(start)
+            if start.tzinfo is not None:
+                start = start.tz_convert('UTC').tz_localize(None)
+        market_data = {}
+        
+        for crypto in (True, False):
+            pending = [symbol for symbol in symbols if ('/' in symbol) == crypto]
+            if pending and start is not None:
+                market_data.update(self._request_bars(pending, timeframe, start, end_time,
+                                                      limits, crypto))
+                continue
+            for widening in range(WINDOW_WIDENINGS + 1):
+                if not pending:
+                    break
+                span = lookback_window(max(limits[symbol] for symbol in pending), timeframe, crypto)
+                market_data.update(self._request_bars(pending, timeframe, end_time - span * 2 ** widening,
+                                                      end_time, limits, crypto))
+                # Symbols without any bar are not traded at all: no point widening
+                pending = [symbol for symbol in pending
+                           if 0 < len(market_data.get(symbol, ())) < limits[symbol]]
+        
+        return market_data
+    
+    def _request_bars(self, symbols: List[str], timeframe: str, start: datetime, end: datetime,
+                      limits: Mapping[str, int], crypto: bool) -> Dict[str, pd.DataFrame]:
+        """One multi-symbol bar request (naive UTC start/end), split per symbol"""
+        if crypto:
+            bars = self.api.get_crypto_bars(
+                symbols,
+                alpaca_timeframe(timeframe),
+                start=start.strftime('%Y-%m-%dT%H:%M:%SZ'),
+                end=end.strftime('%Y-%m-%dT%H:%M:%SZ')
+            ).df
+        else:
+            bars = self.api.get_bars(
+                symbols,
+                alpaca_timeframe(timeframe),
+                start=start.strftime('%Y-%m-%dT%H:%M:%SZ'),
+                end=end.strftime('%Y-%m-%dT%H:%M:%SZ'),
+                adjustment='raw'  # Same as TradingView
+            ).df
+        return split_bars(bars, limits)
+    
+    def get_window_bars(self, symbol: str, timeframe: str, count: int) -> pd.DataFrame:
+        """
+        The latest `count` bars of one symbol, from a lookback window (see
+        get_multi_bars); empty if the symbol has no bars
+        """
+        return self.get_multi_bars([symbol], timeframe, {symbol: count}).get(symbol, pd.DataFrame())
+            
     def get_latest_price(self, symbol: str) -> float:
         """
         Get current price for a symbol
@@ -310,9 +434,32 @@ class AlpacaTradingConnector(AlpacaConnector):
         """
         # During market hours, use 1Min; after hours, use daily
         try:
-            return self.get_bars(symbol, '1Min', count)
+            bars = self.get_bars(symbol, '1Min', count)
         except:
+            # Daily bars resampled from buffered 1-minute bars need no second request
+            if self.resampler is not None and symbol in self.resampler.minutes:
+                return self.resampler.get_bars(symbol, '1Day', count)
             return self.get_bars(symbol, '1Day', count)
+        if self.resampler is not None:
+            self.resampler.update(symbol, bars)
+        return bars
+        
+    def get_lookback_bars(self, symbol: str, params: Dict, timeframe: str = '1Min',
+                          margin: int = 0) -> pd.DataFrame:
+        """
+        Get exactly the bars the indicators need for a symbol's parameters
+        
+        Args:
+            symbol: Stock symbol
+            params: Symbol parameters (see AIMnIndicators.required_lookback)
+            timeframe: Bar timeframe
+            margin: Extra bars on top of the indicator lookback
+            
+        Returns:
+            DataFrame with timestamp and OHLCV columns
+        """
+        count = AIMnIndicators.required_lookback(params) + margin
+        return self.get_window_bars(symbol, timeframe, count)
         
     def get_current_price(self, symbol: str) -> float:
         """
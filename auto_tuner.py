@@ -1,8 +1,23 @@
 # auto_tuner.py
 import json
+import numpy as np
 import pandas as pd
 from collections import defaultdict
 
+from aimn_crypto_config import BAR_STORE_DIR, SYMBOLS, TIMEFRAME
+from bar_store import load_market_data
+from indicators import AIMnIndicators
+from batch_indicators import AIMnBatchIndicators
+
+# Entry parameter grid swept over the stored bars
+RSI_WINDOWS = range(20, 201, 10)
+MACD_FAST = (8, 12, 16)
+MACD_SLOW = (21, 26, 34)
+MACD_SIGNAL = (5, 9)
+SWEEP_BARS = 10000  # Latest stored bars per symbol
+SIGNAL_HORIZON = 20  # Bars after a signal over which its return is measured
+MIN_SIGNALS = 30  # Fewer buy or sell signals than this are too few to rank
+
 def analyze_trades():
     """Analyze trade history and suggest parameter improvements"""
     
@@ -74,19 +89,22 @@ def analyze_trades():
     if worst_symbols:
         print(f"❌ Consider removing: {', '.join(worst_symbols)}")
     
-    # Generate optimized config
+    # Sweep the entry parameters over the stored bars (see bar_store)
     print("\n=== OPTIMIZED PARAMETERS ===")
-    print("Add these to your config.py:")
-    print("""
-OPTIMIZED_PARAMS = {
-    'rsi_window': 100,
-    'rsi_oversold': 32,      # Slightly higher for more signals
-    'rsi_overbought': 75,    # Higher to let winners run
-    'stop_loss_pct': 1.5,    # Tighter stops
-    'take_profit_pct': 2.0,  # Larger targets
-    'volume_threshold': 0.85  # Slightly lower for more opportunities
-}
-    """)
+    market_data = load_market_data(SYMBOLS, TIMEFRAME, limit=SWEEP_BARS, root=BAR_STORE_DIR)
+    if not market_data:
+        print(f"No stored {TIMEFRAME} bars in {BAR_STORE_DIR}/ to sweep (run the engine with STORE_BARS)")
+    else:
+        rsi_stats, macd_stats = sweep_entry_signals(market_data, RSI_WINDOWS, MACD_FAST,
+                                                    MACD_SLOW, MACD_SIGNAL, horizon=SIGNAL_HORIZON)
+        params = suggest_entry_params(rsi_stats, macd_stats)
+        print(f"Swept {len(rsi_stats)} RSI windows and {len(macd_stats)} MACD sets "
+              f"over {len(market_data)} symbols")
+        if params:
+            print("Add these to SYMBOL_PARAMS in aimn_crypto_config.py:")
+            print(json.dumps(params, indent=4))
+        else:
+            print(f"Too few signals to rank (fewer than {MIN_SIGNALS} per parameter set)")
     
     # Time analysis
     df['entry_hour'] = pd.to_datetime(df['entry_time']).dt.hour
@@ -94,5 +112,73 @@ OPTIMIZED_PARAMS = {
     
     print(f"\n🕐 Best trading hours (UTC): {list(best_hours.index)}")
 
+def _mean_where(signals, values):
+    """Mean of values (symbols x bars) where each parameter set signals (NaN if never)"""
+    signals = signals & ~np.isnan(values)
+    with np.errstate(invalid='ignore'):
+        return np.where(signals, values, 0.0).sum(axis=(1, 2)) / signals.sum(axis=(1, 2))
+
+def sweep_entry_signals(market_data, rsi_windows, macd_fast, macd_slow, macd_signal,
+                        rsi_oversold=30, rsi_overbought=70, horizon=SIGNAL_HORIZON):
+    """
+    Count RSI Real and MACD entry signals across the universe for every
+    candidate parameter, and the mean return `horizon` bars after them,
+    computing each indicator sweep in one pass
+    
+    'edge' is the mean return after buy signals (oversold, bullish cross)
+    minus the mean return after sell signals (overbought, bearish cross).
+    
+    Returns:
+        (rsi_stats, macd_stats) DataFrames with one row per parameter set
+    """
+    arrays = AIMnBatchIndicators.stack_ohlcv(market_data)
+    close = arrays['close']
+    forward = np.full(close.shape, np.nan)
+    forward[:, :-horizon] = close[:, horizon:] / close[:, :-horizon] - 1
+    
+    rsi = AIMnIndicators.sweep_rsi_real(arrays['high'], arrays['low'], close, rsi_windows)
+    oversold = rsi <= rsi_oversold
+    overbought = rsi >= rsi_overbought
+    rsi_stats = pd.DataFrame({
+        'rsi_window': list(rsi_windows),
+        'oversold_bars': oversold.sum(axis=(1, 2)),
+        'overbought_bars': overbought.sum(axis=(1, 2)),
+        'buy_return': _mean_where(oversold, forward),
+        'sell_return': _mean_where(overbought, forward),
+    })
+    rsi_stats['edge'] = rsi_stats['buy_return'] - rsi_stats['sell_return']
+    
+    param_sets, macd = AIMnIndicators.sweep_macd(close, macd_fast, macd_slow,
+                                                 macd_signal, starts=arrays['starts'])
+    macd_stats = pd.DataFrame(param_sets, columns=['macd_fast', 'macd_slow', 'macd_signal'])
+    macd_stats['bullish_crosses'] = macd['bullish_cross'].sum(axis=(1, 2))
+    macd_stats['bearish_crosses'] = macd['bearish_cross'].sum(axis=(1, 2))
+    macd_stats['buy_return'] = _mean_where(macd['bullish_cross'], forward)
+    macd_stats['sell_return'] = _mean_where(macd['bearish_cross'], forward)
+    macd_stats['edge'] = macd_stats['buy_return'] - macd_stats['sell_return']
+    
+    return rsi_stats, macd_stats
+
+def suggest_entry_params(rsi_stats, macd_stats, min_signals=MIN_SIGNALS):
+    """
+    RSI window and MACD lengths with the best edge (see sweep_entry_signals)
+    among the parameter sets with at least min_signals buy and sell signals
+    
+    Returns:
+        Symbol parameters to set; empty if no parameter set qualifies
+    """
+    params = {}
+    rsi = rsi_stats[(rsi_stats['oversold_bars'] >= min_signals) &
+                    (rsi_stats['overbought_bars'] >= min_signals)].dropna(subset=['edge'])
+    if not rsi.empty:
+        params['rsi_window'] = int(rsi.loc[rsi['edge'].idxmax(), 'rsi_window'])
+    macd = macd_stats[(macd_stats['bullish_crosses'] >= min_signals) &
+                      (macd_stats['bearish_crosses'] >= min_signals)].dropna(subset=['edge'])
+    if not macd.empty:
+        best = macd.loc[macd['edge'].idxmax()]
+        for key in ('macd_fast', 'macd_slow', 'macd_signal'):
+            params[key] = int(best[key])
+    return params
+
 if __name__ == "__main__":
     analyze_trades()
\ No newline at end of file
@@ -0,0 +1,73 @@
+# bar_batch.py
+'''
+AIMn Trading System - Batched Bar Requests
+Splits one multi-symbol bar response into per-symbol frames
+
+Alpaca's bar endpoints take a list of symbols and page through the combined
+result, so one request serves the whole crypto (or equity) universe. The
+response is one long frame with a 'symbol' column; split_bars orders it by
+(symbol, time) with a single lexsort and cuts it at the symbol boundaries,
+so every symbol's frame is a slice of the same sorted arrays.
+'''
+
+from typing import Dict, Mapping, Optional
+
+import numpy as np
+import pandas as pd
+
+OHLCV = ('open', 'high', 'low', 'close', 'volume')
+
+
+def long_format(bars: pd.DataFrame) -> pd.DataFrame:
+    '''
+    Bars as rows of (timestamp, symbol, OHLCV)
+
+    Accepts the current response layout (timestamp index, 'symbol' column)
+    and the older one with (symbol, field) or (field, symbol) MultiIndex columns.
+    '''
+    if isinstance(bars.columns, pd.MultiIndex):
+        field_level = 1 if 'close' in bars.columns.get_level_values(1) else 0
+        symbol_level = 1 - field_level
+        frames = {symbol: bars.xs(symbol, axis=1, level=symbol_level)
+                  for symbol in bars.columns.unique(level=symbol_level)}
+        bars = pd.concat(frames, names=['symbol']).reset_index(level='symbol')
+    if 'timestamp' not in bars.columns:
+        bars = bars.rename_axis('timestamp').reset_index()
+    return bars
+
+
+def split_bars(bars: pd.DataFrame, limits: Optional[Mapping[str, int]] = None) -> Dict[str, pd.DataFrame]:
+    '''
+    Split a multi-symbol bar response into per-symbol OHLCV frames
+
+    Args:
+        bars: Response frame (see long_format)
+        limits: Bars to keep per symbol (the latest ones); all if omitted
+
+    Returns:
+        {symbol: DataFrame with timestamp and OHLCV columns, oldest first},
+        in order of first appearance in the response
+    '''
+    if bars is None or bars.empty:
+        return {}
+    bars = long_format(bars)
+    codes, symbols = pd.factorize(bars['symbol'])
+    times = pd.DatetimeIndex(bars['timestamp'])
+    order = np.lexsort((times.asi8, codes))
+    codes = codes[order]
+    times = times[order]
+    values = bars[list(OHLCV)].to_numpy(dtype=float)[order]
+
+    bounds = np.flatnonzero(np.diff(codes)) + 1
+    starts = np.concatenate(([0], bounds))
+    stops = np.concatenate((bounds, [len(codes)]))
+
+    frames = {}
+    for start, stop in zip(starts, stops):
+        symbol = symbols[codes[start]]
+        if limits is not None and symbol in limits:
+            start = max(start, stop - limits[symbol])
+        frame = pd.DataFrame(values[start:stop], columns=list(OHLCV))
+        frame.insert(0, 'timestamp', times[start:stop])
+        frames[symbol] = frame
+    return frames
@@ -0,0 +1,117 @@
+# bar_buffer.py
+'''
+AIMn Trading System - Incremental Bar Buffer
+Keeps a rolling bar buffer per symbol and fetches only newer bars
+
+The first fetch of a symbol downloads its full indicator lookback. After
+that, one request per cycle asks for bars from the last stored timestamp
+on: the last stored bar comes back too, so a bar revised after it was
+first fetched replaces the stored one, and new bars are appended. Each
+buffer is trimmed to the symbol's lookback, so a cycle transfers and
+parses one or two bars per symbol instead of the whole window.
+
+A symbol whose last stored bar is older than its lookback window (e.g.
+after downtime) is fetched in full again rather than pulling every
+missed bar.
+'''
+
+from typing import Callable, Dict, List, Mapping, Optional
+
+import pandas as pd
+
+# fetch_many(symbols, timeframe, limits, start=None) -> {symbol: DataFrame}
+FetchMany = Callable[..., Dict[str, pd.DataFrame]]
+
+
+class AIMnBarBuffer:
+    '''Per-symbol rolling bar buffers filled by incremental multi-symbol requests'''
+
+    def __init__(self, fetch_many: FetchMany, bar_minutes: int = 1):
+        '''
+        Args:
+            fetch_many: Batched fetch (see AlpacaConnector.get_multi_bars);
+                with start=None it returns each symbol's latest limits[symbol]
+                bars, otherwise every bar from start on
+            bar_minutes: Length of a bar of the fetched timeframe
+        '''
+        self.fetch_many = fetch_many
+        self.bar_minutes = bar_minutes
+        self.frames: Dict[str, pd.DataFrame] = {}
+        self.bars_fetched = 0  # Bars received since creation (bandwidth check)
+
+    def last_time(self, symbol: str) -> Optional[pd.Timestamp]:
+        '''Timestamp of the latest stored bar of a symbol'''
+        frame = self.frames.get(symbol)
+        if frame is None or frame.empty:
+            return None
+        return pd.Timestamp(frame['timestamp'].iloc[-1])
+
+    def is_warm(self, symbol: str, limit: int, now: pd.Timestamp) -> bool:
+        '''True if the symbol's buffer is recent enough to be extended'''
+        last = self.last_time(symbol)
+        if last is None:
+            return False
+        if last.tzinfo is None:
+            now = now.tz_localize(None)
+        return now - last <= pd.Timedelta(minutes=limit * self.bar_minutes)
+
+    def update(self, symbols: List[str], timeframe: str,
+               limits: Mapping[str, int]) -> Dict[str, pd.DataFrame]:
+        '''
+        Bring the symbols' buffers up to date and return them
+
+        Args:
+            symbols: Symbols to fetch
+            timeframe: Bar timeframe
+            limits: Bars kept per symbol (its indicator lookback)
+
+        Returns:
+            {symbol: buffered bars (timestamp and OHLCV columns), at most
+            limits[symbol]}; symbols without any bars are missing
+        '''
+        now = pd.Timestamp.now(tz='UTC')
+        warm = [symbol for symbol in symbols if self.is_warm(symbol, limits[symbol], now)]
+        warm_set = set(warm)
+        cold = [symbol for symbol in symbols if symbol not in warm_set]
+
+        fetched: Dict[str, pd.DataFrame] = {}
+        if cold:
+            fetched.update(self.fetch_many(cold, timeframe, limits))
+        if warm:
+            start = min(self.last_time(symbol) for symbol in warm)
+            fetched.update(self.fetch_many(warm, timeframe, limits, start=start))
+        self.bars_fetched += sum(len(bars) for bars in fetched.values())
+
+        market_data = {}
+        for symbol in symbols:
+            if symbol in fetched:
+                self.merge(symbol, fetched[symbol], limits[symbol], replace=symbol not in warm_set)
+            elif symbol not in warm_set:
+                # A stale buffer is not served as current data
+                self.frames.pop(symbol, None)
+            frame = self.frames.get(symbol)
+            if frame is not None and not frame.empty:
+                market_data[symbol] = frame
+        return market_data
+
+    def merge(self, symbol: str, bars: pd.DataFrame, limit: int, replace: bool = False):
+        '''
+        Merge fetched bars (timestamp and OHLCV columns, oldest first) into
+        a symbol's buffer: stored bars from the first fetched timestamp on
+        are replaced, and the buffer is trimmed to the latest `limit` bars
+        '''
+        if bars is None or bars.empty:
+            return
+        bars = bars.drop_duplicates('timestamp', keep='last')
+        buffer = None if replace else self.frames.get(symbol)
+        if buffer is not None and not buffer.empty:
+            keep = buffer['timestamp'].searchsorted(bars['timestamp'].iloc[0])
+            bars = pd.concat([buffer.iloc[:keep], bars], ignore_index=True)
+        self.frames[symbol] = bars.iloc[-limit:].reset_index(drop=True)
+
+    def clear(self, symbol: Optional[str] = None):
+        '''Drop the buffer of one symbol (or of all symbols)'''
+        if symbol is None:
+            self.frames.clear()
+        else:
+            self.frames.pop(symbol, None)
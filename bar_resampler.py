@@ -0,0 +1,153 @@
+# bar_resampler.py
+'''
+AIMn Trading System - Multi-Timeframe Resampler
+Derives 5Min, 15Min, 1Hour and 1Day bars in memory from 1-minute bars
+
+Each symbol keeps a bounded 1-minute buffer. Higher timeframes are cached
+per symbol and refreshed incrementally: an update only re-aggregates the
+buckets from the first new (or revised) minute onward, so confirming a
+signal on several timeframes costs no extra network requests.
+'''
+
+from typing import Dict, Optional, Tuple
+
+import pandas as pd
+
+OHLCV = ('open', 'high', 'low', 'close', 'volume')
+
+# pandas bucket size of each supported timeframe
+TIMEFRAME_RULES = {
+    '1Min': '1min',
+    '5Min': '5min',
+    '15Min': '15min',
+    '1Hour': '1h',
+    '1Day': '1D',
+}
+
+# How each column is aggregated into a higher-timeframe bar
+AGGREGATION = {'open': 'first', 'high': 'max', 'low': 'min', 'close': 'last', 'volume': 'sum'}
+
+
+def _minute_frame(bars: pd.DataFrame) -> pd.DataFrame:
+    '''OHLCV columns indexed by bar start time (from a 'timestamp' column or the index)'''
+    if 'timestamp' in bars.columns:
+        bars = bars.set_index('timestamp')
+    bars = bars.loc[:, list(OHLCV)]
+    bars.index = pd.DatetimeIndex(bars.index)
+    return bars.sort_index()
+
+
+def _aggregate(minutes: pd.DataFrame, rule: str) -> pd.DataFrame:
+    '''Aggregate 1-minute bars into buckets labelled by their start time'''
+    bars = minutes.resample(rule, label='left', closed='left').agg(AGGREGATION)
+    # Buckets without a single trade (gaps in the feed) produce no bar
+    return bars.dropna(subset=['close'])
+
+
+class AIMnBarResampler:
+    '''Per-symbol 1-minute buffers and incrementally resampled higher timeframes'''
+
+    def __init__(self, max_minutes: int = 3 * 1440, max_bars: int = 1000):
+        '''
+        Args:
+            max_minutes: 1-minute bars kept per symbol
+            max_bars: Bars kept per symbol for each higher timeframe
+        '''
+        self.max_minutes = max_minutes
+        self.max_bars = max_bars
+        self.minutes: Dict[str, pd.DataFrame] = {}
+        self.frames: Dict[Tuple[str, str], pd.DataFrame] = {}
+        # First minute per symbol that each cached timeframe has not aggregated yet
+        self.pending: Dict[Tuple[str, str], Optional[pd.Timestamp]] = {}
+
+    def update(self, symbol: str, bars: pd.DataFrame) -> int:
+        '''
+        Merge newly fetched 1-minute bars into a symbol's buffer
+
+        Bars that overlap the buffer replace it (the latest bar may have
+        been revised), later bars are appended.
+
+        Returns:
+            Number of bars not already in the buffer
+        '''
+        if bars is None or len(bars) == 0:
+            return 0
+        bars = _minute_frame(bars)
+        bars = bars[~bars.index.duplicated(keep='last')]
+
+        buffer = self.minutes.get(symbol)
+        if buffer is None:
+            added = len(bars)
+            buffer = bars
+        else:
+            added = len(bars.index.difference(buffer.index))
+            buffer = pd.concat([buffer[~buffer.index.isin(bars.index)], bars]).sort_index()
+        self.minutes[symbol] = buffer.iloc[-self.max_minutes:]
+
+        first = bars.index[0]
+        for key, pending in self.pending.items():
+            if key[0] == symbol and (pending is None or first < pending):
+                self.pending[key] = first
+        return added
+
+    def get_bars(self, symbol: str, timeframe: str = '1Min',
+                 limit: Optional[int] = None) -> pd.DataFrame:
+        '''
+        Latest bars of a timeframe, derived from the symbol's 1-minute buffer
+
+        The last bar is still forming until its bucket has ended, as with
+        bars fetched from Alpaca during the bucket.
+
+        Args:
+            symbol: Symbol with buffered 1-minute bars
+            timeframe: '1Min', '5Min', '15Min', '1Hour' or '1Day'
+            limit: Number of bars to return (all cached bars if None)
+
+        Returns:
+            DataFrame with columns: open, high, low, close, volume
+        '''
+        if timeframe not in TIMEFRAME_RULES:
+            raise ValueError(f"Unsupported timeframe: {timeframe}")
+        minutes = self.minutes.get(symbol)
+        if minutes is None:
+            return pd.DataFrame(columns=list(OHLCV))
+
+        if timeframe == '1Min':
+            bars = minutes
+        else:
+            bars = self._refresh(symbol, timeframe, minutes)
+        return bars if limit is None else bars.iloc[-limit:]
+
+    def _refresh(self, symbol: str, timeframe: str, minutes: pd.DataFrame) -> pd.DataFrame:
+        '''Re-aggregate the buckets touched since the last call for this timeframe'''
+        key = (symbol, timeframe)
+        rule = TIMEFRAME_RULES[timeframe]
+        bars = self.frames.get(key)
+        pending = self.pending.get(key)
+
+        if bars is None:
+            bars = _aggregate(minutes, rule)
+        elif pending is not None:
+            # The bucket holding the first new minute is rebuilt from scratch
+            start = pending.floor(rule)
+            bars = pd.concat([bars[bars.index < start],
+                              _aggregate(minutes[minutes.index >= start], rule)])
+        else:
+            return bars
+
+        bars = bars.iloc[-self.max_bars:]
+        self.frames[key] = bars
+        self.pending[key] = None
+        return bars
+
+    def clear(self, symbol: Optional[str] = None):
+        '''Drop the buffers of one symbol (or of all symbols)'''
+        if symbol is None:
+            self.minutes.clear()
+            self.frames.clear()
+            self.pending.clear()
+            return
+        self.minutes.pop(symbol, None)
+        for key in [key for key in self.frames if key[0] == symbol]:
+            del self.frames[key]
+            self.pending.pop(key, None)
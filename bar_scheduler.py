@@ -0,0 +1,141 @@
+# bar_scheduler.py
+'''
+AIMn Trading System - Bar-Close Scheduler
+Wakes the trading cycle when a new bar becomes available
+
+Instead of sleeping a fixed interval wherever that falls relative to the
+bar boundary, the engine sleeps until the next bar closes plus a short
+settle delay (the data feed needs a moment to publish the bar), fetches
+the symbols that are due and scans only those whose latest bar is new.
+
+Symbols whose just-closed bar has not arrived yet (a late feed, or a
+crypto minute without trades, which has no bar at all) stay pending and
+are fetched again every `retry` seconds until `max_wait` seconds after
+the close; after that they wait for the next bar.
+'''
+
+import logging
+import math
+import time
+from typing import Callable, Dict, Iterable, List, Optional
+
+import pandas as pd
+
+from indicator_cache import _last_bar_key, _last_bar_time
+
+logger = logging.getLogger(__name__)
+
+
+def _bar_start(df: pd.DataFrame) -> Optional[float]:
+    '''Start of the last bar (epoch seconds, naive times are UTC), None if not a time'''
+    value = _last_bar_time(df)
+    if isinstance(value, (int, float)):
+        return None
+    try:
+        stamp = pd.Timestamp(value)
+    except (TypeError, ValueError):
+        return None
+    if pd.isna(stamp):
+        return None
+    return stamp.timestamp()
+
+
+class AIMnBarScheduler:
+    '''Sleeps until bars close and tracks which symbols have new bars'''
+
+    def __init__(self, bar_seconds: float = 60, settle: float = 2.0,
+                 retry: float = 2.0, max_wait: float = 20.0,
+                 clock: Callable[[], float] = time.time,
+                 sleep: Callable[[float], None] = time.sleep):
+        '''
+        Args:
+            bar_seconds: Bar length (60 for 1-minute bars)
+            settle: Seconds after the close before the bar is fetched
+            retry: Seconds between fetches of symbols still missing the bar
+            max_wait: Seconds after the close to keep retrying missing symbols
+            clock: Current time in epoch seconds
+            sleep: Sleeps for a number of seconds
+        '''
+        self.bar_seconds = bar_seconds
+        self.settle = settle
+        self.retry = retry
+        self.max_wait = max(max_wait, settle)
+        self.clock = clock
+        self.sleep = sleep
+        self.last_bar: Dict[str, tuple] = {}     # symbol -> (last bar time, bar count, OHLCV)
+        self.pending: List[str] = []             # Fetched symbols still missing the closed bar
+        self.close_time: Optional[float] = None  # Close of the bar last fetched for
+        self.woken_for: Optional[float] = None   # Close of the bar last woken for
+
+    def last_close(self, now: float) -> float:
+        '''Most recent bar boundary at or before now'''
+        return math.floor(now / self.bar_seconds) * self.bar_seconds
+
+    def next_wake(self, now: Optional[float] = None) -> float:
+        '''When the next cycle should run'''
+        now = self.clock() if now is None else now
+        close = self.last_close(now)
+        if self.woken_for != close:
+            # No cycle has run for this bar yet
+            return max(now, close + self.settle)
+        if self.pending and self.close_time == close and now + self.retry <= close + self.max_wait:
+            return now + self.retry
+        return close + self.bar_seconds + self.settle
+
+    def wait(self) -> float:
+        '''
+        Sleep until the next cycle is due; returns the wake-up time
+        Each bar gets one cycle (plus retries) even if that cycle fails.
+        '''
+        wake = self.next_wake()
+        delay = wake - self.clock()
+        if delay > 0:
+            logger.debug(f"Sleeping {delay:.1f}s until {pd.Timestamp(wake, unit='s')}")
+            self.sleep(delay)
+        self.woken_for = self.last_close(wake)
+        return wake
+
+    def due_symbols(self, symbols: Iterable[str], now: Optional[float] = None) -> List[str]:
+        '''
+        Symbols to fetch this cycle: every symbol on a new bar, then only
+        the ones still missing it
+        '''
+        now = self.clock() if now is None else now
+        close = self.last_close(now)
+        symbols = list(symbols)
+        if self.close_time != close:
+            return symbols
+        pending = set(self.pending)
+        return [symbol for symbol in symbols if symbol in pending or symbol not in self.last_bar]
+
+    def new_bars(self, symbols: Iterable[str], market_data: Dict[str, pd.DataFrame],
+                 now: Optional[float] = None) -> Dict[str, pd.DataFrame]:
+        '''
+        Record a fetch of `symbols` and return the ones whose latest bar is
+        new or was revised in place
+
+        A fetched symbol whose bars do not yet include the bar that just
+        closed stays pending.
+        '''
+        now = self.clock() if now is None else now
+        close = self.last_close(now)
+        expected = close - self.bar_seconds
+        fresh = {}
+        missing = []
+        for symbol in symbols:
+            df = market_data.get(symbol)
+            if df is None or df.empty:
+                missing.append(symbol)
+                continue
+            key = _last_bar_key(df)
+            if self.last_bar.get(symbol) != key:
+                self.last_bar[symbol] = key
+                fresh[symbol] = df
+            start = _bar_start(df)
+            if start is not None and start < expected:
+                missing.append(symbol)
+        self.close_time = close
+        self.pending = missing
+        if missing:
+            logger.debug(f"Bar not yet available for: {', '.join(missing)}")
+        return fresh
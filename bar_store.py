@@ -0,0 +1,220 @@
+# bar_store.py
+'''
+AIMn Trading System - Local Bar Store
+Persistent, append-only columnar bar history keyed by symbol and timeframe
+
+Layout: one directory per (symbol, timeframe), one raw little-endian file
+per column:
+
+    <root>/<symbol>/<timeframe>/timestamp.i8   bar start, ns since epoch (UTC)
+    <root>/<symbol>/<timeframe>/open.f8 ... volume.f8
+
+New bars are appended to every file; a bar re-sent with a stored timestamp
+(a revised final bar) is rewritten in place. Reads memory-map the files and
+locate a time range with a binary search on the timestamps, so a range read
+returns array views without parsing anything. The timestamp file is
+written last, so a reader in another process never sees a bar whose
+prices are not on disk yet.
+
+The live engine appends every fetched bar; backtests read history from
+here without network access (see load_market_data).
+'''
+
+import os
+from typing import Dict, Iterable, List, Optional
+
+import numpy as np
+import pandas as pd
+
+from bar_batch import OHLCV
+
+BAR_STORE_DIR = 'bar_store'
+
+COLUMNS = ('timestamp',) + OHLCV
+DTYPES = {'timestamp': np.dtype('<i8'), **{column: np.dtype('<f8') for column in OHLCV}}
+SUFFIX = {'timestamp': 'i8', **{column: 'f8' for column in OHLCV}}
+
+
+def _to_ns(times) -> np.ndarray:
+    '''Timestamps as int64 ns since epoch (naive times are UTC)'''
+    index = pd.DatetimeIndex(times)
+    if index.tz is not None:
+        index = index.tz_convert('UTC').tz_localize(None)
+    return index.as_unit('ns').asi8
+
+
+def _ns(value) -> Optional[int]:
+    '''One time bound as int64 ns since epoch (None stays None)'''
+    return None if value is None else int(_to_ns([value])[0])
+
+
+class AIMnBarStore:
+    '''On-disk bar history with appends and memory-mapped range reads'''
+
+    def __init__(self, root: str = BAR_STORE_DIR):
+        '''
+        Args:
+            root: Directory holding the store (created on first write)
+        '''
+        self.root = root
+
+    def path(self, symbol: str, timeframe: str, column: Optional[str] = None) -> str:
+        '''Directory of a (symbol, timeframe) series, or the file of one column'''
+        directory = os.path.join(self.root, symbol.replace('/', '_'), timeframe)
+        if column is None:
+            return directory
+        return os.path.join(directory, f"{column}.{SUFFIX[column]}")
+
+    def _length(self, symbol: str, timeframe: str) -> int:
+        '''Bars completely on disk (the shortest column)'''
+        lengths = []
+        for column in COLUMNS:
+            path = self.path(symbol, timeframe, column)
+            if not os.path.exists(path):
+                return 0
+            lengths.append(os.path.getsize(path) // DTYPES[column].itemsize)
+        return min(lengths)
+
+    def _column(self, symbol: str, timeframe: str, column: str, length: int) -> np.ndarray:
+        '''Read-only memory map of a column's first `length` values'''
+        if length == 0:
+            return np.empty(0, dtype=DTYPES[column])
+        return np.memmap(self.path(symbol, timeframe, column), dtype=DTYPES[column],
+                         mode='r', shape=(length,))
+
+    def last_time(self, symbol: str, timeframe: str) -> Optional[pd.Timestamp]:
+        '''Start of the latest stored bar (UTC), None if nothing is stored'''
+        length = self._length(symbol, timeframe)
+        if length == 0:
+            return None
+        stamps = self._column(symbol, timeframe, 'timestamp', length)
+        return pd.Timestamp(int(stamps[-1]), unit='ns', tz='UTC')
+
+    def append(self, symbol: str, timeframe: str, bars: pd.DataFrame) -> int:
+        '''
+        Store bars (timestamp column or DatetimeIndex, plus OHLCV columns)
+
+        Bars after the latest stored one are appended; bars matching a
+        stored timestamp overwrite it if their values changed; older bars
+        not in the store are ignored (the files stay sorted). Passing the
+        same window every cycle therefore writes only new or revised bars.
+
+        Returns:
+            Number of bars appended
+        '''
+        if bars is None or len(bars) == 0:
+            return 0
+        times = bars['timestamp'] if 'timestamp' in bars.columns else bars.index
+        stamps = _to_ns(times)
+        order = np.argsort(stamps, kind='stable')
+        stamps = stamps[order]
+        # Last occurrence of a repeated timestamp wins
+        last = np.append(stamps[1:] != stamps[:-1], True)
+        order, stamps = order[last], stamps[last]
+        values = {column: bars[column].to_numpy(dtype=float)[order] for column in OHLCV}
+
+        length = self._length(symbol, timeframe)
+        if length:
+            stored = self._column(symbol, timeframe, 'timestamp', length)
+            positions = np.searchsorted(stored, stamps)
+            present = (positions < length) & (stored[np.minimum(positions, length - 1)] == stamps)
+            new = stamps > stored[-1]
+            del stored
+            if present.any():
+                self._overwrite(symbol, timeframe, length, positions[present],
+                                {column: values[column][present] for column in OHLCV})
+        else:
+            os.makedirs(self.path(symbol, timeframe), exist_ok=True)
+            new = np.ones(len(stamps), dtype=bool)
+
+        if new.any():
+            data = {column: values[column][new] for column in OHLCV}
+            data['timestamp'] = stamps[new]
+            # Timestamps last: readers only see bars whose prices are written
+            for column in OHLCV + ('timestamp',):
+                self._truncate(symbol, timeframe, column, length)
+                with open(self.path(symbol, timeframe, column), 'ab') as f:
+                    f.write(np.ascontiguousarray(data[column], dtype=DTYPES[column]).tobytes())
+        return int(new.sum())
+
+    def _truncate(self, symbol: str, timeframe: str, column: str, length: int):
+        '''Drop a partial write left by an interrupted append'''
+        path = self.path(symbol, timeframe, column)
+        if os.path.exists(path) and os.path.getsize(path) > length * DTYPES[column].itemsize:
+            with open(path, 'r+b') as f:
+                f.truncate(length * DTYPES[column].itemsize)
+
+    def _overwrite(self, symbol: str, timeframe: str, length: int, positions: np.ndarray,
+                   values: Dict[str, np.ndarray]):
+        '''Rewrite the stored bars at positions whose values differ'''
+        changed = np.zeros(len(positions), dtype=bool)
+        for column in OHLCV:
+            stored = self._column(symbol, timeframe, column, length)[positions]
+            changed |= ~((stored == values[column]) | (np.isnan(stored) & np.isnan(values[column])))
+        if not changed.any():
+            return
+        positions = positions[changed]
+        for column in OHLCV:
+            stored = np.memmap(self.path(symbol, timeframe, column), dtype=DTYPES[column],
+                               mode='r+', shape=(length,))
+            stored[positions] = values[column][changed]
+            stored.flush()
+            del stored
+
+    def read(self, symbol: str, timeframe: str, start=None, end=None,
+             limit: Optional[int] = None) -> Dict[str, np.ndarray]:
+        '''
+        Bars with start <= bar time < end, as memory-mapped arrays
+
+        Args:
+            symbol: Symbol
+            timeframe: Bar timeframe
+            start, end: Time bounds (anything pd.Timestamp accepts; naive = UTC)
+            limit: Keep only the latest `limit` bars of the range
+
+        Returns:
+            {'timestamp': int64 ns since epoch, 'open' ... 'volume': float64}
+            read-only views (empty arrays if nothing is stored)
+        '''
+        length = self._length(symbol, timeframe)
+        stamps = self._column(symbol, timeframe, 'timestamp', length)
+        lo = 0 if start is None else int(np.searchsorted(stamps, _ns(start), side='left'))
+        hi = length if end is None else int(np.searchsorted(stamps, _ns(end), side='left'))
+        if limit is not None:
+            lo = max(lo, hi - limit)
+        arrays = {'timestamp': stamps[lo:hi]}
+        for column in OHLCV:
+            arrays[column] = self._column(symbol, timeframe, column, length)[lo:hi]
+        return arrays
+
+    def read_frame(self, symbol: str, timeframe: str, start=None, end=None,
+                   limit: Optional[int] = None) -> pd.DataFrame:
+        '''read() as a DataFrame with a UTC timestamp column and OHLCV columns (a copy)'''
+        arrays = self.read(symbol, timeframe, start, end, limit)
+        frame = pd.DataFrame({column: np.array(arrays[column]) for column in OHLCV})
+        frame.insert(0, 'timestamp', pd.to_datetime(np.array(arrays['timestamp']), unit='ns', utc=True))
+        return frame
+
+    def symbols(self, timeframe: str) -> List[str]:
+        '''Stored symbols with bars of a timeframe (slashes restored for crypto pairs)'''
+        if not os.path.isdir(self.root):
+            return []
+        return sorted(name.replace('_', '/') for name in os.listdir(self.root)
+                      if self._length(name, timeframe) > 0)
+
+
+def load_market_data(symbols: Iterable[str], timeframe: str = '1Min', start=None, end=None,
+                     limit: Optional[int] = None, root: str = BAR_STORE_DIR) -> Dict[str, pd.DataFrame]:
+    '''
+    Stored bars of several symbols for a backtest (no network access)
+
+    Returns:
+        {symbol: read_frame result}; symbols without stored bars are missing
+    '''
+    store = AIMnBarStore(root)
+    market_data = {}
+    for symbol in symbols:
+        frame = store.read_frame(symbol, timeframe, start, end, limit)
+        if not frame.empty:
+            market_data[symbol] = frame
+    return market_data
@@ -0,0 +1,466 @@
+# batch_indicators.py
+'''
+AIMn Trading System - Cross-Symbol Batch Indicators
+Computes indicators for the whole universe on (symbols x bars) matrices
+
+Bars are right-aligned (the latest bar is always the last column) and
+shorter histories are left-padded with NaN, so each row reproduces
+AIMnIndicators.calculate_all_indicators on that symbol's own frame.
+Recursive indicators (EMA, rolling means) step through the bars once and
+are vectorized across symbols, so the per-symbol pandas overhead is paid
+once per parameter group instead of once per symbol.
+
+Like the single-symbol paths, only the indicator groups that produce a
+requested column are calculated (see indicator_planner), and
+calculate_latest is the batch form of tail evaluation: windowed
+indicators read only the last bars and no indicator matrices are kept.
+'''
+
+from typing import Callable, Dict, FrozenSet, Iterable, List, Optional
+
+import numpy as np
+import pandas as pd
+
+import indicators
+from indicators import AIMnIndicators, rolling_extreme
+from symbol_params import AIMnSymbolParams
+
+OHLCV = ('open', 'high', 'low', 'close', 'volume')
+
+# Columns of the recursive indicator groups
+MACD_COLUMNS = ('macd', 'macd_signal', 'macd_histogram', 'macd_bullish_cross', 'macd_bearish_cross')
+OBV_COLUMNS = ('obv', 'obv_sma', 'bullish_volume', 'bearish_volume')
+ATR_COLUMNS = ('atr', 'atr_ma', 'volatility_expanding', 'atr_ratio')
+
+
+def _shift(values: np.ndarray) -> np.ndarray:
+    '''Shift every row one bar to the right (like Series.shift(1))'''
+    shifted = np.empty_like(values)
+    shifted[:, 0] = np.nan
+    shifted[:, 1:] = values[:, :-1]
+    return shifted
+
+
+def _rolling_mean(values: np.ndarray, window: int) -> np.ndarray:
+    '''
+    Rolling mean along the bar axis
+    Steps the same compensated add/remove scheme as pandas rolling().mean()
+    for every symbol at once, so each row matches pandas bit-for-bit
+    '''
+    n_symbols, n_bars = values.shape
+    out = np.full(values.shape, np.nan)
+    nobs = np.zeros(n_symbols, dtype=np.int64)
+    neg_ct = np.zeros(n_symbols, dtype=np.int64)
+    num_same = np.zeros(n_symbols, dtype=np.int64)
+    sum_x = np.zeros(n_symbols)
+    comp_add = np.zeros(n_symbols)
+    comp_remove = np.zeros(n_symbols)
+    prev_value = values[:, 0].copy()
+
+    for t in range(n_bars):
+        if t >= window:
+            old = values[:, t - window]
+            mask = old == old
+            y = np.where(mask, -old - comp_remove, 0.0)
+            total = sum_x + y
+            comp_remove = np.where(mask, total - sum_x - y, comp_remove)
+            sum_x = np.where(mask, total, sum_x)
+            nobs -= mask
+            neg_ct -= mask & np.signbit(old)
+
+        val = values[:, t]
+        mask = val == val
+        y = np.where(mask, val - comp_add, 0.0)
+        total = sum_x + y
+        comp_add = np.where(mask, total - sum_x - y, comp_add)
+        sum_x = np.where(mask, total, sum_x)
+        nobs += mask
+        neg_ct += mask & np.signbit(val)
+        num_same = np.where(mask, np.where(val == prev_value, num_same + 1, 1), num_same)
+        prev_value = np.where(mask, val, prev_value)
+
+        ready = nobs >= window
+        with np.errstate(invalid='ignore', divide='ignore'):
+            result = sum_x / nobs
+        result = np.where(num_same >= nobs, prev_value, result)
+        result = np.where((num_same < nobs) & (neg_ct == 0) & (result < 0), 0.0, result)
+        result = np.where((num_same < nobs) & (neg_ct == nobs) & (result > 0), 0.0, result)
+        out[:, t] = np.where(ready, result, np.nan)
+
+    return out
+
+
+def _ema_talib(values: np.ndarray, period: int, seed_end: np.ndarray) -> np.ndarray:
+    '''
+    TA-Lib EMA along the bar axis (see indicators.ema_talib), seeded for
+    each row on its own seed_end bar
+    '''
+    n_rows, n_bars = values.shape
+    rows = np.arange(n_rows)
+    out = np.full(values.shape, np.nan)
+    k = 2.0 / (period + 1)
+
+    ema = np.zeros(n_rows)
+    for i in range(period):
+        column = seed_end - period + 1 + i
+        valid = (column >= 0) & (column < n_bars)
+        ema += np.where(valid, values[rows, np.clip(column, 0, n_bars - 1)], 0.0)
+    ema /= period
+
+    for t in range(max(int(seed_end.min()), 0), n_bars):
+        started = seed_end < t
+        ema = np.where(started, (values[:, t] - ema) * k + ema, ema)
+        out[:, t] = np.where(started | (seed_end == t), ema, np.nan)
+    return out
+
+
+def _macd_talib(close: np.ndarray, fast: int, slow: int, signal: int,
+                starts: np.ndarray) -> List[np.ndarray]:
+    '''TA-Lib MACD along the bar axis (see indicators.macd_talib)'''
+    if slow < fast:
+        fast, slow = slow, fast
+    first = starts + slow - 1
+    macd = _ema_talib(close, fast, first) - _ema_talib(close, slow, first)
+    macd_signal = _ema_talib(macd, signal, first + signal - 1)
+    macd[np.arange(close.shape[1]) < (first + signal - 1)[:, None]] = np.nan
+    return [macd, macd_signal, macd - macd_signal]
+
+
+def _atr_talib(high: np.ndarray, low: np.ndarray, close: np.ndarray, period: int,
+               starts: np.ndarray) -> np.ndarray:
+    '''Wilder ATR along the bar axis (see indicators.atr_talib)'''
+    prev_close = _shift(close)
+    true_range = np.fmax(np.fmax(high - low, np.abs(high - prev_close)),
+                         np.abs(low - prev_close))
+    # The first bar of each row has no previous close
+    true_range[np.arange(close.shape[0]), np.minimum(starts, close.shape[1] - 1)] = np.nan
+    if period == 1:
+        return true_range
+
+    n_rows, n_bars = close.shape
+    rows = np.arange(n_rows)
+    seed_end = starts + period
+    out = np.full(close.shape, np.nan)
+    atr = np.zeros(n_rows)
+    for i in range(period):
+        column = seed_end - period + 1 + i
+        valid = column < n_bars
+        atr += np.where(valid, true_range[rows, np.minimum(column, n_bars - 1)], 0.0)
+    atr /= period
+
+    for t in range(int(seed_end.min()), n_bars):
+        started = seed_end < t
+        atr = np.where(started, (atr * (period - 1) + true_range[:, t]) / period, atr)
+        out[:, t] = np.where(started | (seed_end == t), atr, np.nan)
+    return out
+
+
+def _obv_talib(close: np.ndarray, volume: np.ndarray, starts: np.ndarray) -> np.ndarray:
+    '''TA-Lib OBV along the bar axis (see indicators.obv_talib)'''
+    change = close - _shift(close)
+    flow = np.where(change > 0, volume, np.where(change < 0, -volume, 0.0))
+    rows = np.arange(close.shape[0])
+    first = np.minimum(starts, close.shape[1] - 1)
+    flow[rows, first] = volume[rows, first]
+    padded = np.isnan(volume)
+    flow[padded] = 0.0
+    obv = np.cumsum(flow, axis=1)
+    obv[padded] = np.nan
+    return obv
+
+
+def _per_row(func: Callable, *columns: np.ndarray, starts: np.ndarray) -> List[np.ndarray]:
+    '''Apply a 1-D TA-Lib function to every row's valid (unpadded) bars'''
+    outputs = None
+    for row, start in enumerate(starts):
+        result = func(*(np.ascontiguousarray(c[row, start:]) for c in columns))
+        if not isinstance(result, tuple):
+            result = (result,)
+        if outputs is None:
+            outputs = [np.full(columns[0].shape, np.nan) for _ in result]
+        for out, values in zip(outputs, result):
+            out[row, start:] = values
+    return outputs
+
+
+class AIMnBatchIndicators:
+    '''Vectorized indicator computation across many symbols'''
+
+    @staticmethod
+    def stack_ohlcv(market_data: Dict[str, pd.DataFrame],
+                    symbols: Optional[List[str]] = None) -> Dict[str, np.ndarray]:
+        '''
+        Stack OHLCV columns into right-aligned (symbols x bars) float arrays
+
+        Returns:
+            Dict with one 2-D array per OHLCV column plus 'starts', the index
+            of each symbol's first real (unpadded) bar
+        '''
+        if symbols is None:
+            symbols = list(market_data)
+        n_bars = max(len(market_data[s]) for s in symbols)
+
+        arrays = {col: np.full((len(symbols), n_bars), np.nan) for col in OHLCV}
+        starts = np.empty(len(symbols), dtype=np.int64)
+        for row, symbol in enumerate(symbols):
+            df = market_data[symbol]
+            start = n_bars - len(df)
+            starts[row] = start
+            for col in OHLCV:
+                arrays[col][row, start:] = df[col].to_numpy(dtype=float)
+        arrays['starts'] = starts
+        return arrays
+
+    @staticmethod
+    def _macd(close: np.ndarray, params: AIMnSymbolParams, starts: np.ndarray) -> List[np.ndarray]:
+        '''MACD line, signal and histogram of every row'''
+        fast = params.macd_fast
+        slow = params.macd_slow
+        signal = params.macd_signal
+        if indicators.TALIB_AVAILABLE:
+            return _per_row(lambda c: indicators.talib.MACD(c, fastperiod=fast, slowperiod=slow,
+                                                            signalperiod=signal),
+                            close, starts=starts)
+        return _macd_talib(close, fast, slow, signal, starts)
+
+    @staticmethod
+    def _obv(close: np.ndarray, volume: np.ndarray, starts: np.ndarray) -> np.ndarray:
+        '''OBV of every row'''
+        if indicators.TALIB_AVAILABLE:
+            obv, = _per_row(indicators.talib.OBV, close, volume, starts=starts)
+            return obv
+        return _obv_talib(close, volume, starts)
+
+    @staticmethod
+    def _atr(high: np.ndarray, low: np.ndarray, close: np.ndarray, period: int,
+             starts: np.ndarray) -> np.ndarray:
+        '''Wilder ATR of every row'''
+        if indicators.TALIB_AVAILABLE:
+            atr, = _per_row(lambda h, l, c: indicators.talib.ATR(h, l, c, timeperiod=period),
+                            high, low, close, starts=starts)
+            return atr
+        return _atr_talib(high, low, close, period, starts)
+
+    @staticmethod
+    def calculate(arrays: Dict[str, np.ndarray], params: Dict,
+                  columns: Optional[Iterable[str]] = None) -> Dict[str, np.ndarray]:
+        '''
+        Calculate all indicators for stacked symbols sharing one parameter set
+        Output keys match the columns added by calculate_all_indicators
+
+        If columns is given, only the indicator groups (RSI, MACD, volume,
+        ATR) that produce one of those columns are calculated.
+        '''
+        params = AIMnSymbolParams.resolve(params)
+        high = arrays['high']
+        low = arrays['low']
+        close = arrays['close']
+        volume = arrays['volume']
+        starts = arrays['starts']
+        out = {}
+
+        def wanted(*group: str) -> bool:
+            return columns is None or any(column in columns for column in group)
+
+        with np.errstate(invalid='ignore', divide='ignore'):
+            # RSI Real
+            if wanted('rsi_real'):
+                window = params.rsi_window
+                highest_high = rolling_extreme(high, window, is_max=True)
+                lowest_low = rolling_extreme(low, window, is_max=False)
+                price_range = highest_high - lowest_low
+                price_range = np.where(price_range == 0, 1, price_range)
+                out['rsi_real'] = ((close - lowest_low) / price_range) * 100
+
+            # MACD
+            if wanted(*MACD_COLUMNS):
+                macd, macd_signal, macd_hist = AIMnBatchIndicators._macd(close, params, starts)
+                macd_prev = _shift(macd)
+                signal_prev = _shift(macd_signal)
+                out['macd'] = macd
+                out['macd_signal'] = macd_signal
+                out['macd_histogram'] = macd_hist
+                out['macd_bullish_cross'] = (macd_prev <= signal_prev) & (macd > macd_signal)
+                out['macd_bearish_cross'] = (macd_prev >= signal_prev) & (macd < macd_signal)
+
+            # Volume (the ratio alone needs no OBV)
+            if wanted(*OBV_COLUMNS, 'volume_ratio'):
+                volume_sma = _rolling_mean(volume, 20)
+                out['volume_ratio'] = volume / volume_sma
+            if wanted(*OBV_COLUMNS):
+                prev_close = _shift(close)
+                obv = AIMnBatchIndicators._obv(close, volume, starts)
+                obv_sma = _rolling_mean(obv, params.obv_period)
+                high_volume = volume > volume_sma
+                out['obv'] = obv
+                out['obv_sma'] = obv_sma
+                out['bullish_volume'] = high_volume & (close > prev_close) & (obv > obv_sma)
+                out['bearish_volume'] = high_volume & (close < prev_close) & (obv < obv_sma)
+
+            # ATR Filter
+            if wanted(*ATR_COLUMNS):
+                atr = AIMnBatchIndicators._atr(high, low, close, params.atr_period, starts)
+                atr_ma = _rolling_mean(atr, params.atr_ma_period)
+                out['atr'] = atr
+                out['atr_ma'] = atr_ma
+                out['volatility_expanding'] = atr > (atr_ma * params.atr_multiplier)
+                out['atr_ratio'] = atr / atr_ma
+
+        return out
+
+    @staticmethod
+    def calculate_latest(arrays: Dict[str, np.ndarray], params: Dict,
+                         columns: Optional[Iterable[str]] = None) -> Dict[str, np.ndarray]:
+        '''
+        Tail evaluation for stacked symbols: the latest value of each
+        indicator, one element per row (see calculate_latest_indicators)
+
+        RSI Real and the volume/OBV/ATR averages read only their last
+        window of bars; MACD, OBV and ATR still run over the history.
+        Values match calculate_latest_indicators to within float rounding.
+        If columns is given, only the groups producing them are calculated.
+        '''
+        params = AIMnSymbolParams.resolve(params)
+        high = arrays['high']
+        low = arrays['low']
+        close = arrays['close']
+        volume = arrays['volume']
+        starts = arrays['starts']
+        n_bars = close.shape[1]
+        out = {}
+
+        def wanted(*group: str) -> bool:
+            return columns is None or any(column in columns for column in group)
+
+        def tail_mean(values: np.ndarray, window: int) -> np.ndarray:
+            # Padded (NaN) bars in the window leave the row NaN, as a short frame
+            if n_bars < window:
+                return np.full(len(values), np.nan)
+            return values[:, -window:].mean(axis=1)
+
+        def previous(values: np.ndarray) -> np.ndarray:
+            return values[:, -2] if n_bars >= 2 else np.full(len(values), np.nan)
+
+        with np.errstate(invalid='ignore', divide='ignore'):
+            # RSI Real
+            if wanted('rsi_real'):
+                window = params.rsi_window
+                if n_bars >= window:
+                    lowest_low = low[:, -window:].min(axis=1)
+                    price_range = high[:, -window:].max(axis=1) - lowest_low
+                    price_range[price_range == 0] = 1
+                    out['rsi_real'] = ((close[:, -1] - lowest_low) / price_range) * 100
+                else:
+                    out['rsi_real'] = np.full(len(close), np.nan)
+
+            # MACD (last two values for crossover detection)
+            if wanted(*MACD_COLUMNS):
+                macd, macd_signal, _ = AIMnBatchIndicators._macd(close, params, starts)
+                macd_now, signal_now = macd[:, -1], macd_signal[:, -1]
+                macd_prev, signal_prev = previous(macd), previous(macd_signal)
+                out['macd'] = macd_now
+                out['macd_signal'] = signal_now
+                out['macd_histogram'] = macd_now - signal_now
+                out['macd_bullish_cross'] = (macd_prev <= signal_prev) & (macd_now > signal_now)
+                out['macd_bearish_cross'] = (macd_prev >= signal_prev) & (macd_now < signal_now)
+
+            # Volume (the ratio alone reads only the last 20 bars)
+            if wanted(*OBV_COLUMNS, 'volume_ratio'):
+                volume_sma = tail_mean(volume, 20)
+                out['volume_ratio'] = volume[:, -1] / volume_sma
+            if wanted(*OBV_COLUMNS):
+                obv = AIMnBatchIndicators._obv(close, volume, starts)
+                obv_sma = tail_mean(obv, params.obv_period)
+                high_volume = volume[:, -1] > volume_sma
+                prev_close = previous(close)
+                out['obv'] = obv[:, -1]
+                out['obv_sma'] = obv_sma
+                out['bullish_volume'] = high_volume & (close[:, -1] > prev_close) & (obv[:, -1] > obv_sma)
+                out['bearish_volume'] = high_volume & (close[:, -1] < prev_close) & (obv[:, -1] < obv_sma)
+
+            # ATR Filter
+            if wanted(*ATR_COLUMNS):
+                atr_values = AIMnBatchIndicators._atr(high, low, close, params.atr_period, starts)
+                atr = atr_values[:, -1]
+                atr_ma = tail_mean(atr_values, params.atr_ma_period)
+                out['atr'] = atr
+                out['atr_ma'] = atr_ma
+                out['volatility_expanding'] = atr > (atr_ma * params.atr_multiplier)
+                out['atr_ratio'] = atr / atr_ma
+
+        return out
+
+    @staticmethod
+    def latest_rows(market_data: Dict[str, pd.DataFrame],
+                    get_params: Callable[[str], Dict],
+                    get_columns: Optional[Callable[[str], FrozenSet[str]]] = None,
+                    tail: bool = False,
+                    errors: Optional[Dict[str, Exception]] = None) -> Dict[str, Dict]:
+        '''
+        Compute indicators for every symbol and return latest-row views
+
+        Symbols are grouped by indicator parameters (and requested columns)
+        and each group is computed in one vectorized pass. If a group fails
+        (e.g. a malformed frame), its symbols are computed one at a time
+        with the single-symbol indicators instead.
+
+        Args:
+            market_data: Dictionary of OHLCV DataFrames for each symbol
+            get_params: Returns the parameter dict for a symbol
+            get_columns: Returns the columns needed for a symbol (e.g.
+                AIMnIndicatorPlanner.required_columns); all if omitted
+            tail: Latest-bar evaluation (calculate_latest) instead of full
+                indicator matrices
+            errors: If given, receives the exception of each symbol that
+                failed on its own too (left out of the result); otherwise
+                that exception is raised
+
+        Returns:
+            {symbol: {column: value}} for the latest bar, with the keys of a
+            row of calculate_all_indicators (only the requested groups)
+        '''
+        groups: Dict[tuple, List[str]] = {}
+        group_params: Dict[tuple, Dict] = {}
+        for symbol, df in market_data.items():
+            if df is None or len(df) == 0:
+                continue
+            params = get_params(symbol)
+            columns = get_columns(symbol) if get_columns is not None else None
+            key = (AIMnIndicators.params_key(params), columns)
+            groups.setdefault(key, []).append(symbol)
+            group_params.setdefault(key, params)
+
+        rows = {}
+        for key, symbols in groups.items():
+            columns = key[1]
+            try:
+                arrays = AIMnBatchIndicators.stack_ohlcv(market_data, symbols)
+                if tail:
+                    results = AIMnBatchIndicators.calculate_latest(arrays, group_params[key], columns)
+                else:
+                    results = {col: values[:, -1] for col, values in
+                               AIMnBatchIndicators.calculate(arrays, group_params[key], columns).items()}
+            except Exception:
+                for symbol in symbols:
+                    try:
+                        rows[symbol] = AIMnBatchIndicators._latest_row(
+                            market_data[symbol], group_params[key], columns, tail)
+                    except Exception as e:
+                        if errors is None:
+                            raise
+                        errors[symbol] = e
+                continue
+            for row, symbol in enumerate(symbols):
+                latest = {col: arrays[col][row, -1] for col in OHLCV}
+                for col, values in results.items():
+                    latest[col] = values[row]
+                rows[symbol] = latest
+        return rows
+
+    @staticmethod
+    def _latest_row(df: pd.DataFrame, params: Dict, columns: Optional[FrozenSet[str]],
+                    tail: bool) -> Dict:
+        '''One symbol's latest row with the single-symbol indicators (group fallback)'''
+        if tail:
+            return AIMnIndicators.calculate_latest_indicators(df, params, columns)
+        return AIMnIndicators.calculate_all_indicators(df, params).iloc[-1].to_dict()
@@ -0,0 +1,85 @@
+# benchmark_rsi_real.py
+"""
+Benchmark RSI Real backends (pandas rolling vs NumPy van Herk / Gil-Werman)
+and the fallback EMA / Wilder recursions (ewm kernel vs scalar loops)
+
+Usage: python benchmark_rsi_real.py [bars]
+"""
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+from numpy.lib.stride_tricks import sliding_window_view
+
+import indicators
+from indicators import AIMnIndicators, atr_talib, macd_talib, rolling_extreme
+
+WINDOWS = [14, 100, 500, 1000, 5000]
+
+
+def best_time(func, repeat=5):
+    """Best wall time of several runs (seconds)"""
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        times.append(time.perf_counter() - start)
+    return min(times)
+
+
+def main(bars=500_000):
+    rng = np.random.default_rng(0)
+    close = 100 + rng.standard_normal(bars).cumsum()
+    df = pd.DataFrame({
+        'high': close + rng.random(bars),
+        'low': close - rng.random(bars),
+        'close': close,
+    })
+
+    print(f"RSI Real on {bars:,} bars")
+    print(f"{'window':>8} {'pandas ms':>10} {'numpy ms':>10} {'speedup':>8}  identical")
+    for window in WINDOWS:
+        pandas_result = AIMnIndicators.calculate_rsi_real(df, window, backend='pandas')
+        numpy_result = AIMnIndicators.calculate_rsi_real(df, window, backend='numpy')
+        identical = pandas_result.equals(numpy_result)
+
+        pandas_time = best_time(lambda: AIMnIndicators.calculate_rsi_real(df, window, backend='pandas'))
+        numpy_time = best_time(lambda: AIMnIndicators.calculate_rsi_real(df, window, backend='numpy'))
+        print(f"{window:>8} {pandas_time * 1000:>10.1f} {numpy_time * 1000:>10.1f} "
+              f"{pandas_time / numpy_time:>7.1f}x  {identical}")
+
+    # (symbols x bars) matrices, as used by the batch scanner
+    highs = 100 + rng.standard_normal((50, 20_000)).cumsum(axis=1)
+    print(f"\nRolling max on {highs.shape[0]} symbols x {highs.shape[1]:,} bars")
+    print(f"{'window':>8} {'window ms':>10} {'vHGW ms':>10} {'speedup':>8}")
+    for window in WINDOWS:
+        naive_time = best_time(lambda: sliding_window_view(highs, window, axis=1).max(axis=2), repeat=2)
+        kernel_time = best_time(lambda: rolling_extreme(highs, window), repeat=2)
+        print(f"{window:>8} {naive_time * 1000:>10.1f} {kernel_time * 1000:>10.1f} "
+              f"{naive_time / kernel_time:>7.1f}x")
+
+    # MACD and ATR without TA-Lib: ewm kernel from RECURSION_KERNEL_MIN_BARS on
+    def recursions():
+        return list(macd_talib(close, 12, 26, 9)) + [atr_talib(df['high'], df['low'], close, 14)]
+
+    kernel_min_bars = indicators.RECURSION_KERNEL_MIN_BARS
+    kernel = recursions()
+    kernel_time = best_time(recursions, repeat=3)
+    indicators.RECURSION_KERNEL_MIN_BARS = bars + 1
+    try:
+        loops = recursions()
+        loop_time = best_time(recursions, repeat=3)
+    finally:
+        indicators.RECURSION_KERNEL_MIN_BARS = kernel_min_bars
+    # MACD is a difference of EMAs near zero: its error is absolute
+    macd_difference = np.nanmax(np.abs(kernel[0] - loops[0]))
+    atr_difference = np.nanmax(np.abs(kernel[3] - loops[3]) / loops[3])
+    print(f"\nMACD + ATR on {bars:,} bars")
+    print(f"{'loops ms':>10} {'kernel ms':>10} {'speedup':>8} {'MACD abs diff':>14} {'ATR rel diff':>13}")
+    print(f"{loop_time * 1000:>10.1f} {kernel_time * 1000:>10.1f} {loop_time / kernel_time:>7.1f}x "
+          f"{macd_difference:>14.1e} {atr_difference:>13.1e}")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 500_000)
@@ -0,0 +1,79 @@
+# benchmark_scan.py
+"""
+Benchmark one scanner pass in the engine's default configuration
+(INDICATOR_MODE, BATCH_SCAN, PREFILTER_SCAN and SYMBOL_PARAMS of
+aimn_crypto_config) against the other scan paths
+
+Every pass starts with an empty indicator cache, as after a new bar.
+
+Usage: python benchmark_scan.py [symbols] [bars]
+"""
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+from aimn_crypto_config import BATCH_SCAN, INDICATOR_MODE, PREFILTER_SCAN, SYMBOL_PARAMS
+from indicator_cache import AIMnIndicatorCache
+from indicators import AIMnIndicators
+from scanner import AIMnScanner
+
+
+def best_time(func, repeat=5):
+    """Best wall time of several runs (seconds)"""
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        times.append(time.perf_counter() - start)
+    return min(times)
+
+
+def sample_market(symbols, bars, seed=0):
+    """Random-walk 1-minute bars for BTC/USD, ETH/USD, ... SYM<n>/USD"""
+    rng = np.random.default_rng(seed)
+    names = list(SYMBOL_PARAMS) + [f'SYM{i}/USD' for i in range(symbols)]
+    market_data = {}
+    for symbol in names[:symbols]:
+        close = 100 + rng.standard_normal(bars).cumsum()
+        market_data[symbol] = pd.DataFrame({
+            'timestamp': pd.date_range('2024-01-01', periods=bars, freq='1min'),
+            'open': close,
+            'high': close + rng.random(bars),
+            'low': close - rng.random(bars),
+            'close': close,
+            'volume': rng.integers(1, 1000, bars).astype(float),
+        })
+    return market_data
+
+
+def main(symbols=200, bars=None):
+    if bars is None:
+        # What the engine fetches: the longest lookback plus the margin
+        bars = max(AIMnIndicators.required_lookback(params) for params in SYMBOL_PARAMS.values()) + 10
+    market_data = sample_market(symbols, bars)
+
+    configs = [
+        (f"default ({INDICATOR_MODE}, batch={BATCH_SCAN}, prefilter={PREFILTER_SCAN})",
+         INDICATOR_MODE, BATCH_SCAN, PREFILTER_SCAN),
+        ("serial tail", 'tail', False, False),
+        ("serial tail + prefilter", 'tail', False, True),
+        ("batch tail", 'tail', True, False),
+        ("batch full", 'full', True, False),
+        ("serial full", 'full', False, False),
+    ]
+    print(f"scan() of {symbols} symbols x {bars} bars")
+    print(f"{'configuration':<45} {'ms':>8} {'us/symbol':>10}")
+    for name, mode, batch, prefilter in configs:
+        def run():
+            scanner = AIMnScanner(SYMBOL_PARAMS, cache=AIMnIndicatorCache(max_mb=0),
+                                  indicator_mode=mode, prefilter=prefilter)
+            scanner.scan(market_data, k=3, batch=batch)
+        seconds = best_time(run, repeat=3)
+        print(f"{name:<45} {seconds * 1000:>8.1f} {seconds * 1e6 / symbols:>10.0f}")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 200,
+         int(sys.argv[2]) if len(sys.argv) > 2 else None)
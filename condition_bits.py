@@ -0,0 +1,179 @@
+# condition_bits.py
+'''
+AIMn Trading System - Condition Bitmasks
+Entry conditions as one small integer per symbol
+
+Each entry condition of check_entry_conditions is one bit:
+
+    bit  0 rsi_buy     1 macd_buy     2 volume_buy
+         3 rsi_sell    4 macd_sell    5 volume_sell
+         6 high_volatility
+
+BUY needs every bit of BUY_MASK, SELL every bit of SELL_MASK, so "which
+gates does a symbol miss" is side_mask & ~mask. A symbol the prefilter
+rejected has gates that were never evaluated; their bits are clear in its
+'evaluated' mask and count neither as met nor as missing. Tables keep the
+evaluated masks next to the condition masks only for scans that had such
+symbols. A scan's masks form an
+AIMnConditionTable (one uint8 per symbol), and AIMnConditionHistory keeps
+the tables of recent scans for diagnostics at one byte per symbol per scan.
+'''
+
+from collections import deque
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+CONDITION_BITS = ('rsi_buy', 'macd_buy', 'volume_buy',
+                  'rsi_sell', 'macd_sell', 'volume_sell',
+                  'high_volatility')
+BIT = {name: 1 << i for i, name in enumerate(CONDITION_BITS)}
+ALL_BITS = (1 << len(CONDITION_BITS)) - 1
+
+BUY_MASK = BIT['rsi_buy'] | BIT['macd_buy'] | BIT['volume_buy'] | BIT['high_volatility']
+SELL_MASK = BIT['rsi_sell'] | BIT['macd_sell'] | BIT['volume_sell'] | BIT['high_volatility']
+SIDE_MASK = {'buy': BUY_MASK, 'sell': SELL_MASK}
+
+# Summary labels of each side's gates, in report order
+GATE_LABELS = {
+    'buy': (('RSI', BIT['rsi_buy']), ('MACD', BIT['macd_buy']),
+            ('Volume', BIT['volume_buy']), ('ATR', BIT['high_volatility'])),
+    'sell': (('RSI', BIT['rsi_sell']), ('MACD', BIT['macd_sell']),
+             ('Volume', BIT['volume_sell']), ('ATR', BIT['high_volatility'])),
+}
+LABEL_BITS = {side: dict(labels) for side, labels in GATE_LABELS.items()}
+
+
+def encode(conditions: Dict[str, bool]) -> int:
+    '''Bitmask of a check_entry_conditions result'''
+    mask = 0
+    for name, bit in BIT.items():
+        if conditions[name]:
+            mask |= bit
+    return mask
+
+
+def decode(mask: int) -> Dict[str, bool]:
+    '''check_entry_conditions result of a bitmask'''
+    conditions = {'buy': mask & BUY_MASK == BUY_MASK, 'sell': mask & SELL_MASK == SELL_MASK}
+    conditions.update((name, bool(mask & bit)) for name, bit in BIT.items())
+    return conditions
+
+
+def missing(mask: int, side: str, evaluated: int = ALL_BITS) -> List[str]:
+    '''Labels of the side's evaluated gates ('buy' or 'sell') that a mask fails'''
+    return [label for label, bit in GATE_LABELS[side] if evaluated & bit and not mask & bit]
+
+
+def gate_bits(side: str, labels: Iterable[str]) -> int:
+    '''Bits of a side's gates given by label, e.g. gate_bits('buy', ['MACD'])'''
+    bits = 0
+    for label in labels:
+        bits |= LABEL_BITS[side][label]
+    return bits
+
+
+class AIMnConditionTable:
+    '''Condition masks of the symbols of one scan'''
+
+    __slots__ = ('time', 'symbols', 'masks', 'evaluated')
+
+    def __init__(self, time, symbols: Sequence[str], masks: np.ndarray,
+                 evaluated: Optional[np.ndarray] = None):
+        '''
+        Args:
+            masks: Condition mask of each symbol
+            evaluated: Evaluated-gate mask of each symbol, None if every
+                gate of every symbol was evaluated
+        '''
+        self.time = time
+        self.symbols = tuple(symbols)
+        self.masks = np.asarray(masks, dtype=np.uint8)
+        self.evaluated = None if evaluated is None else np.asarray(evaluated, dtype=np.uint8)
+
+    @classmethod
+    def from_summary(cls, time, summary: Dict[str, Dict]) -> 'AIMnConditionTable':
+        '''Table of the scanned symbols of a signal summary (see get_signal_summary)'''
+        ready = [(symbol, entry['conditions'], entry.get('evaluated', ALL_BITS))
+                 for symbol, entry in summary.items() if entry.get('status') == 'ready']
+        evaluated = np.fromiter((bits for _, _, bits in ready), dtype=np.uint8, count=len(ready))
+        return cls(time, [symbol for symbol, _, _ in ready],
+                   np.fromiter((mask for _, mask, _ in ready), dtype=np.uint8, count=len(ready)),
+                   None if (evaluated == ALL_BITS).all() else evaluated)
+
+    def mask(self, symbol: str) -> Optional[int]:
+        '''Mask of a symbol, None if it was not scanned'''
+        try:
+            return int(self.masks[self.symbols.index(symbol)])
+        except ValueError:
+            return None
+
+    def evaluated_mask(self, symbol: str) -> Optional[int]:
+        '''Evaluated-gate mask of a symbol, None if it was not scanned'''
+        try:
+            i = self.symbols.index(symbol)
+        except ValueError:
+            return None
+        return ALL_BITS if self.evaluated is None else int(self.evaluated[i])
+
+    def missing_exactly(self, side: str, labels: Iterable[str]) -> List[str]:
+        '''
+        Symbols that fail exactly the given gates of a side
+        missing_exactly('buy', ['MACD']): BUY setups waiting only for the MACD cross
+        Symbols with an unevaluated gate on that side never match
+        '''
+        side_mask = SIDE_MASK[side]
+        wanted = side_mask & ~gate_bits(side, labels)
+        hits = (self.masks & side_mask) == wanted
+        if self.evaluated is not None:
+            hits &= (self.evaluated & side_mask) == side_mask
+        return [self.symbols[i] for i in np.flatnonzero(hits)]
+
+    def ready(self, side: str) -> List[str]:
+        '''Symbols meeting every gate of a side'''
+        return self.missing_exactly(side, ())
+
+    def gate_counts(self, side: str) -> Dict[str, int]:
+        '''Symbols passing each gate of a side (an unevaluated gate never passes)'''
+        return {label: int(np.count_nonzero(self.masks & bit)) for label, bit in GATE_LABELS[side]}
+
+    def failure_counts(self, side: str) -> Dict[str, int]:
+        '''Symbols known to fail each gate of a side (unevaluated gates excluded)'''
+        evaluated = ALL_BITS if self.evaluated is None else self.evaluated
+        return {label: int(np.count_nonzero(evaluated & ~self.masks & bit))
+                for label, bit in GATE_LABELS[side]}
+
+
+class AIMnConditionHistory:
+    '''Rolling window of recent condition tables'''
+
+    def __init__(self, max_scans: int = 1440):
+        '''
+        Args:
+            max_scans: Tables kept (1440 = one day of 1-minute scans)
+        '''
+        self.tables: 'deque[AIMnConditionTable]' = deque(maxlen=max_scans)
+
+    def append(self, table: AIMnConditionTable):
+        '''Record a scan; an unchanged symbol list shares the previous tuple'''
+        if self.tables and self.tables[-1].symbols == table.symbols:
+            table.symbols = self.tables[-1].symbols
+        self.tables.append(table)
+
+    def series(self, symbol: str) -> List[Tuple[object, int, int]]:
+        '''
+        (scan time, mask, evaluated mask) of every recorded scan of a
+        symbol, oldest first; a gate failed in a scan only if its bit is
+        clear in mask and set in the evaluated mask
+        '''
+        series = []
+        for table in self.tables:
+            mask = table.mask(symbol)
+            if mask is not None:
+                series.append((table.time, mask, table.evaluated_mask(symbol)))
+        return series
+
+    def memory(self) -> int:
+        '''Bytes used by the recorded masks'''
+        return sum(table.masks.nbytes + (0 if table.evaluated is None else table.evaluated.nbytes)
+                   for table in self.tables)
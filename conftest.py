@@ -0,0 +1,47 @@
+# conftest.py
+"""
+Shared pytest fixtures and sample data
+"""
+import numpy as np
+import pandas as pd
+import pytest
+
+import indicators
+
+# Indicator parameters shared by the tests (short windows for short samples)
+PARAMS = {
+    'rsi_window': 30,
+    'macd_fast': 5,
+    'macd_slow': 13,
+    'macd_signal': 5,
+    'atr_period': 14,
+    'atr_ma_period': 28,
+}
+
+COLUMNS = ['rsi_real', 'macd', 'macd_signal', 'macd_histogram',
+           'macd_bullish_cross', 'macd_bearish_cross', 'obv', 'obv_sma',
+           'bullish_volume', 'bearish_volume', 'volume_ratio', 'atr', 'atr_ma',
+           'volatility_expanding', 'atr_ratio']
+
+
+def generate_sample_data(n=300, seed=0):
+    """Random-walk 1-minute OHLCV bars"""
+    rng = np.random.default_rng(seed)
+    close = np.round(100 + rng.standard_normal(n).cumsum(), 2)
+    return pd.DataFrame({
+        'timestamp': pd.date_range('2024-01-01', periods=n, freq='1min'),
+        'open': close,
+        'high': close + rng.random(n),
+        'low': close - rng.random(n),
+        'close': close,
+        'volume': rng.integers(1, 1000, n).astype(float),
+    })
+
+
+@pytest.fixture(params=[False, True], ids=['fallback', 'talib'])
+def backend(request, monkeypatch):
+    """Run a test against the pandas fallback and (if installed) TA-Lib"""
+    if request.param and not indicators.TALIB_AVAILABLE:
+        pytest.skip("TA-Lib not installed")
+    monkeypatch.setattr(indicators, 'TALIB_AVAILABLE', request.param)
+    return request.param
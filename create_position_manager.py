@@ -16,6 +16,8 @@ from datetime import datetime
 import logging
 from enum import Enum
 
+from symbol_params import AIMnSymbolParams
+
 logger = logging.getLogger(__name__)
 
 
@@ -37,7 +39,7 @@ class Position:
         self.entry_price = entry_price
         self.shares = shares
         self.entry_time = entry_time
-        self.params = params
+        self.params = AIMnSymbolParams.resolve(params)
         
         # Tracking variables
         self.highest_price = entry_price if direction == 'BUY' else None
@@ -55,7 +57,7 @@ class Position:
     
     def _calculate_stop_loss(self) -> float:
         '''Calculate initial stop loss price'''
-        stop_loss_pct = self.params.get('stop_loss_percent', 2.0)
+        stop_loss_pct = self.params.stop_loss_percent
         
         if self.direction == 'BUY':
             return self.entry_price * (1 - stop_loss_pct / 100)
@@ -110,8 +112,8 @@ class Position:
     
     def _check_early_trailing(self) -> bool:
         '''Check early trailing stop (loose)'''
-        early_start = self.params.get('early_trail_start', 1.0)
-        early_minus = self.params.get('early_trail_minus', 15.0)
+        early_start = self.params.early_trail_start
+        early_minus = self.params.early_trail_minus
         
         # Activate early trailing if profit threshold reached
         if self.unrealized_pnl_pct >= early_start and not self.early_trail_active:
@@ -133,8 +135,8 @@ class Position:
     
     def _check_peak_trailing(self) -> bool:
         '''Check peak trailing stop (tight)'''
-        peak_start = self.params.get('peak_trail_start', 5.0)
-        peak_minus = self.params.get('peak_trail_minus', 0.5)
+        peak_start = self.params.peak_trail_start
+        peak_minus = self.params.peak_trail_minus
         
         # Activate peak trailing if profit threshold reached
         if self.unrealized_pnl_pct >= peak_start and not self.peak_trail_active:
@@ -159,20 +161,21 @@ class Position:
         Check RSI exit condition (optional)
         Exit when RSI reverses with minimum profit
         '''
-        if not params.get('use_rsi_exit', True):
+        params = AIMnSymbolParams.resolve(params)
+        if not params.use_rsi_exit:
             return False
         
-        min_profit = params.get('rsi_exit_min_profit', 0.5)
+        min_profit = params.rsi_exit_min_profit
         
         if self.unrealized_pnl_pct < min_profit:
             return False
         
         if self.direction == 'BUY':
             # Exit long if RSI becomes overbought
-            return current_rsi >= params.get('rsi_overbought', 70)
+            return current_rsi >= params.rsi_overbought
         else:  # SELL
             # Exit short if RSI becomes oversold
-            return current_rsi <= params.get('rsi_oversold', 30)
+            return current_rsi <= params.rsi_oversold
 
 
 class AIMnPositionManager:
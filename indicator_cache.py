@@ -0,0 +1,149 @@
+# indicator_cache.py
+'''
+AIMn Trading System - Indicator Cache
+Shared, bounded LRU cache of indicator results
+
+Entries are keyed by (symbol, last bar timestamp, bar count, last bar
+OHLCV, parameter key), so a 30 second scan that sees no new bar reuses the
+previous result instead of recomputing it, while a revised final bar (same
+timestamp, new values, see bar_buffer) is recomputed.
+'''
+
+import sys
+from collections import OrderedDict
+from typing import Callable, Dict, Hashable, Optional
+
+import pandas as pd
+
+from indicators import AIMnIndicators
+
+
+OHLCV = ('open', 'high', 'low', 'close', 'volume')
+
+
+def _last_bar_time(df: pd.DataFrame):
+    '''Timestamp of the last bar, from a 'timestamp' column or the index'''
+    if 'timestamp' in df.columns:
+        return df['timestamp'].iloc[-1]
+    return df.index[-1]
+
+
+def _last_bar_key(df: pd.DataFrame) -> tuple:
+    '''(last bar time, bar count, last bar OHLCV): changes with a new or a revised bar'''
+    return (_last_bar_time(df), len(df),
+            tuple(float(df[column].iat[-1]) for column in OHLCV if column in df.columns))
+
+
+def _sizeof(value) -> int:
+    '''Approximate memory used by a cached value (bytes)'''
+    if isinstance(value, pd.DataFrame):
+        return AIMnIndicators.frame_memory(value)
+    if isinstance(value, dict):
+        return sys.getsizeof(value) + sum(sys.getsizeof(k) + sys.getsizeof(v)
+                                          for k, v in value.items())
+    return sys.getsizeof(value)
+
+
+class AIMnIndicatorCache:
+    '''Bounded LRU cache for indicator frames and latest-row views'''
+
+    def __init__(self, max_mb: float = 64, max_entries: Optional[int] = None,
+                 compact: bool = False):
+        '''
+        Args:
+            max_mb: Memory cap for cached values, in megabytes
+            max_entries: Optional cap on the number of entries
+            compact: Store indicator frames as float32 (see compact_indicators).
+                Applies to 'full' mode frames only: a latest-row dict holds a
+                few scalars, and numpy float32 scalars are no smaller than
+                Python floats, so 'tail' and batch rows are stored as is
+        '''
+        self.max_bytes = int(max_mb * 1024 * 1024)
+        self.max_entries = max_entries
+        self.compact = compact
+        self.entries: 'OrderedDict[Hashable, tuple]' = OrderedDict()
+        self.bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    @staticmethod
+    def make_key(symbol: str, df: pd.DataFrame, params: Dict, kind: Hashable = 'frame') -> tuple:
+        '''Cache key for a symbol's bars and indicator parameters'''
+        return (kind, symbol) + _last_bar_key(df) + (AIMnIndicators.params_key(params),)
+
+    def get(self, key: Hashable):
+        '''Return a cached value (and mark it recently used), or None'''
+        entry = self.entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+        self.entries.move_to_end(key)
+        self.hits += 1
+        return entry[0]
+
+    def put(self, key: Hashable, value):
+        '''
+        Store a value, evicting least recently used entries over the caps
+        Returns the value as stored (frames compacted if the cache is compact)
+        '''
+        if self.compact and isinstance(value, pd.DataFrame):
+            value = AIMnIndicators.compact_indicators(value)
+        size = _sizeof(value)
+        if size > self.max_bytes:
+            return value
+        old = self.entries.pop(key, None)
+        if old is not None:
+            self.bytes -= old[1]
+        self.entries[key] = (value, size)
+        self.bytes += size
+
+        while self.entries and (self.bytes > self.max_bytes or
+                                (self.max_entries and len(self.entries) > self.max_entries)):
+            _, (_, evicted_size) = self.entries.popitem(last=False)
+            self.bytes -= evicted_size
+            self.evictions += 1
+        return value
+
+    def get_or_compute(self, key: Hashable, compute: Callable):
+        '''Return the cached value for key, computing and storing it on a miss'''
+        value = self.get(key)
+        if value is None:
+            value = self.put(key, compute())
+        return value
+
+    def calculate_all_indicators(self, symbol: str, df: pd.DataFrame, params: Dict) -> pd.DataFrame:
+        '''Cached AIMnIndicators.calculate_all_indicators'''
+        key = self.make_key(symbol, df, params)
+        return self.get_or_compute(
+            key, lambda: AIMnIndicators.calculate_all_indicators(df, params))
+
+    def clear(self):
+        '''Drop all entries (counters are kept)'''
+        self.entries.clear()
+        self.bytes = 0
+
+    def memory_by_symbol(self) -> Dict[str, float]:
+        '''Cached memory per symbol (keys from make_key), in megabytes, largest first'''
+        usage: Dict[str, int] = {}
+        for key, (_, size) in self.entries.items():
+            usage[key[1]] = usage.get(key[1], 0) + size
+        return {symbol: size / (1024 * 1024)
+                for symbol, size in sorted(usage.items(), key=lambda x: x[1], reverse=True)}
+    
+    def stats(self) -> Dict:
+        '''Hit/miss counters and memory use'''
+        lookups = self.hits + self.misses
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': (self.hits / lookups * 100) if lookups > 0 else 0,
+            'evictions': self.evictions,
+            'entries': len(self.entries),
+            'memory_mb': self.bytes / (1024 * 1024),
+            'max_mb': self.max_bytes / (1024 * 1024)
+        }
+
+
+# Shared cache used by the scanner and the trading engine
+indicator_cache = AIMnIndicatorCache()
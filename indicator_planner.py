@@ -0,0 +1,210 @@
+# indicator_planner.py
+'''
+AIMn Trading System - Indicator Planner
+Computes only the indicators that enabled conditions and exit rules read
+
+Every indicator is a node in a small dependency graph. Entry conditions
+and exit rules declare the columns they need; the planner resolves the
+required subgraph once per parameter set and evaluates it with shared
+intermediates (previous close, MACD lines, volume SMA), so an
+indicator nobody consumes is never calculated.
+
+Node formulas are the same pandas/TA-Lib calls as calculate_all_indicators,
+so planned columns are identical to the full calculation.
+'''
+
+from typing import Callable, Dict, FrozenSet, Iterable, List, Optional, Tuple
+
+import pandas as pd
+
+import indicators
+from indicators import AIMnIndicators
+from symbol_params import AIMnSymbolParams
+
+
+# Columns read by each entry condition, its scoring component and the
+# scanner's opportunity report
+CONDITION_COLUMNS = {
+    'rsi': ('rsi_real',),
+    'macd': ('macd', 'macd_signal', 'macd_bullish_cross', 'macd_bearish_cross'),
+    'volume': ('volume_ratio', 'obv', 'obv_sma'),
+    'atr': ('atr_ratio',),
+}
+
+# Columns read by each exit rule
+EXIT_COLUMNS = {
+    'rsi_exit': ('rsi_real',),
+}
+
+
+def enabled_conditions(params: Dict) -> List[str]:
+    '''Entry conditions that are switched on for a parameter set'''
+    params = AIMnSymbolParams.resolve(params)
+    conditions = ['rsi', 'macd']
+    if params.volume_confirmation:
+        conditions.append('volume')
+    if params.atr_filter:
+        conditions.append('atr')
+    return conditions
+
+
+def enabled_exit_rules(params: Dict) -> List[str]:
+    '''Exit rules that are switched on for a parameter set'''
+    params = AIMnSymbolParams.resolve(params)
+    return ['rsi_exit'] if params.use_rsi_exit else []
+
+
+class _Node:
+    '''One indicator (or shared intermediate) in the graph'''
+
+    __slots__ = ('name', 'deps', 'compute', 'output')
+
+    def __init__(self, name: str, deps: Tuple[str, ...], compute: Callable, output: bool = True):
+        self.name = name
+        self.deps = deps
+        self.compute = compute  # compute(df, params, values) -> Series
+        self.output = output    # False for intermediates that are not added as columns
+
+
+def _macd_lines(df, params, values):
+    fast = params.macd_fast
+    slow = params.macd_slow
+    signal = params.macd_signal
+    if indicators.TALIB_AVAILABLE:
+        macd, macd_signal, _ = indicators.talib.MACD(df['close'], fastperiod=fast,
+                                                     slowperiod=slow, signalperiod=signal)
+    else:
+        macd, macd_signal, _ = indicators.macd_talib(df['close'], fast, slow, signal)
+        macd = pd.Series(macd, index=df.index)
+        macd_signal = pd.Series(macd_signal, index=df.index)
+    return macd, macd_signal
+
+
+def _obv(df, params, values):
+    if indicators.TALIB_AVAILABLE:
+        return indicators.talib.OBV(df['close'], df['volume'])
+    return pd.Series(indicators.obv_talib(df['close'], df['volume']), index=df.index)
+
+
+def _atr(df, params, values):
+    atr_period = params.atr_period
+    if indicators.TALIB_AVAILABLE:
+        return indicators.talib.ATR(df['high'], df['low'], df['close'], timeperiod=atr_period)
+    return pd.Series(indicators.atr_talib(df['high'], df['low'], df['close'], atr_period),
+                     index=df.index)
+
+
+def _macd_cross(values, bullish: bool):
+    macd, macd_signal = values['macd_lines']
+    macd_prev = macd.shift(1)
+    signal_prev = macd_signal.shift(1)
+    if bullish:
+        return (macd_prev <= signal_prev) & (macd > macd_signal)
+    return (macd_prev >= signal_prev) & (macd < macd_signal)
+
+
+INDICATOR_GRAPH: Dict[str, _Node] = {node.name: node for node in [
+    # Shared intermediates
+    _Node('prev_close', (), lambda df, p, v: df['close'].shift(1), output=False),
+    _Node('macd_lines', (), _macd_lines, output=False),
+    _Node('volume_sma', (), lambda df, p, v: df['volume'].rolling(window=20).mean(), output=False),
+
+    # RSI Real
+    _Node('rsi_real', (), lambda df, p, v: AIMnIndicators.calculate_rsi_real(df, p.rsi_window)),
+
+    # MACD
+    _Node('macd', ('macd_lines',), lambda df, p, v: v['macd_lines'][0]),
+    _Node('macd_signal', ('macd_lines',), lambda df, p, v: v['macd_lines'][1]),
+    _Node('macd_histogram', ('macd_lines',), lambda df, p, v: v['macd_lines'][0] - v['macd_lines'][1]),
+    _Node('macd_bullish_cross', ('macd_lines',), lambda df, p, v: _macd_cross(v, bullish=True)),
+    _Node('macd_bearish_cross', ('macd_lines',), lambda df, p, v: _macd_cross(v, bullish=False)),
+
+    # Volume
+    _Node('obv', (), _obv),
+    _Node('obv_sma', ('obv',), lambda df, p, v: v['obv'].rolling(window=p.obv_period).mean()),
+    _Node('volume_ratio', ('volume_sma',), lambda df, p, v: df['volume'] / v['volume_sma']),
+    _Node('bullish_volume', ('volume_sma', 'prev_close', 'obv', 'obv_sma'),
+          lambda df, p, v: ((df['volume'] > v['volume_sma']) & (df['close'] > v['prev_close']) &
+                            (v['obv'] > v['obv_sma']))),
+    _Node('bearish_volume', ('volume_sma', 'prev_close', 'obv', 'obv_sma'),
+          lambda df, p, v: ((df['volume'] > v['volume_sma']) & (df['close'] < v['prev_close']) &
+                            (v['obv'] < v['obv_sma']))),
+
+    # ATR Filter
+    _Node('atr', (), _atr),
+    _Node('atr_ma', ('atr',), lambda df, p, v: v['atr'].rolling(window=p.atr_ma_period).mean()),
+    _Node('atr_ratio', ('atr', 'atr_ma'), lambda df, p, v: v['atr'] / v['atr_ma']),
+    _Node('volatility_expanding', ('atr', 'atr_ma'),
+          lambda df, p, v: v['atr'] > (v['atr_ma'] * p.atr_multiplier)),
+]}
+
+
+class AIMnIndicatorPlanner:
+    '''Resolves and evaluates the indicator subgraph a strategy actually needs'''
+
+    def __init__(self, graph: Optional[Dict[str, _Node]] = None):
+        self.graph = graph if graph is not None else INDICATOR_GRAPH
+        self._plans: Dict[FrozenSet[str], List[str]] = {}
+
+    @staticmethod
+    def required_columns(params: Dict) -> FrozenSet[str]:
+        '''Columns read by the enabled entry conditions and exit rules'''
+        columns = set()
+        for condition in enabled_conditions(params):
+            columns.update(CONDITION_COLUMNS[condition])
+        for rule in enabled_exit_rules(params):
+            columns.update(EXIT_COLUMNS[rule])
+        return frozenset(columns)
+
+    def plan(self, columns: Iterable[str]) -> List[str]:
+        '''
+        Nodes to evaluate (dependencies first) for the requested columns
+        Plans are memoized per column set
+        '''
+        columns = frozenset(columns)
+        order = self._plans.get(columns)
+        if order is not None:
+            return order
+
+        order = []
+        seen = set()
+
+        def visit(name: str):
+            if name in seen:
+                return
+            if name not in self.graph:
+                raise KeyError(f"Unknown indicator column: {name}")
+            seen.add(name)
+            for dep in self.graph[name].deps:
+                visit(dep)
+            order.append(name)
+
+        for name in sorted(columns):
+            visit(name)
+        self._plans[columns] = order
+        return order
+
+    def compute(self, df: pd.DataFrame, params: Dict,
+                columns: Optional[Iterable[str]] = None) -> pd.DataFrame:
+        '''
+        Add only the requested indicator columns (and nothing they don't need)
+
+        Args:
+            df: OHLCV DataFrame
+            params: Symbol parameters
+            columns: Columns to add (defaults to required_columns(params))
+        '''
+        params = AIMnSymbolParams.resolve(params)
+        if columns is None:
+            columns = self.required_columns(params)
+        columns = frozenset(columns)
+
+        values: Dict[str, object] = {}
+        for name in self.plan(columns):
+            values[name] = self.graph[name].compute(df, params, values)
+
+        df = df.copy()
+        for name in self.plan(columns):
+            if name in columns and self.graph[name].output:
+                df[name] = values[name]
+        return df
@@ -0,0 +1,509 @@
+# indicator_stream.py
+'''
+AIMn Trading System - Streaming Indicators
+Keeps per-symbol indicator state and updates it one bar at a time
+
+Every update is O(1) (amortized for the rolling max/min), and the values
+reproduce AIMnIndicators.calculate_all_indicators run over the same bars:
+
+    fallback backend   bit-for-bit below RECURSION_KERNEL_MIN_BARS bars.
+                       From there on batch MACD and ATR run in pandas' ewm
+                       kernel: the MACD and ATR columns and atr_ratio agree
+                       to within a few ulps (1e-12 relative, or absolute
+                       near zero), so a cross or expansion flag can differ
+                       only on a near-exact tie; the RSI Real, OBV and
+                       volume columns stay bit-for-bit
+    TA-Lib             to the last bit of rounding (its compiled MACD signal
+                       and ATR loops use fused multiply-add)
+'''
+
+import math
+from collections import deque
+from typing import Dict, Optional
+
+import pandas as pd
+
+from indicators import AIMnIndicators
+from symbol_params import AIMnSymbolParams
+
+NAN = float('nan')
+
+
+def _divide(a: float, b: float) -> float:
+    '''Division with pandas semantics (x/0 -> +/-inf, 0/0 -> NaN)'''
+    try:
+        return a / b
+    except ZeroDivisionError:
+        if a == 0 or a != a:
+            return NAN
+        return math.copysign(math.inf, a) * math.copysign(1.0, b)
+
+
+def _bar(opens, highs, lows, closes, volumes, i: int) -> tuple:
+    '''OHLCV values of bar i, as compared to detect a revised bar'''
+    return (float(opens[i]), float(highs[i]), float(lows[i]), float(closes[i]), float(volumes[i]))
+
+
+def _clone(value):
+    '''
+    Copy of a piece of stream state: containers and state objects are
+    copied, numbers shared (the EMA/ATR seed lists are None once warmed up,
+    so state objects copy in O(1))
+    '''
+    if isinstance(value, (list, deque)):
+        return value.copy()
+    slots = getattr(type(value), '__slots__', None)
+    if slots is None:
+        return value
+    clone = object.__new__(type(value))
+    for name in slots:
+        setattr(clone, name, _clone(getattr(value, name)))
+    return clone
+
+
+class _RollingExtreme:
+    '''Rolling max or min over a fixed window using a monotonic deque'''
+
+    __slots__ = ('window', 'is_max', 'items', 'count', 'undo')
+
+    def __init__(self, window: int, is_max: bool):
+        self.window = window
+        self.is_max = is_max
+        self.items = deque()  # (bar index, value), monotonic in value
+        self.count = 0
+        self.undo = None  # (items popped from the right, item expired on the left) by the last push
+
+    def push(self, value: float) -> float:
+        index = self.count
+        self.count += 1
+
+        items = self.items
+        popped = []
+        if self.is_max:
+            while items and items[-1][1] <= value:
+                popped.append(items.pop())
+        else:
+            while items and items[-1][1] >= value:
+                popped.append(items.pop())
+        items.append((index, value))
+
+        expired = None
+        if items[0][0] <= index - self.window:
+            expired = items.popleft()
+        self.undo = (popped, expired)
+
+        if self.count < self.window:
+            return NAN
+        return items[0][1]
+
+    def revert(self):
+        '''Undo the last push (amortized O(1))'''
+        popped, expired = self.undo
+        items = self.items
+        if expired is not None:
+            items.appendleft(expired)
+        items.pop()
+        items.extend(reversed(popped))
+        self.count -= 1
+        self.undo = None
+
+
+class _RollingMean:
+    '''
+    Rolling mean over a fixed window
+    Uses the same compensated add/remove scheme as pandas rolling().mean(),
+    so the output is bit-for-bit identical to the batch calculation
+    '''
+
+    __slots__ = ('window', 'values', 'nobs', 'sum_x', 'neg_ct',
+                 'comp_add', 'comp_remove', 'num_same', 'prev_value', 'undo')
+
+    def __init__(self, window: int):
+        self.window = window
+        self.values = deque()
+        self.nobs = 0
+        self.sum_x = 0.0
+        self.neg_ct = 0
+        self.comp_add = 0.0
+        self.comp_remove = 0.0
+        self.num_same = 0
+        self.prev_value = None
+        self.undo = None  # (running state, window was full, value dropped) before the last push
+
+    def _add(self, value: float):
+        if value == value:
+            self.nobs += 1
+            y = value - self.comp_add
+            t = self.sum_x + y
+            self.comp_add = t - self.sum_x - y
+            self.sum_x = t
+            if math.copysign(1.0, value) < 0:
+                self.neg_ct += 1
+            if value == self.prev_value:
+                self.num_same += 1
+            else:
+                self.num_same = 1
+            self.prev_value = value
+
+    def _remove(self, value: float):
+        if value == value:
+            self.nobs -= 1
+            y = -value - self.comp_remove
+            t = self.sum_x + y
+            self.comp_remove = t - self.sum_x - y
+            self.sum_x = t
+            if math.copysign(1.0, value) < 0:
+                self.neg_ct -= 1
+
+    def push(self, value: float) -> float:
+        state = (self.nobs, self.sum_x, self.neg_ct, self.comp_add,
+                 self.comp_remove, self.num_same, self.prev_value)
+        if self.prev_value is None:
+            self.prev_value = value
+
+        full = len(self.values) == self.window
+        dropped = self.values.popleft() if full else None
+        if full:
+            self._remove(dropped)
+        self.values.append(value)
+        self._add(value)
+        self.undo = (state, full, dropped)
+
+        if self.nobs < self.window or self.nobs == 0:
+            return NAN
+        result = self.sum_x / self.nobs
+        if self.num_same >= self.nobs:
+            result = self.prev_value
+        elif self.neg_ct == 0 and result < 0:
+            result = 0.0
+        elif self.neg_ct == self.nobs and result > 0:
+            result = 0.0
+        return result
+
+    def revert(self):
+        '''Undo the last push (O(1))'''
+        state, full, dropped = self.undo
+        (self.nobs, self.sum_x, self.neg_ct, self.comp_add,
+         self.comp_remove, self.num_same, self.prev_value) = state
+        self.values.pop()
+        if full:
+            self.values.appendleft(dropped)
+        self.undo = None
+
+
+class _TalibEMA:
+    '''EMA matching TA-Lib: seeded with the SMA of the first `period` inputs'''
+
+    __slots__ = ('period', 'k', 'seed', 'value')
+
+    def __init__(self, period: int):
+        self.period = period
+        self.k = 2.0 / (period + 1)
+        self.seed = []
+        self.value = None
+
+    def seed_from(self, values):
+        '''Seed directly from the last `period` values (used by MACD's fast EMA)'''
+        total = 0.0
+        for v in values[-self.period:]:
+            total += v
+        self.value = total / self.period
+        self.seed = None
+
+    def push(self, value: float) -> float:
+        if self.value is None:
+            self.seed.append(value)
+            if len(self.seed) < self.period:
+                return NAN
+            self.seed_from(self.seed)
+            return self.value
+        self.value = ((value - self.value) * self.k) + self.value
+        return self.value
+
+
+class _TalibMACD:
+    '''MACD matching talib.MACD, including its NaN lookback'''
+
+    __slots__ = ('slow', 'closes', 'fast_ema', 'slow_ema', 'signal_ema')
+
+    def __init__(self, fast: int, slow: int, signal: int):
+        if slow < fast:
+            fast, slow = slow, fast
+        self.slow = slow
+        self.closes = []
+        self.fast_ema = _TalibEMA(fast)
+        self.slow_ema = _TalibEMA(slow)
+        self.signal_ema = _TalibEMA(signal)
+
+    def push(self, close: float):
+        slow_value = self.slow_ema.push(close)
+        if self.closes is not None:
+            # TA-Lib seeds the fast EMA on the bars ending where the slow one starts
+            self.closes.append(close)
+            if len(self.closes) < self.slow:
+                return NAN, NAN
+            self.fast_ema.seed_from(self.closes)
+            self.closes = None
+            fast_value = self.fast_ema.value
+        else:
+            fast_value = self.fast_ema.push(close)
+
+        macd = fast_value - slow_value
+        signal = self.signal_ema.push(macd)
+        if signal != signal:
+            return NAN, NAN
+        return macd, signal
+
+
+class _TalibATR:
+    '''Wilder ATR matching talib.ATR'''
+
+    __slots__ = ('period', 'seed', 'value')
+
+    def __init__(self, period: int):
+        self.period = period
+        self.seed = []
+        self.value = None
+
+    def push(self, true_range: float) -> float:
+        if self.value is None:
+            # TA-Lib skips the first bar, which has no previous close
+            if true_range == true_range:
+                self.seed.append(true_range)
+            if len(self.seed) < self.period:
+                return NAN
+            total = 0.0
+            for tr in self.seed:
+                total += tr
+            self.value = total / self.period
+            self.seed = None
+            return self.value
+        value = self.value * (self.period - 1)
+        value += true_range
+        self.value = value / self.period
+        return self.value
+
+
+# Stream attributes that undo their own last push, and the recursion state
+# objects a checkpoint copies (plain values are shared)
+_ROLLING = ('highest_high', 'lowest_low', 'obv_sma', 'volume_sma', 'atr_ma')
+_RECURSIONS = ('macd', 'atr')
+
+
+class AIMnIndicatorStream:
+    '''Incremental indicator state for a single symbol'''
+
+    def __init__(self, params: Dict):
+        '''
+        Args:
+            params: Symbol parameters (same keys as calculate_all_indicators)
+        '''
+        params = AIMnSymbolParams.resolve(params)
+        self.params_key = AIMnIndicators.params_key(params)
+
+        rsi_window = params.rsi_window
+        macd_fast = params.macd_fast
+        macd_slow = params.macd_slow
+        macd_signal = params.macd_signal
+        obv_period = params.obv_period
+        atr_period = params.atr_period
+        atr_ma_period = params.atr_ma_period
+        self.atr_multiplier = params.atr_multiplier
+
+        # RSI Real
+        self.highest_high = _RollingExtreme(rsi_window, is_max=True)
+        self.lowest_low = _RollingExtreme(rsi_window, is_max=False)
+
+        # MACD
+        self.macd = _TalibMACD(macd_fast, macd_slow, macd_signal)
+        self.prev_macd = NAN
+        self.prev_signal = NAN
+
+        # Volume
+        self.obv = None
+        self.obv_sma = _RollingMean(obv_period)
+        self.volume_sma = _RollingMean(20)
+
+        # ATR
+        self.atr = _TalibATR(atr_period)
+        self.atr_ma = _RollingMean(atr_ma_period)
+
+        self.prev_close = None
+        self.bars = 0
+        self.last_time = None
+        self.last_bar = None  # (open, high, low, close, volume) pushed at last_time
+        self.latest = None
+
+    def checkpoint(self) -> Dict:
+        '''
+        State to revert the next update to, in O(1): the rolling windows
+        undo their last push themselves, the recursion state is copied
+        '''
+        checkpoint = {name: value for name, value in self.__dict__.items() if name not in _ROLLING}
+        for name in _RECURSIONS:
+            checkpoint[name] = _clone(checkpoint[name])
+        return checkpoint
+
+    def revert(self, checkpoint: Dict):
+        '''Undo the update made since checkpoint() (only the last one)'''
+        for name in _ROLLING:
+            getattr(self, name).revert()
+        self.__dict__.update(checkpoint)
+
+    def update(self, open_: float, high: float, low: float, close: float,
+               volume: float) -> Dict:
+        '''
+        Push one new bar and return the indicator values for it
+        Keys match the columns added by calculate_all_indicators
+        '''
+        open_ = float(open_)
+        high = float(high)
+        low = float(low)
+        close = float(close)
+        volume = float(volume)
+        prev_close = self.prev_close
+
+        # RSI Real
+        highest_high = self.highest_high.push(high)
+        lowest_low = self.lowest_low.push(low)
+        price_range = highest_high - lowest_low
+        if price_range == 0:
+            price_range = 1
+        rsi_real = ((close - lowest_low) / price_range) * 100
+
+        # MACD
+        macd, macd_signal = self.macd.push(close)
+        bullish_cross = self.prev_macd <= self.prev_signal and macd > macd_signal
+        bearish_cross = self.prev_macd >= self.prev_signal and macd < macd_signal
+        self.prev_macd = macd
+        self.prev_signal = macd_signal
+
+        # Volume
+        if self.obv is None:
+            self.obv = volume
+        elif close > prev_close:
+            self.obv += volume
+        elif close < prev_close:
+            self.obv -= volume
+        obv = self.obv
+        obv_sma = self.obv_sma.push(obv)
+        volume_sma = self.volume_sma.push(volume)
+        high_volume = volume > volume_sma
+        price_up = prev_close is not None and close > prev_close
+        price_down = prev_close is not None and close < prev_close
+
+        # ATR
+        if prev_close is None:
+            true_range = NAN
+        else:
+            true_range = max(high - low, abs(high - prev_close), abs(low - prev_close))
+        atr = self.atr.push(true_range)
+        atr_ma = self.atr_ma.push(atr)
+
+        self.prev_close = close
+        self.bars += 1
+        self.latest = {
+            'open': open_,
+            'high': high,
+            'low': low,
+            'close': close,
+            'volume': volume,
+            'rsi_real': rsi_real,
+            'macd': macd,
+            'macd_signal': macd_signal,
+            'macd_histogram': macd - macd_signal,
+            'macd_bullish_cross': bullish_cross,
+            'macd_bearish_cross': bearish_cross,
+            'obv': obv,
+            'obv_sma': obv_sma,
+            'bullish_volume': high_volume and price_up and obv > obv_sma,
+            'bearish_volume': high_volume and price_down and obv < obv_sma,
+            'volume_ratio': _divide(volume, volume_sma),
+            'atr': atr,
+            'atr_ma': atr_ma,
+            'volatility_expanding': atr > (atr_ma * self.atr_multiplier),
+            'atr_ratio': _divide(atr, atr_ma),
+        }
+        return self.latest
+
+
+def _bar_times(df: pd.DataFrame) -> pd.Index:
+    '''Bar timestamps, from a 'timestamp' column or the index'''
+    if 'timestamp' in df.columns:
+        return pd.Index(df['timestamp'])
+    return df.index
+
+
+class AIMnStreamingIndicators:
+    '''
+    Per-symbol streaming indicator engine
+
+    Feed it the same bar frames the engine already fetches each cycle; only
+    bars newer than the last one seen are pushed through the indicator state.
+    '''
+
+    def __init__(self):
+        self.streams: Dict[str, AIMnIndicatorStream] = {}
+        # Stream state before its last bar, to re-push a revised last bar
+        self.checkpoints: Dict[str, Dict] = {}
+
+    def reset(self, symbol: Optional[str] = None):
+        '''Drop state for one symbol (or all of them)'''
+        if symbol is None:
+            self.streams.clear()
+            self.checkpoints.clear()
+        else:
+            self.streams.pop(symbol, None)
+            self.checkpoints.pop(symbol, None)
+
+    def update_from_frame(self, symbol: str, df: pd.DataFrame, params: Dict) -> Optional[Dict]:
+        '''
+        Bring a symbol's stream up to date with an OHLCV frame
+
+        The stream is rebuilt from the frame when it is new, when the
+        indicator parameters changed, or when the frame no longer overlaps
+        the bars already seen (a gap in the data). A last bar revised in place
+        (same timestamp, new values, see bar_buffer) is undone and pushed
+        again (see AIMnIndicatorStream.checkpoint).
+
+        Returns:
+            Latest indicator values, or None if the frame is empty
+        '''
+        if df is None or len(df) == 0:
+            return None
+
+        times = _bar_times(df)
+        stream = self.streams.get(symbol)
+
+        if (stream is None
+                or stream.params_key != AIMnIndicators.params_key(params)
+                or stream.last_time is None
+                or times[0] > stream.last_time):
+            stream = AIMnIndicatorStream(params)
+            self.streams[symbol] = stream
+            start = 0
+        else:
+            start = int(times.searchsorted(stream.last_time, side='right'))
+
+        opens = df['open'].to_numpy()
+        highs = df['high'].to_numpy()
+        lows = df['low'].to_numpy()
+        closes = df['close'].to_numpy()
+        volumes = df['volume'].to_numpy()
+
+        previous = start - 1
+        if (previous >= 0 and times[previous] == stream.last_time
+                and _bar(opens, highs, lows, closes, volumes, previous) != stream.last_bar):
+            stream.revert(self.checkpoints.pop(symbol))
+            start = previous
+
+        if start < len(df):
+            last = len(df) - 1
+            for i in range(start, last):
+                stream.update(opens[i], highs[i], lows[i], closes[i], volumes[i])
+            self.checkpoints[symbol] = stream.checkpoint()
+            stream.update(opens[last], highs[last], lows[last], closes[last], volumes[last])
+            stream.last_time = times[-1]
+            stream.last_bar = _bar(opens, highs, lows, closes, volumes, last)
+
+        return stream.latest
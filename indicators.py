@@ -4,9 +4,13 @@ AIMn Trading System - Technical Indicators
 All indicators match the Pine Script logic exactly
 '''
 
+import math
+
 import pandas as pd
 import numpy as np
-from typing import Dict, Tuple, Optional
+from typing import Dict, Iterable, Tuple, Optional
+
+from symbol_params import AIMnSymbolParams
 
 # Note: You'll need to install TA-Lib separately
 # For Windows: pip install TA-Lib-0.4.24-cp312-cp312-win_amd64.whl
@@ -20,19 +24,283 @@ except ImportError:
     TALIB_AVAILABLE = False
 
 
+# Relative error bound of compact (float32) indicator values vs float64:
+# round-to-nearest float32 keeps 24 significant bits
+COMPACT_RTOL = 2.0 ** -24
+
+# Columns added by calculate_all_indicators, in order
+INDICATOR_COLUMNS = ('rsi_real', 'macd', 'macd_signal', 'macd_histogram',
+                     'macd_bullish_cross', 'macd_bearish_cross',
+                     'obv', 'obv_sma', 'bullish_volume', 'bearish_volume', 'volume_ratio',
+                     'atr', 'atr_ma', 'volatility_expanding', 'atr_ratio')
+SIGNAL_COLUMNS = frozenset(['macd_bullish_cross', 'macd_bearish_cross', 'bullish_volume',
+                            'bearish_volume', 'volatility_expanding'])
+
+# Default RSI Real backend: 'pandas' (rolling max/min) or 'numpy' (rolling_extreme)
+RSI_REAL_BACKEND = 'pandas'
+
+
+def rolling_extreme(values, window: int, is_max: bool = True) -> np.ndarray:
+    '''
+    Rolling max/min along the last axis (van Herk / Gil-Werman)
+    
+    The bars are split into blocks of `window`; every window spans the suffix
+    of one block and the prefix of the next, so each output is the max/min of
+    two running accumulations. Cost is O(n) whatever the window length.
+    Matches pandas rolling(window).max()/min() exactly, including NaN until
+    the window is full and NaN for any window that contains a NaN.
+    '''
+    values = np.asarray(values, dtype=float)
+    n = values.shape[-1]
+    out = np.full(values.shape, np.nan)
+    if window < 1 or n < window:
+        return out
+    
+    op = np.maximum if is_max else np.minimum
+    fill = -np.inf if is_max else np.inf
+    pad = (-n) % window
+    padded = np.concatenate([values, np.full(values.shape[:-1] + (pad,), fill)], axis=-1)
+    blocks = padded.reshape(values.shape[:-1] + (-1, window))
+    prefix = op.accumulate(blocks, axis=-1).reshape(padded.shape)
+    suffix = op.accumulate(blocks[..., ::-1], axis=-1)[..., ::-1].reshape(padded.shape)
+    out[..., window - 1:] = op(suffix[..., :n - window + 1], prefix[..., window - 1:n])
+    return out
+
+
+# Above this many bars rolling_mean hands over to pandas' compiled
+# kernels (same values); below it the scalar loops avoid the Series overhead
+SCALAR_KERNEL_MAX_BARS = 192
+
+# From this many bars on, the EMA and Wilder recursions run in pandas'
+# compiled ewm kernel, which rounds each step differently from the scalar
+# loops: EMA and ATR values agree to within a few ulps (relative 1e-14),
+# MACD (a difference of EMAs) to the same error relative to price. Shorter
+# series keep the loops, which are faster there. Against TA-Lib the loops
+# give the same EMA and OBV bit-for-bit; MACD and ATR can differ in the
+# last bit where TA-Lib's build fuses a step's multiply-add (FMA).
+# benchmark_rsi_real.py times both paths and reports the differences.
+RECURSION_KERNEL_MIN_BARS = 768
+
+
+def rolling_mean(values, window: int, out: Optional[np.ndarray] = None) -> np.ndarray:
+    '''
+    Rolling mean of a 1-D array, bit-for-bit equal to pandas rolling().mean()
+    (same compensated add/remove running sum), written into out if given
+    '''
+    values = np.asarray(values, dtype=float)
+    if out is None:
+        out = np.empty(len(values))
+    if len(values) > SCALAR_KERNEL_MAX_BARS:
+        out[:] = pd.Series(values).rolling(window=window).mean().to_numpy()
+        return out
+    nan = float('nan')
+    nobs = neg_ct = num_same = 0
+    sum_x = comp_add = comp_remove = 0.0
+    data = values.tolist()
+    prev_value = data[0] if data else nan
+    
+    for t, value in enumerate(data):
+        if t >= window:
+            old = data[t - window]
+            if old == old:
+                nobs -= 1
+                y = -old - comp_remove
+                total = sum_x + y
+                comp_remove = total - sum_x - y
+                sum_x = total
+                if math.copysign(1.0, old) < 0:
+                    neg_ct -= 1
+        if value == value:
+            nobs += 1
+            y = value - comp_add
+            total = sum_x + y
+            comp_add = total - sum_x - y
+            sum_x = total
+            if math.copysign(1.0, value) < 0:
+                neg_ct += 1
+            num_same = num_same + 1 if value == prev_value else 1
+            prev_value = value
+        
+        if nobs < window or nobs == 0:
+            out[t] = nan
+        elif num_same >= nobs:
+            out[t] = prev_value
+        else:
+            result = sum_x / nobs
+            if (neg_ct == 0 and result < 0) or (neg_ct == nobs and result > 0):
+                result = 0.0
+            out[t] = result
+    return out
+
+
+def _recursion(seed: float, values: np.ndarray, alpha: float) -> np.ndarray:
+    '''
+    seed, then y = (1 - alpha) * y + alpha * value over values (pandas ewm
+    kernel; equal to the scalar loops to within a few ulps)
+    '''
+    return pd.Series(np.concatenate(([seed], values))).ewm(alpha=alpha, adjust=False).mean().to_numpy()
+
+
+def _first_valid(values: np.ndarray) -> int:
+    '''Index of the first non-NaN value (len(values) if there is none)'''
+    valid = np.flatnonzero(values == values)
+    return int(valid[0]) if len(valid) else len(values)
+
+
+def ema_talib(values, period: int, seed_end: Optional[int] = None,
+              out: Optional[np.ndarray] = None) -> np.ndarray:
+    '''
+    EMA with TA-Lib semantics, written into out if given
+    
+    NaN until seed_end, which holds the SMA of the `period` values ending
+    there (by default the first full window); then
+    ema = (value - ema) * k + ema with k = 2 / (period + 1).
+    '''
+    values = np.asarray(values, dtype=float)
+    n = len(values)
+    if out is None:
+        out = np.empty(n)
+    if seed_end is None:
+        seed_end = _first_valid(values) + period - 1
+    out[:min(seed_end, n)] = np.nan
+    if seed_end >= n:
+        return out
+    
+    k = 2.0 / (period + 1)
+    ema = 0.0
+    for value in values[seed_end - period + 1:seed_end + 1].tolist():
+        ema += value
+    ema /= period
+    rest = values[seed_end + 1:]
+    if len(rest) >= RECURSION_KERNEL_MIN_BARS and not np.isnan(rest).any():
+        out[seed_end:] = _recursion(ema, rest, k)
+        return out
+    result = [ema]
+    for value in rest.tolist():
+        ema = (value - ema) * k + ema
+        result.append(ema)
+    out[seed_end:] = result
+    return out
+
+
+def macd_talib(close, fast: int = 12, slow: int = 26, signal: int = 9,
+               out: Optional[Tuple[np.ndarray, np.ndarray, np.ndarray]] = None):
+    '''
+    MACD line, signal and histogram with TA-Lib semantics
+    
+    Both EMAs are seeded on the bar where the slow EMA has its first full
+    window, the signal EMA on the MACD values from there, and all three
+    outputs are NaN until the signal has a value (like talib.MACD).
+    '''
+    close = np.asarray(close, dtype=float)
+    n = len(close)
+    if out is None:
+        out = (np.empty(n), np.empty(n), np.empty(n))
+    macd, macd_signal, macd_hist = out
+    if slow < fast:
+        fast, slow = slow, fast
+    
+    first = _first_valid(close) + slow - 1
+    ema_talib(close, fast, seed_end=first, out=macd)
+    np.subtract(macd, ema_talib(close, slow, seed_end=first), out=macd)
+    ema_talib(macd, signal, seed_end=first + signal - 1, out=macd_signal)
+    macd[:min(first + signal - 1, n)] = np.nan
+    np.subtract(macd, macd_signal, out=macd_hist)
+    return macd, macd_signal, macd_hist
+
+
+def atr_talib(high, low, close, period: int = 14, out: Optional[np.ndarray] = None) -> np.ndarray:
+    '''
+    Average True Range with TA-Lib (Wilder) semantics, written into out if given
+    
+    The first true range needs a previous close, the first ATR is the SMA of
+    the first `period` true ranges, then atr = (atr * (period - 1) + tr) / period.
+    '''
+    high = np.asarray(high, dtype=float)
+    low = np.asarray(low, dtype=float)
+    close = np.asarray(close, dtype=float)
+    n = len(close)
+    if out is None:
+        out = np.empty(n)
+    
+    prev_close = np.empty(n)
+    prev_close[:1] = np.nan
+    prev_close[1:] = close[:-1]
+    true_range = np.fmax(np.fmax(high - low, np.abs(high - prev_close)),
+                         np.abs(low - prev_close))
+    true_range[:1] = np.nan
+    if period == 1:
+        out[:] = true_range
+        return out
+    
+    seed_end = _first_valid(close) + period
+    out[:min(seed_end, n)] = np.nan
+    if seed_end >= n:
+        return out
+    
+    atr = 0.0
+    for value in true_range[seed_end - period + 1:seed_end + 1].tolist():
+        atr += value
+    atr /= period
+    rest = true_range[seed_end + 1:]
+    if len(rest) >= RECURSION_KERNEL_MIN_BARS and not np.isnan(rest).any():
+        out[seed_end:] = _recursion(atr, rest, 1.0 / period)
+        return out
+    result = [atr]
+    for value in rest.tolist():
+        atr *= period - 1
+        atr += value
+        atr /= period
+        result.append(atr)
+    out[seed_end:] = result
+    return out
+
+
+def obv_talib(close, volume, out: Optional[np.ndarray] = None) -> np.ndarray:
+    '''
+    On Balance Volume with TA-Lib semantics (unchanged on an unchanged close),
+    written into out if given
+    '''
+    close = np.asarray(close, dtype=float)
+    volume = np.asarray(volume, dtype=float)
+    if out is None:
+        out = np.empty(len(close))
+    if len(close) == 0:
+        return out
+    
+    with np.errstate(invalid='ignore'):
+        change = np.diff(close)
+    out[0] = volume[0]
+    out[1:] = np.where(change > 0, volume[1:], np.where(change < 0, -volume[1:], 0.0))
+    return np.cumsum(out, out=out)
+
+
 class AIMnIndicators:
     '''Calculate all indicators for the AIMn Trading System'''
     
     @staticmethod
-    def calculate_rsi_real(df: pd.DataFrame, window: int = 100) -> pd.Series:
+    def calculate_rsi_real(df: pd.DataFrame, window: int = 100,
+                           backend: Optional[str] = None) -> pd.Series:
         '''
         Calculate RSI Real (Price-Based RSI)
         Formula: (Close - Lowest Low) / (Highest High - Lowest Low) * 100
         
         This is NOT momentum-based like traditional RSI, but position-based
+        
+        backend: 'pandas' or 'numpy' (defaults to RSI_REAL_BACKEND). Both give
+        identical values; 'numpy' is faster, notably for long windows.
         '''
-        highest_high = df['high'].rolling(window=window).max()
-        lowest_low = df['low'].rolling(window=window).min()
+        backend = backend or RSI_REAL_BACKEND
+        if backend == 'numpy':
+            highest_high = pd.Series(rolling_extreme(df['high'].to_numpy(dtype=float), window, True),
+                                     index=df.index)
+            lowest_low = pd.Series(rolling_extreme(df['low'].to_numpy(dtype=float), window, False),
+                                   index=df.index)
+        elif backend == 'pandas':
+            highest_high = df['high'].rolling(window=window).max()
+            lowest_low = df['low'].rolling(window=window).min()
+        else:
+            raise ValueError(f"Unknown RSI Real backend: {backend}")
         
         # Avoid division by zero
         price_range = highest_high - lowest_low
@@ -54,12 +322,9 @@ class AIMnIndicators:
                                                        slowperiod=slow, 
                                                        signalperiod=signal)
         else:
-            # Fallback calculation
-            exp1 = df['close'].ewm(span=fast, adjust=False).mean()
-            exp2 = df['close'].ewm(span=slow, adjust=False).mean()
-            macd = exp1 - exp2
-            macd_signal = macd.ewm(span=signal, adjust=False).mean()
-            macd_hist = macd - macd_signal
+            # Fallback calculation (same seeding as TA-Lib)
+            macd, macd_signal, macd_hist = (pd.Series(values, index=df.index) for values in
+                                            macd_talib(df['close'], fast, slow, signal))
         
         # Detect crossovers
         macd_prev = macd.shift(1)
@@ -76,9 +341,60 @@ class AIMnIndicators:
             'bearish_cross': bearish_cross
         }
     @staticmethod
-    def check_entry_conditions(data, symbol, rsi_config, macd_config, volume_config, atr_config):
-        # Dummy logic - replace this with real indicator logic later
-        return False
+    def check_entry_conditions(data, params: Dict) -> Dict[str, bool]:
+        '''
+        Check entry conditions on the latest bar
+        Accepts an indicator DataFrame or a single latest-row mapping
+        Disabled filters (volume_confirmation / atr_filter = False) always pass
+        and their columns are not read
+        '''
+        params = AIMnSymbolParams.resolve(params)
+        if isinstance(data, pd.DataFrame):
+            if len(data) < 2:
+                return {'buy': False, 'sell': False}
+            latest = data.iloc[-1]
+        else:
+            latest = data
+        
+        # Get thresholds
+        rsi_oversold = params.rsi_oversold
+        rsi_overbought = params.rsi_overbought
+        volume_threshold = params.volume_threshold
+        atr_threshold = params.atr_threshold
+        
+        # RSI conditions
+        rsi_buy = bool(latest['rsi_real'] <= rsi_oversold)
+        rsi_sell = bool(latest['rsi_real'] >= rsi_overbought)
+        
+        # MACD conditions
+        macd_buy = bool(latest['macd_bullish_cross'])
+        macd_sell = bool(latest['macd_bearish_cross'])
+        
+        # Volume conditions (volume vs average, confirmed by OBV trend)
+        if params.volume_confirmation:
+            high_volume = bool(latest['volume_ratio'] >= volume_threshold)
+            volume_buy = high_volume and bool(latest['obv'] > latest['obv_sma'])
+            volume_sell = high_volume and bool(latest['obv'] < latest['obv_sma'])
+        else:
+            volume_buy = volume_sell = True
+        
+        # ATR condition
+        if params.atr_filter:
+            high_volatility = bool(latest['atr_ratio'] >= atr_threshold)
+        else:
+            high_volatility = True
+        
+        return {
+            'buy': rsi_buy and macd_buy and volume_buy and high_volatility,
+            'sell': rsi_sell and macd_sell and volume_sell and high_volatility,
+            'rsi_buy': rsi_buy,
+            'rsi_sell': rsi_sell,
+            'macd_buy': macd_buy,
+            'macd_sell': macd_sell,
+            'volume_buy': volume_buy,
+            'volume_sell': volume_sell,
+            'high_volatility': high_volatility
+        }
     
     @staticmethod
     def calculate_volume_signals(df: pd.DataFrame, obv_period: int = 20) -> Dict[str, pd.Series]:
@@ -91,7 +407,7 @@ class AIMnIndicators:
             obv = talib.OBV(df['close'], df['volume'])
         else:
             # Fallback OBV calculation
-            obv = (df['volume'] * (~df['close'].diff().le(0) * 2 - 1)).cumsum()
+            obv = pd.Series(obv_talib(df['close'], df['volume']), index=df.index)
         
         obv_sma = obv.rolling(window=obv_period).mean()
         
@@ -114,6 +430,7 @@ class AIMnIndicators:
         return {
             'obv': obv,
             'obv_sma': obv_sma,
+            'volume_ratio': df['volume'] / volume_sma,
             'high_volume': high_volume,
             'bullish_volume': bullish_volume,
             'bearish_volume': bearish_volume
@@ -129,14 +446,8 @@ class AIMnIndicators:
         if TALIB_AVAILABLE:
             atr = talib.ATR(df['high'], df['low'], df['close'], timeperiod=atr_period)
         else:
-            # Fallback ATR calculation
-            high_low = df['high'] - df['low']
-            high_close = np.abs(df['high'] - df['close'].shift())
-            low_close = np.abs(df['low'] - df['close'].shift())
-            
-            ranges = pd.concat([high_low, high_close, low_close], axis=1)
-            true_range = ranges.max(axis=1)
-            atr = true_range.rolling(window=atr_period).mean()
+            # Fallback ATR calculation (Wilder smoothing, as TA-Lib)
+            atr = pd.Series(atr_talib(df['high'], df['low'], df['close'], atr_period), index=df.index)
         
         atr_ma = atr.rolling(window=atr_ma_period).mean()
         
@@ -150,45 +461,389 @@ class AIMnIndicators:
             'atr_ratio': atr / atr_ma
         }
     
+    @staticmethod
+    def params_key(params: Dict) -> tuple:
+        '''
+        Parameters that change indicator values
+        Symbols sharing a key can share (or reuse) indicator computations
+        '''
+        params = AIMnSymbolParams.resolve(params)
+        return (params.rsi_window,
+                params.macd_fast,
+                params.macd_slow,
+                params.macd_signal,
+                params.obv_period,
+                params.atr_period,
+                params.atr_ma_period,
+                params.atr_multiplier)
+    
+    @staticmethod
+    def required_lookback(params: Dict) -> int:
+        '''
+        Number of bars needed for every indicator to have a value on the
+        latest bar (and the bar before it, for MACD crossovers)
+        '''
+        params = AIMnSymbolParams.resolve(params)
+        macd_slow = max(params.macd_fast, params.macd_slow)
+        atr_period = params.atr_period
+        
+        return max(
+            params.rsi_window,                                      # RSI Real window
+            macd_slow + params.macd_signal,                         # slow EMA + signal EMA + previous bar
+            params.obv_period,                                      # OBV SMA
+            20,                                                     # volume SMA
+            atr_period + params.atr_ma_period                       # ATR (first bar has no TR) + ATR MA
+        )
+    
+    @staticmethod
+    def allocate_outputs(n_bars: int) -> Dict[str, np.ndarray]:
+        '''Preallocated output buffers for calculate_all_arrays'''
+        return {column: np.empty(n_bars, dtype=bool if column in SIGNAL_COLUMNS else float)
+                for column in INDICATOR_COLUMNS}
+    
+    @staticmethod
+    def calculate_all_arrays(bars, params: Dict,
+                             out: Optional[Dict[str, np.ndarray]] = None) -> Dict[str, np.ndarray]:
+        '''
+        Calculate all indicators on raw arrays, without building a DataFrame
+        
+        Args:
+            bars: Structured array or mapping with 'high', 'low', 'close' and
+                'volume' 1-D arrays
+            params: Symbol parameters
+            out: Buffers from allocate_outputs (reused across calls); new
+                buffers are allocated if omitted
+            
+        Returns:
+            Dict of INDICATOR_COLUMNS arrays (out, filled in place), equal to
+            the columns added by calculate_all_indicators
+        '''
+        params = AIMnSymbolParams.resolve(params)
+        high = np.ascontiguousarray(bars['high'], dtype=float)
+        low = np.ascontiguousarray(bars['low'], dtype=float)
+        close = np.ascontiguousarray(bars['close'], dtype=float)
+        volume = np.ascontiguousarray(bars['volume'], dtype=float)
+        n = len(close)
+        if out is None:
+            out = AIMnIndicators.allocate_outputs(n)
+        prev_close = np.empty(n)
+        prev_close[:1] = np.nan
+        prev_close[1:] = close[:-1]
+        
+        with np.errstate(invalid='ignore', divide='ignore'):
+            # RSI Real
+            window = params.rsi_window
+            lowest_low = rolling_extreme(low, window, is_max=False)
+            price_range = rolling_extreme(high, window, is_max=True) - lowest_low
+            price_range[price_range == 0] = 1
+            rsi_real = out['rsi_real']
+            np.subtract(close, lowest_low, out=rsi_real)
+            np.divide(rsi_real, price_range, out=rsi_real)
+            np.multiply(rsi_real, 100, out=rsi_real)
+            
+            # MACD
+            fast = params.macd_fast
+            slow = params.macd_slow
+            signal = params.macd_signal
+            macd, macd_signal = out['macd'], out['macd_signal']
+            if TALIB_AVAILABLE:
+                macd[:], macd_signal[:], out['macd_histogram'][:] = talib.MACD(
+                    close, fastperiod=fast, slowperiod=slow, signalperiod=signal)
+            else:
+                macd_talib(close, fast, slow, signal, out=(macd, macd_signal, out['macd_histogram']))
+            for column, up in (('macd_bullish_cross', True), ('macd_bearish_cross', False)):
+                cross = out[column]
+                cross[:1] = False
+                if up:
+                    np.less_equal(macd[:-1], macd_signal[:-1], out=cross[1:])
+                    cross[1:] &= macd[1:] > macd_signal[1:]
+                else:
+                    np.greater_equal(macd[:-1], macd_signal[:-1], out=cross[1:])
+                    cross[1:] &= macd[1:] < macd_signal[1:]
+            
+            # Volume
+            obv = out['obv']
+            if TALIB_AVAILABLE:
+                obv[:] = talib.OBV(close, volume)
+            else:
+                obv_talib(close, volume, out=obv)
+            obv_sma = rolling_mean(obv, params.obv_period, out=out['obv_sma'])
+            volume_sma = rolling_mean(volume, 20)
+            high_volume = volume > volume_sma
+            np.logical_and(high_volume, close > prev_close, out=out['bullish_volume'])
+            out['bullish_volume'] &= obv > obv_sma
+            np.logical_and(high_volume, close < prev_close, out=out['bearish_volume'])
+            out['bearish_volume'] &= obv < obv_sma
+            np.divide(volume, volume_sma, out=out['volume_ratio'])
+            
+            # ATR Filter
+            atr_period = params.atr_period
+            atr = out['atr']
+            if TALIB_AVAILABLE:
+                atr[:] = talib.ATR(high, low, close, timeperiod=atr_period)
+            else:
+                atr_talib(high, low, close, atr_period, out=atr)
+            atr_ma = rolling_mean(atr, params.atr_ma_period, out=out['atr_ma'])
+            np.greater(atr, atr_ma * params.atr_multiplier, out=out['volatility_expanding'])
+            np.divide(atr, atr_ma, out=out['atr_ratio'])
+        
+        return out
+    
     @staticmethod
     def calculate_all_indicators(df: pd.DataFrame, params: Dict) -> pd.DataFrame:
         '''
         Calculate all indicators and add to dataframe
+        (DataFrame wrapper around calculate_all_arrays)
         '''
-        df = df.copy()
-        
-        # RSI Real
-        df['rsi_real'] = AIMnIndicators.calculate_rsi_real(df, params.get('rsi_window', 100))
-        
-        # MACD
-        macd_data = AIMnIndicators.calculate_macd(df, 
-                                                  params.get('macd_fast', 12),
-                                                  params.get('macd_slow', 26),
-                                                  params.get('macd_signal', 9))
-        df['macd'] = macd_data['macd']
-        df['macd_signal'] = macd_data['signal']
-        df['macd_histogram'] = macd_data['histogram']
-        df['macd_bullish_cross'] = macd_data['bullish_cross']
-        df['macd_bearish_cross'] = macd_data['bearish_cross']
-        
-        # Volume
-        volume_data = AIMnIndicators.calculate_volume_signals(df, params.get('obv_period', 20))
-        df['obv'] = volume_data['obv']
-        df['obv_sma'] = volume_data['obv_sma']
-        df['bullish_volume'] = volume_data['bullish_volume']
-        df['bearish_volume'] = volume_data['bearish_volume']
-        
-        # ATR Filter
-        atr_data = AIMnIndicators.calculate_atr_filter(df,
-                                                       params.get('atr_period', 14),
-                                                       params.get('atr_ma_period', 28),
-                                                       params.get('atr_multiplier', 1.3))
-        df['atr'] = atr_data['atr']
-        df['atr_ma'] = atr_data['atr_ma']
-        df['volatility_expanding'] = atr_data['volatility_expanding']
-        
-        return df
-
+        arrays = AIMnIndicators.calculate_all_arrays(df, params)
+        existing = [column for column in INDICATOR_COLUMNS if column in df.columns]
+        return pd.concat([df.drop(columns=existing), pd.DataFrame(arrays, index=df.index)], axis=1)
+    
+    @staticmethod
+    def compact_indicators(df: pd.DataFrame) -> pd.DataFrame:
+        '''
+        Compact copy of an indicator frame for long-lived storage
+        
+        Float columns (prices, volume, indicators) are stored as float32, so
+        every value is within COMPACT_RTOL (relative) of the float64 result;
+        a threshold comparison can only flip when a value lies within that
+        distance of the threshold. Signal flags stay bool (one byte each).
+        Roughly halves the memory of a calculate_all_indicators frame.
+        '''
+        float_columns = df.select_dtypes(include='float64').columns
+        return df.astype({column: np.float32 for column in float_columns})
+    
+    @staticmethod
+    def frame_memory(df: pd.DataFrame) -> int:
+        '''Memory used by a frame, including its index (bytes)'''
+        return int(df.memory_usage(index=True, deep=True).sum())
+    
+    @staticmethod
+    def calculate_latest_indicators(df: pd.DataFrame, params: Dict,
+                                    columns: Optional[Iterable[str]] = None) -> Dict:
+        '''
+        Tail evaluation: calculate only the latest value of each indicator
+        (plus the previous MACD/signal needed for crossover detection)
+        
+        Windowed indicators (RSI Real, the OBV/volume/ATR averages) read only
+        the bars they need. The recursive ones (EMA, OBV, Wilder's ATR)
+        still run over the history but no indicator columns are built.
+        Returns a dict with the same keys as a row of calculate_all_indicators;
+        rolling averages match it to within float rounding.
+        
+        If columns is given, only the indicator groups (RSI, MACD, volume,
+        ATR) that produce one of those columns are calculated.
+        '''
+        params = AIMnSymbolParams.resolve(params)
+        opens = df['open'].to_numpy(dtype=float)
+        high = df['high'].to_numpy(dtype=float)
+        low = df['low'].to_numpy(dtype=float)
+        close = df['close'].to_numpy(dtype=float)
+        volume = df['volume'].to_numpy(dtype=float)
+        n = len(close)
+        nan = np.nan
+        
+        def tail_mean(values: np.ndarray, window: int) -> float:
+            return values[-window:].mean() if len(values) >= window else nan
+        
+        def wanted(*group: str) -> bool:
+            return columns is None or any(column in columns for column in group)
+        
+        latest = {
+            'open': opens[-1],
+            'high': high[-1],
+            'low': low[-1],
+            'close': close[-1],
+            'volume': volume[-1]
+        }
+        
+        with np.errstate(divide='ignore', invalid='ignore'):
+            # RSI Real
+            if wanted('rsi_real'):
+                window = params.rsi_window
+                if n >= window:
+                    lowest_low = low[-window:].min()
+                    price_range = high[-window:].max() - lowest_low
+                    if price_range == 0:
+                        price_range = 1
+                    latest['rsi_real'] = ((close[-1] - lowest_low) / price_range) * 100
+                else:
+                    latest['rsi_real'] = nan
+            
+            # MACD (last two values for crossover detection)
+            if wanted('macd', 'macd_signal', 'macd_histogram',
+                      'macd_bullish_cross', 'macd_bearish_cross'):
+                fast = params.macd_fast
+                slow = params.macd_slow
+                signal = params.macd_signal
+                if TALIB_AVAILABLE:
+                    macd, macd_signal, _ = talib.MACD(close, fastperiod=fast,
+                                                      slowperiod=slow, signalperiod=signal)
+                else:
+                    macd, macd_signal, _ = macd_talib(close, fast, slow, signal)
+                macd_now, signal_now = macd[-1], macd_signal[-1]
+                macd_prev, signal_prev = (macd[-2], macd_signal[-2]) if n >= 2 else (nan, nan)
+                latest['macd'] = macd_now
+                latest['macd_signal'] = signal_now
+                latest['macd_histogram'] = macd_now - signal_now
+                latest['macd_bullish_cross'] = bool(macd_prev <= signal_prev and macd_now > signal_now)
+                latest['macd_bearish_cross'] = bool(macd_prev >= signal_prev and macd_now < signal_now)
+            
+            # Volume (the ratio alone reads only the last 20 bars)
+            if wanted('obv', 'obv_sma', 'bullish_volume', 'bearish_volume', 'volume_ratio'):
+                volume_sma = tail_mean(volume, 20)
+                latest['volume_ratio'] = volume[-1] / volume_sma
+            if wanted('obv', 'obv_sma', 'bullish_volume', 'bearish_volume'):
+                if TALIB_AVAILABLE:
+                    obv = talib.OBV(close, volume)
+                else:
+                    obv = obv_talib(close, volume)
+                obv_sma = tail_mean(obv, params.obv_period)
+                high_volume = volume[-1] > volume_sma
+                price_up = n >= 2 and close[-1] > close[-2]
+                price_down = n >= 2 and close[-1] < close[-2]
+                latest['obv'] = obv[-1]
+                latest['obv_sma'] = obv_sma
+                latest['bullish_volume'] = bool(high_volume and price_up and obv[-1] > obv_sma)
+                latest['bearish_volume'] = bool(high_volume and price_down and obv[-1] < obv_sma)
+            
+            # ATR Filter
+            if wanted('atr', 'atr_ma', 'volatility_expanding', 'atr_ratio'):
+                atr_period = params.atr_period
+                atr_ma_period = params.atr_ma_period
+                if TALIB_AVAILABLE:
+                    atr_values = talib.ATR(high, low, close, timeperiod=atr_period)
+                else:
+                    atr_values = atr_talib(high, low, close, atr_period)
+                atr = atr_values[-1]
+                atr_ma = tail_mean(atr_values, atr_ma_period)
+                latest['atr'] = atr
+                latest['atr_ma'] = atr_ma
+                latest['volatility_expanding'] = bool(atr > (atr_ma * params.atr_multiplier))
+                latest['atr_ratio'] = atr / atr_ma
+        
+        return latest
+    
+    @staticmethod
+    def sweep_rsi_real(high: np.ndarray, low: np.ndarray, close: np.ndarray,
+                       windows: Iterable[int]) -> np.ndarray:
+        '''
+        RSI Real for many windows in one pass
+        
+        Inputs are (symbols x bars) arrays (or 1-D for a single symbol), e.g.
+        from AIMnBatchIndicators.stack_ohlcv. Rolling highs/lows come from a
+        shared sparse table of power-of-two maxima/minima: every window is
+        the max/min of two overlapping table entries, so each extra window
+        costs O(bars) on top of one O(bars * log(max window)) build.
+        
+        Returns:
+            (windows x symbols x bars) array, identical to calculate_rsi_real
+            for each window
+        '''
+        high = np.atleast_2d(np.asarray(high, dtype=float))
+        low = np.atleast_2d(np.asarray(low, dtype=float))
+        close = np.atleast_2d(np.asarray(close, dtype=float))
+        windows = list(windows)
+        n = close.shape[-1]
+        max_levels = [high]
+        min_levels = [low]
+        
+        def window_extreme(levels, window, op):
+            # levels[k][..., j] = extreme of bars j .. j + 2**k - 1
+            k = window.bit_length() - 1
+            while len(levels) <= k:
+                half = 1 << (len(levels) - 1)
+                levels.append(op(levels[-1][..., :-half], levels[-1][..., half:]))
+            span = 1 << k
+            out = np.full(close.shape, np.nan)
+            if n >= window:
+                out[..., window - 1:] = op(levels[k][..., :n - window + 1],
+                                           levels[k][..., window - span:n - span + 1])
+            return out
+        
+        result = np.empty((len(windows),) + close.shape)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            for i, window in enumerate(windows):
+                highest_high = window_extreme(max_levels, window, np.maximum)
+                lowest_low = window_extreme(min_levels, window, np.minimum)
+                price_range = highest_high - lowest_low
+                price_range = np.where(price_range == 0, 1, price_range)
+                result[i] = ((close - lowest_low) / price_range) * 100
+        return result
+    
+    @staticmethod
+    def sweep_macd(close: np.ndarray, fast_periods: Iterable[int], slow_periods: Iterable[int],
+                   signal_periods: Iterable[int],
+                   starts: Optional[np.ndarray] = None) -> Tuple[list, Dict[str, np.ndarray]]:
+        '''
+        MACD for a grid of fast/slow/signal lengths in one pass
+        
+        Combinations with fast >= slow are skipped. Without TA-Lib each EMA
+        span and each fast/slow MACD line is computed once and shared by
+        every combination that uses it, and each signal length is one pass
+        over all lines; with TA-Lib every combination is a TA-Lib call (its
+        EMAs are seeded per MACD, so they cannot be shared).
+        
+        Args:
+            close: (symbols x bars) closes (or 1-D for a single symbol)
+            starts: First real bar of each left-padded row (see stack_ohlcv)
+            
+        Returns:
+            (param_sets, results): the (fast, slow, signal) tuples, and
+            'macd', 'signal', 'histogram', 'bullish_cross', 'bearish_cross'
+            arrays of shape (param sets x symbols x bars), identical to
+            calculate_macd for each combination
+        '''
+        # Deferred: batch_indicators imports this module
+        from batch_indicators import _ema_talib, _per_row
+        
+        close = np.atleast_2d(np.asarray(close, dtype=float))
+        if starts is None:
+            starts = np.zeros(close.shape[0], dtype=np.int64)
+        param_sets = [(fast, slow, signal)
+                      for fast in fast_periods for slow in slow_periods for signal in signal_periods
+                      if fast < slow]
+        
+        shape = (len(param_sets),) + close.shape
+        results = {'macd': np.empty(shape), 'signal': np.empty(shape)}
+        
+        if TALIB_AVAILABLE:
+            for i, (fast, slow, signal) in enumerate(param_sets):
+                macd, macd_signal, _ = _per_row(
+                    lambda c: talib.MACD(c, fastperiod=fast, slowperiod=slow, signalperiod=signal),
+                    close, starts=starts)
+                results['macd'][i] = macd
+                results['signal'][i] = macd_signal
+        elif param_sets:
+            # One line per (fast, slow): both EMAs are seeded on the slow
+            # period's first bar. Then one signal EMA pass per signal length
+            # over all lines stacked together
+            line_index = {pair: i for i, pair in
+                          enumerate(dict.fromkeys((fast, slow) for fast, slow, _ in param_sets))}
+            slow_emas = {slow: _ema_talib(close, slow, starts + slow - 1)
+                         for slow in {slow for _, slow in line_index}}
+            lines = np.stack([_ema_talib(close, fast, starts + slow - 1) - slow_emas[slow]
+                              for fast, slow in line_index])
+            stacked = lines.reshape(-1, close.shape[-1])
+            first = np.concatenate([starts + slow - 1 for _, slow in line_index])
+            signals = {signal: _ema_talib(stacked, signal, first + signal - 1).reshape(lines.shape)
+                       for signal in {signal for _, _, signal in param_sets}}
+            bars = np.arange(close.shape[-1])
+            for i, (fast, slow, signal) in enumerate(param_sets):
+                macd = lines[line_index[(fast, slow)]].copy()
+                macd[bars < (starts + slow + signal - 2)[:, None]] = np.nan
+                results['macd'][i] = macd
+                results['signal'][i] = signals[signal][line_index[(fast, slow)]]
+        
+        macd, macd_signal = results['macd'], results['signal']
+        first_bar = np.full(macd.shape[:-1] + (1,), np.nan)
+        macd_prev = np.concatenate((first_bar, macd[..., :-1]), axis=-1)
+        signal_prev = np.concatenate((first_bar, macd_signal[..., :-1]), axis=-1)
+        results['histogram'] = macd - macd_signal
+        with np.errstate(invalid='ignore'):
+            results['bullish_cross'] = (macd_prev <= signal_prev) & (macd > macd_signal)
+            results['bearish_cross'] = (macd_prev >= signal_prev) & (macd < macd_signal)
+        return param_sets, results
 
 def analyze_market(data, strategy):
     return strategy(data)
\ No newline at end of file
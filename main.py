@@ -16,13 +16,21 @@ from market_data import load_all_market_data
 from aimn_crypto_config import *
 
 # Import components
-from alpaca_connector import AlpacaTradingConnector
+from alpaca_connector import AlpacaTradingConnector, TIMEFRAME_MINUTES, lookback_window
 from scanner import AIMnScanner
 from position_manager import AIMnPositionManager, ExitCode
 from indicators import AIMnIndicators
+from indicator_cache import AIMnIndicatorCache
+from bar_resampler import AIMnBarResampler
+from bar_buffer import AIMnBarBuffer
+from bar_store import AIMnBarStore
+from universe import AIMnUniverseScanner
+from scan_snapshot import publish_snapshot
+from bar_scheduler import AIMnBarScheduler
+from scan_cadence import AIMnScanCadence
 
 market_data = load_all_market_data()
-scanner = AIMnScanner(SYMBOL_PARAMS)
+scanner = AIMnScanner(SYMBOL_PARAMS, param_defaults={'volume_confirmation': VOLUME_CONFIRMATION})
 best_trade = scanner.scan_all_symbols(market_data)
 
 
@@ -59,8 +67,59 @@ class AIMnTradingEngine:
         self.scan_interval = scan_interval
         
         # Initialize components
-        self.scanner = AIMnScanner(symbol_params)
+        self.indicator_cache = AIMnIndicatorCache(max_mb=INDICATOR_CACHE_MB,
+                                                  compact=INDICATOR_CACHE_COMPACT)
+        self.scanner = AIMnScanner(symbol_params, cache=self.indicator_cache,
+                                   indicator_mode=INDICATOR_MODE,
+                                   workers=SCAN_WORKERS,
+                                   parallel_min_symbols=PARALLEL_SCAN_MIN_SYMBOLS,
+                                   prefilter=PREFILTER_SCAN,
+                                   cadence=AIMnScanCadence(
+                                       min_interval=CADENCE_MIN_INTERVAL,
+                                       max_interval=CADENCE_MAX_INTERVAL,
+                                       requests_per_minute=SCAN_REQUEST_BUDGET,
+                                       rsi_band=CADENCE_RSI_BAND) if ADAPTIVE_SCAN else None,
+                                   condition_history=CONDITION_HISTORY_SCANS,
+                                   param_defaults={'volume_confirmation': VOLUME_CONFIRMATION})
         self.position_manager = AIMnPositionManager(max_positions=1)  # One position at a time
+        # Rolling per-symbol bars: each cycle requests only bars newer than the buffer
+        self.bar_buffer = AIMnBarBuffer(
+            self.connector.get_multi_bars,
+            bar_minutes=TIMEFRAME_MINUTES.get(TIMEFRAME, 1)) if BATCH_FETCH and INCREMENTAL_FETCH else None
+        # Every fetched bar is kept on disk for backtests (see bar_store)
+        self.bar_store = AIMnBarStore(BAR_STORE_DIR) if STORE_BARS else None
+        # Higher-timeframe confirmation bars are derived from the fetched 1-minute
+        # bars; the buffer holds the indicator lookback of the confirming timeframe
+        self.resampler = None
+        if CONFIRM_TIMEFRAME and TIMEFRAME == '1Min':
+            lookback = max(AIMnIndicators.required_lookback(self.scanner.get_symbol_params(symbol))
+                           for symbol in list(SYMBOL_PARAMS) + list(symbols)) + LOOKBACK_MARGIN
+            self.resampler = AIMnBarResampler(
+                max_minutes=lookback * TIMEFRAME_MINUTES[CONFIRM_TIMEFRAME], max_bars=lookback)
+            # Symbols whose 1-minute buffer was backfilled with one request
+            self.backfilled = set()
+        elif CONFIRM_TIMEFRAME:
+            logger.warning(f"CONFIRM_TIMEFRAME needs 1Min bars, not {TIMEFRAME}: confirmation is off")
+        self.connector.resampler = self.resampler
+        # Coarse tier: narrows the asset universe to the watchlist scanned each cycle
+        self.universe = AIMnUniverseScanner(
+            list_symbols=self.list_universe,
+            fetch_bars=self.connector.get_window_bars,
+            get_params=self.scanner.get_symbol_params,
+            interval=COARSE_SCAN_INTERVAL,
+            timeframe=COARSE_TIMEFRAME,
+            size=WATCHLIST_SIZE,
+            pinned=symbols,
+            min_dollar_volume=MIN_DOLLAR_VOLUME,
+            fetch_many=self.connector.get_multi_bars if BATCH_FETCH else None) if TIERED_SCAN else None
+        # Cycles run when a bar closes and scan only symbols with a new bar
+        self.scheduler = AIMnBarScheduler(
+            bar_seconds=TIMEFRAME_MINUTES.get(TIMEFRAME, 1) * 60,
+            settle=BAR_SETTLE_SECONDS,
+            retry=BAR_RETRY_SECONDS,
+            max_wait=BAR_MAX_WAIT_SECONDS) if BAR_CLOSE_SCAN else None
+        # Latest signal summary of every scanned symbol (for the snapshot)
+        self.signal_summary: Dict[str, Dict] = {}
         
         # Control flags
         self.running = False
@@ -71,87 +130,165 @@ class AIMnTradingEngine:
         
         logger.info("AIMn Trading Engine initialized")
         logger.info(f"Trading symbols: {symbols}")
-        logger.info(f"Scan interval: {scan_interval} seconds")
+        if self.scheduler is not None:
+            logger.info(f"Scanning on {TIMEFRAME} bar close + {BAR_SETTLE_SECONDS}s")
+        else:
+            logger.info(f"Scan interval: {scan_interval} seconds")
     
-    def get_market_data(self) -> Dict[str, pd.DataFrame]:
-        """Fetch latest market data for all symbols"""
+    def list_universe(self) -> List[str]:
+        """Every active, tradable asset of the configured asset class"""
+        assets = self.connector.api.list_assets(status='active', asset_class=UNIVERSE_ASSET_CLASS)
+        return [asset.symbol for asset in assets if asset.tradable]
+    
+    def active_symbols(self) -> List[str]:
+        """Symbols scanned this cycle: the watchlist (or SYMBOLS) plus open positions"""
+        symbols = self.universe.refresh() if self.universe is not None else self.symbols
+        return list(dict.fromkeys(list(symbols) + list(self.position_manager.positions)))
+    
+    def get_market_data(self, symbols: List[str] = None) -> Dict[str, pd.DataFrame]:
+        """Fetch latest market data for the given symbols (default: all active symbols)"""
+        symbols = list(symbols if symbols is not None else self.active_symbols())
+        if BATCH_FETCH:
+            # One paginated request per asset class instead of one per symbol
+            limits = {symbol: AIMnIndicators.required_lookback(self.scanner.get_symbol_params(symbol))
+                      + LOOKBACK_MARGIN for symbol in symbols}
+            try:
+                if self.bar_buffer is not None:
+                    fetched = self.bar_buffer.update(symbols, TIMEFRAME, limits)
+                else:
+                    fetched = self.connector.get_multi_bars(symbols, TIMEFRAME, limits)
+            except Exception as e:
+                logger.error(f"Batched bar request failed: {e}")
+                fetched = {}
+        else:
+            fetched = {symbol: self.fetch_symbol_data(symbol) for symbol in symbols}
+        
         market_data = {}
+        for symbol in symbols:
+            df = fetched.get(symbol)
+            if df is not None and len(df) > 0:
+                market_data[symbol] = df
+                logger.debug(f"Fetched data for {symbol}: {len(df)} bars")
+                if self.resampler is not None:
+                    self.resampler.update(symbol, df)
+                if self.bar_store is not None:
+                    try:
+                        self.bar_store.append(symbol, TIMEFRAME, df)
+                    except OSError as e:
+                        logger.error(f"Failed to store bars for {symbol}: {e}")
+            else:
+                logger.warning(f"No data returned for {symbol}")
         
-        for symbol in self.symbols:
-            try:
-                print(f"📊 Fetching {symbol} data from Alpaca...")
-                print(f"   Timeframe: {TIMEFRAME}")
-                print(f"   Bars requested: 200")
+        return market_data
+    
+    def fetch_symbol_data(self, symbol: str) -> pd.DataFrame:
+        """Fetch one symbol's bars with its own request (BATCH_FETCH off)"""
+        try:
+            # Fetch only the bars the indicators need for this symbol
+            params = self.scanner.get_symbol_params(symbol)
+            bars_needed = AIMnIndicators.required_lookback(params) + LOOKBACK_MARGIN
+            
+            print(f"📊 Fetching {symbol} data from Alpaca...")
+            print(f"   Timeframe: {TIMEFRAME}")
+            print(f"   Bars requested: {bars_needed}")
+            
+            # For crypto symbols (containing /)
+            if '/' in symbol:
+                # Calculate a time range (UTC) generous enough for thin pairs;
+                # the latest bars_needed bars are kept below
+                end_time = datetime.utcnow()
+                window = lookback_window(bars_needed, TIMEFRAME, crypto=True)
+                start_time = end_time - window
                 
-                # For crypto symbols (containing /)
-                if '/' in symbol:
-                    # Calculate time range
-                    end_time = datetime.now()
-                    start_time = end_time - timedelta(hours=4)
-                    
-                    # Use get_crypto_bars for crypto
-                    bars_response = self.connector.api.get_crypto_bars(
-                        symbol,
-                        timeframe=TIMEFRAME,
-                        start=start_time.strftime('%Y-%m-%dT%H:%M:%SZ'),
-                        end=end_time.strftime('%Y-%m-%dT%H:%M:%SZ'),
-                        limit=200
-                    )
-                    
-                    # Get the dataframe
-                    bars = bars_response.df
+                # Use get_crypto_bars for crypto (bars come oldest first, so
+                # the limit is every bar the window can hold)
+                bars_response = self.connector.api.get_crypto_bars(
+                    symbol,
+                    timeframe=TIMEFRAME,
+                    start=start_time.strftime('%Y-%m-%dT%H:%M:%SZ'),
+                    end=end_time.strftime('%Y-%m-%dT%H:%M:%SZ'),
+                    limit=int(window / timedelta(minutes=TIMEFRAME_MINUTES.get(TIMEFRAME, 1)))
+                )
+                
+                # Get the dataframe
+                bars = bars_response.df
+                
+                if not bars.empty:
+                    # Reset index
+                    bars = bars.reset_index()
                     
-                    if not bars.empty:
-                        # Reset index
-                        bars = bars.reset_index()
+                    # Handle multi-level columns if present
+                    if isinstance(bars.columns, pd.MultiIndex):
+                        # Flatten multi-level columns
+                        bars.columns = ['_'.join(col).strip() if isinstance(col, tuple) else col for col in bars.columns]
                         
-                        # Handle multi-level columns if present
-                        if isinstance(bars.columns, pd.MultiIndex):
-                            # Flatten multi-level columns
-                            bars.columns = ['_'.join(col).strip() if isinstance(col, tuple) else col for col in bars.columns]
-                            
-                            # Find columns that match our pattern
-                            timestamp_col = [col for col in bars.columns if 'timestamp' in col.lower()][0]
-                            open_col = [col for col in bars.columns if 'open' in col.lower() and symbol in col][0]
-                            high_col = [col for col in bars.columns if 'high' in col.lower() and symbol in col][0]
-                            low_col = [col for col in bars.columns if 'low' in col.lower() and symbol in col][0]
-                            close_col = [col for col in bars.columns if 'close' in col.lower() and symbol in col][0]
-                            volume_col = [col for col in bars.columns if 'volume' in col.lower() and symbol in col][0]
-                            
-                            # Create clean dataframe
-                            df = pd.DataFrame({
-                                'timestamp': bars[timestamp_col],
-                                'open': bars[open_col],
-                                'high': bars[high_col],
-                                'low': bars[low_col],
-                                'close': bars[close_col],
-                                'volume': bars[volume_col]
-                            })
-                        else:
-                            # Simple columns
-                            df = bars[['timestamp', 'open', 'high', 'low', 'close', 'volume']]
+                        # Find columns that match our pattern
+                        timestamp_col = [col for col in bars.columns if 'timestamp' in col.lower()][0]
+                        open_col = [col for col in bars.columns if 'open' in col.lower() and symbol in col][0]
+                        high_col = [col for col in bars.columns if 'high' in col.lower() and symbol in col][0]
+                        low_col = [col for col in bars.columns if 'low' in col.lower() and symbol in col][0]
+                        close_col = [col for col in bars.columns if 'close' in col.lower() and symbol in col][0]
+                        volume_col = [col for col in bars.columns if 'volume' in col.lower() and symbol in col][0]
                         
-                        print(f"   ✅ Got {len(df)} bars, latest price: ${df['close'].iloc[-1]:.2f}")
+                        # Create clean dataframe
+                        df = pd.DataFrame({
+                            'timestamp': bars[timestamp_col],
+                            'open': bars[open_col],
+                            'high': bars[high_col],
+                            'low': bars[low_col],
+                            'close': bars[close_col],
+                            'volume': bars[volume_col]
+                        })
                     else:
-                        print(f"   ⚠️ No data returned")
-                        df = pd.DataFrame()
+                        # Simple columns
+                        df = bars[['timestamp', 'open', 'high', 'low', 'close', 'volume']]
+                    df = df.iloc[-bars_needed:].reset_index(drop=True)
+                    
+                    print(f"   ✅ Got {len(df)} bars, latest price: ${df['close'].iloc[-1]:.2f}")
                 else:
-                    # Regular stock data
-                    df = self.connector.get_bars(symbol, TIMEFRAME, 200)
-                    if len(df) > 0:
-                        print(f"   ✅ Got {len(df)} bars")
-                
+                    print(f"   ⚠️ No data returned")
+                    df = pd.DataFrame()
+            else:
+                # Regular stock data
+                df = self.connector.get_lookback_bars(symbol, params, TIMEFRAME, LOOKBACK_MARGIN)
                 if len(df) > 0:
-                    market_data[symbol] = df
-                    logger.debug(f"Fetched data for {symbol}: {len(df)} bars")
-                else:
-                    logger.warning(f"No data returned for {symbol}")
-                    
-            except Exception as e:
-                print(f"❌ Error fetching data: {e}")
-                logger.error(f"Failed to fetch data for {symbol}: {e}")
+                    print(f"   ✅ Got {len(df)} bars")
+            
+            return df
+                
+        except Exception as e:
+            print(f"❌ Error fetching data: {e}")
+            logger.error(f"Failed to fetch data for {symbol}: {e}")
+            return pd.DataFrame()
+    
+    def get_timeframe_bars(self, symbol: str, timeframe: str, limit: int = None) -> pd.DataFrame:
+        """
+        Bars of a higher timeframe, resampled from the buffered 1-minute bars
         
-        return market_data
+        A symbol whose buffer is still too short for the lookback is
+        backfilled once with a single 1-minute request; after that the
+        bars fetched each cycle keep it current without extra requests.
+        """
+        bars = self.resampler.get_bars(symbol, timeframe, limit)
+        needed = AIMnIndicators.required_lookback(self.scanner.get_symbol_params(symbol))
+        if len(bars) < needed and symbol not in self.backfilled:
+            self.backfilled.add(symbol)
+            try:
+                self.resampler.update(symbol, self.connector.get_window_bars(
+                    symbol, '1Min', self.resampler.max_minutes))
+            except Exception as e:
+                logger.error(f"Failed to backfill 1-minute bars for {symbol}: {e}")
+            bars = self.resampler.get_bars(symbol, timeframe, limit)
+        return bars
+    
+    def confirm_entry(self, opportunity: Dict) -> bool:
+        """Whether CONFIRM_TIMEFRAME agrees with an entry (always True when off)"""
+        if self.resampler is None:
+            return True
+        symbol = opportunity['symbol']
+        return AIMnScanner.confirms_direction(self.get_timeframe_bars(symbol, CONFIRM_TIMEFRAME),
+                                              self.scanner.get_symbol_params(symbol),
+                                              opportunity['direction'])
     
     def calculate_position_size(self, price: float) -> float:
         """Calculate number of shares to trade based on available capital"""
@@ -196,10 +333,9 @@ class AIMnTradingEngine:
                 df = market_data[symbol]
                 current_price = df['close'].iloc[-1]
                 
-                # Calculate current RSI for RSI exit
-                params = self.scanner.get_symbol_params(symbol)
-                df_with_indicators = AIMnIndicators.calculate_all_indicators(df, params)
-                current_rsi = df_with_indicators['rsi_real'].iloc[-1]
+                # Calculate current RSI for RSI exit (latest bar only)
+                latest = self.scanner.latest_indicators(symbol, df)
+                current_rsi = latest['rsi_real']
                 
                 # Update position and check for exit
                 exit_info = self.position_manager.update_position(
@@ -241,15 +377,22 @@ class AIMnTradingEngine:
         except Exception as e:
             logger.error(f"Failed to execute exit order: {e}")
     
-    def execute_trade(self, opportunity: Dict):
-        """Execute a trade based on scanner opportunity"""
+    def execute_trade(self, opportunity: Dict) -> bool:
+        """
+        Execute a trade based on scanner opportunity
+        
+        Returns:
+            True once the broker accepted the order (even if recording the
+            position fails afterwards, so no second order is placed);
+            False if it was rejected or never submitted
+        """
         try:
             # Calculate position size
             shares = self.calculate_position_size(opportunity['entry_price'])
             
             if shares == 0:
                 logger.warning("Insufficient capital for trade")
-                return
+                return False
             
             # Get symbol parameters
             params = self.scanner.get_symbol_params(opportunity['symbol'])
@@ -261,6 +404,11 @@ class AIMnTradingEngine:
                 qty=shares
             )
             
+        except Exception as e:
+            logger.error(f"Failed to execute trade: {e}")
+            return False
+        
+        try:
             # Record position
             position = self.position_manager.enter_position(
                 opportunity, shares, params
@@ -275,7 +423,9 @@ class AIMnTradingEngine:
                        f"ATR Ratio={opportunity['indicators']['atr_ratio']:.2f}")
             
         except Exception as e:
-            logger.error(f"Failed to execute trade: {e}")
+            logger.error(f"Order for {opportunity['symbol']} placed, "
+                        f"but recording the position failed: {e}")
+        return True
     
     def run_trading_cycle(self):
         """Run one complete trading cycle"""
@@ -296,28 +446,69 @@ class AIMnTradingEngine:
                 logger.info("🌐 Trading crypto - market is always open!")
             
             # 1. Get latest market data
-            market_data = self.get_market_data()
+            symbols = self.active_symbols()
+            held = list(self.position_manager.positions)
+            due = symbols
+            if self.scheduler is not None:
+                # Open positions are fetched every cycle, bar close or not
+                due = self.scheduler.due_symbols(due)
+                due = [symbol for symbol in symbols if symbol in due or symbol in held]
+            # Adaptive cadence: quiet symbols are skipped while within budget
+            due = self.scanner.due_symbols(due, required=held)
+            fetched = self.get_market_data(due)
             
-            if not market_data:
+            if not fetched:
                 logger.warning("No market data available")
                 return
             
-            # 2. Process existing positions
-            self.process_active_positions(market_data)
+            # 2. Process existing positions (every cycle)
+            self.process_active_positions(fetched)
+            
+            market_data = fetched
+            if self.scheduler is not None:
+                # Only symbols on a new bar are scanned
+                market_data = self.scheduler.new_bars(due, fetched)
             
             # 3. If no position, scan for opportunities
-            if not self.position_manager.has_position():
+            scanned = {}
+            if not self.position_manager.has_position() and not market_data:
+                logger.info("No new bars since the last scan")
+            elif not self.position_manager.has_position():
                 logger.info("🔍 No active position, scanning for opportunities...")
                 
-                opportunity = self.scanner.scan_all_symbols(market_data)
+                # One pass yields the candidates and the dashboard summary
+                result = self.scanner.scan(market_data, k=ENTRY_CANDIDATES, batch=BATCH_SCAN)
+                scanned = market_data
+                candidates = result['candidates']
+                # Symbols without a new bar keep their last summary
+                self.signal_summary.update(result['summary'])
+                self.signal_summary = {symbol: self.signal_summary[symbol] for symbol in symbols
+                                       if symbol in self.signal_summary}
+                try:
+                    publish_snapshot(dict(result, summary=self.signal_summary), SCAN_SNAPSHOT_FILE)
+                except OSError as e:
+                    logger.error(f"Failed to publish scan snapshot: {e}")
                 
-                if opportunity:
+                # Best first; an order rejected (or never submitted) falls
+                # through to the next candidate without rescanning
+                for rank, opportunity in enumerate(candidates, 1):
                     logger.info(f"💡 Opportunity found: {opportunity['symbol']} "
-                               f"{opportunity['direction']} (score: {opportunity['score']:.1f})")
-                    
-                    self.execute_trade(opportunity)
-                else:
+                               f"{opportunity['direction']} (score: {opportunity['score']:.1f}, "
+                               f"rank {rank})")
+                    if not self.confirm_entry(opportunity):
+                        logger.info(f"   Not confirmed on {CONFIRM_TIMEFRAME}, trying next candidate")
+                        continue
+                    if self.execute_trade(opportunity):
+                        break
+                    logger.info("   Entry failed, trying next candidate")
+                
+                if not candidates:
                     logger.info("   No trading opportunities found")
+                if self.scanner.prefilter is not None:
+                    logger.debug(f"Prefilter pass-through: {self.scanner.prefilter.stats()}")
+                conditions = self.scanner.conditions
+                logger.debug(f"Waiting only for MACD: BUY {conditions.missing_exactly('buy', ['MACD'])}, "
+                            f"SELL {conditions.missing_exactly('sell', ['MACD'])}")
             else:
                 # Log current position status
                 for symbol, position in self.position_manager.positions.items():
@@ -330,6 +521,16 @@ class AIMnTradingEngine:
                     if position.peak_trail_active:
                         logger.info(f"   🟢 Peak trail active: ${position.peak_trail_price:.2f}")
             
+            # Keep the adaptive cadence current for symbols fetched but not scanned
+            self.scanner.observe({symbol: df for symbol, df in fetched.items() if symbol not in scanned})
+            
+            cache_stats = self.indicator_cache.stats()
+            logger.debug(f"Indicator cache: {cache_stats['hits']} hits, "
+                        f"{cache_stats['misses']} misses, "
+                        f"{cache_stats['memory_mb']:.1f}/{cache_stats['max_mb']:.0f} MB")
+            for symbol, memory_mb in list(self.indicator_cache.memory_by_symbol().items())[:5]:
+                logger.debug(f"   {symbol}: {memory_mb:.2f} MB")
+            
             # Show account status
             self.show_account_status()
             
@@ -414,6 +615,12 @@ class AIMnTradingEngine:
         # Main trading loop
         while self.running:
             try:
+                if self.scheduler is not None:
+                    # Wait for the next bar close (or a retry of late symbols)
+                    self.scheduler.wait()
+                    self.run_trading_cycle()
+                    continue
+                
                 self.run_trading_cycle()
                 
                 # Wait before next cycle
@@ -431,6 +638,7 @@ class AIMnTradingEngine:
         """Stop the trading engine"""
         logger.info("Stopping AIMn Trading Engine...")
         self.running = False
+        self.scanner.close()
         
         # Show final statistics
         stats = self.position_manager.get_statistics()
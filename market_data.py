@@ -9,7 +9,9 @@ from alpaca_trade_api.rest import REST
 from datetime import datetime, timedelta
 import pandas as pd
 from config import ALPACA_KEY, ALPACA_SECRET
-from config import SYMBOLS, TIMEFRAME
+# Same store, symbols and timeframe as the live engine that writes the bars
+from aimn_crypto_config import BAR_STORE_DIR, SYMBOLS, TIMEFRAME
+from bar_store import load_market_data
 
 # Create Alpaca client
 
@@ -50,14 +52,22 @@ def get_latest_data(symbol: str) -> pd.DataFrame:
     df = df[['open', 'high', 'low', 'close', 'volume']]
     return df
 
-def load_all_market_data(limit: int = 200) -> dict:
+def load_all_market_data(limit: int = 200, from_store: bool = False) -> dict:
     """
     Load historical bars for all configured crypto symbols
+    With from_store (backtests), symbols with at least `limit` bars in the
+    local bar store (written by the live engine, see bar_store) are read
+    from disk; everything else is fetched, so the live engine never starts
+    from stale stored bars
     Returns a dict: { symbol: DataFrame }
     """
+    stored = load_market_data(SYMBOLS, TIMEFRAME, limit=limit, root=BAR_STORE_DIR) if from_store else {}
     market_data = {}
     for symbol in SYMBOLS:
-        df = fetch_crypto_bars(symbol, limit=limit)
+        if symbol in stored and len(stored[symbol]) >= limit:
+            df = stored[symbol].rename(columns={'timestamp': 'datetime'}).set_index('datetime')
+        else:
+            df = fetch_crypto_bars(symbol, limit=limit)
         if not df.empty:
             market_data[symbol] = df
     return market_data
@@ -0,0 +1,155 @@
+# parallel_scan.py
+'''
+AIMn Trading System - Parallel Scanner
+Spreads a symbol scan across a persistent process pool
+
+The parent packs every symbol's OHLCV bars into one shared-memory block;
+workers attach to it by name and receive only (symbol, row range, params)
+tuples, so no DataFrame is pickled. Each worker returns its (small)
+opportunity dicts, and summary entries if asked, in symbol order; the
+parent reduces them exactly as the serial scan does.
+
+A worker that dies (killed, out of memory) breaks the whole pool: scan
+then discards it, so the next scan starts a fresh one, and raises
+BrokenProcessPool for the caller to fall back to a serial scan.
+'''
+
+import logging
+import math
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from multiprocessing import shared_memory
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+OHLCV = ('open', 'high', 'low', 'close', 'volume')
+
+# Tasks handed to each worker per scan
+CHUNKS_PER_WORKER = 4
+
+# Worker-process scanner, built once by the pool initializer
+_worker_scanner = None
+
+
+def _init_worker(indicator_mode: str):
+    global _worker_scanner
+    # Deferred: scanner imports this module
+    from indicator_cache import AIMnIndicatorCache
+    from scanner import AIMnScanner
+    # Bars change every scan, so the worker keeps no indicator cache
+    _worker_scanner = AIMnScanner({}, cache=AIMnIndicatorCache(max_mb=0),
+                                  indicator_mode=indicator_mode)
+
+
+def _scan_chunk(shm_name: str, shape: Tuple[int, int],
+                tasks: List[Tuple[str, int, int, Dict]],
+                summarize: bool) -> Tuple[List[Dict], Optional[Dict[str, Dict]]]:
+    '''
+    Scan a chunk of symbols whose bars are rows [start, stop) of the shared block
+    Returns the opportunities and (if summarize) the symbols' signal summaries
+    '''
+    shm = shared_memory.SharedMemory(name=shm_name)
+    try:
+        bars = np.ndarray(shape, dtype=np.float64, buffer=shm.buf)
+        opportunities = []
+        summary = {} if summarize else None
+        for symbol, start, stop, params in tasks:
+            try:
+                df = pd.DataFrame(bars[start:stop].copy(), columns=list(OHLCV))
+                latest = _worker_scanner.latest_indicators(symbol, df, params)
+                opportunity = _worker_scanner.evaluate_latest(symbol, latest, params, summary)
+                if opportunity:
+                    opportunities.append(opportunity)
+            except Exception as e:
+                logger.error(f"Error scanning {symbol}: {e}")
+                if summary is not None:
+                    summary[symbol] = {'status': 'error', 'error': str(e)}
+        return opportunities, summary
+    finally:
+        del bars
+        shm.close()
+
+
+class AIMnParallelScan:
+    '''Persistent process pool that scans symbols from shared-memory bars'''
+
+    def __init__(self, workers: int, indicator_mode: str = 'tail'):
+        '''
+        Args:
+            workers: Worker processes
+            indicator_mode: 'tail' or 'full' (see AIMnScanner)
+        '''
+        self.workers = workers
+        self.indicator_mode = indicator_mode
+        self._pool: Optional[ProcessPoolExecutor] = None
+
+    @property
+    def pool(self) -> ProcessPoolExecutor:
+        '''The worker pool, started on first use and reused across scans'''
+        if self._pool is None:
+            self._pool = ProcessPoolExecutor(max_workers=self.workers, initializer=_init_worker,
+                                             initargs=(self.indicator_mode,))
+        return self._pool
+
+    def scan(self, market_data: Dict[str, pd.DataFrame], params: Dict[str, Dict],
+             summary: Optional[Dict[str, Dict]] = None) -> List[Dict]:
+        '''
+        Scan symbols in parallel
+
+        Args:
+            market_data: Bars for each symbol (symbols with enough data)
+            params: Parameters for each symbol
+            summary: If given, filled with each symbol's signal summary
+
+        Returns:
+            Opportunities in market_data order, as the serial scan finds them
+
+        Raises:
+            BrokenProcessPool: A worker died; the pool has been discarded
+        '''
+        symbols = list(market_data)
+        if not symbols:
+            return []
+        lengths = [len(market_data[symbol]) for symbol in symbols]
+        shape = (sum(lengths), len(OHLCV))
+
+        shm = shared_memory.SharedMemory(create=True, size=max(int(np.prod(shape)) * 8, 1))
+        try:
+            bars = np.ndarray(shape, dtype=np.float64, buffer=shm.buf)
+            tasks = []
+            start = 0
+            for symbol, length in zip(symbols, lengths):
+                bars[start:start + length] = market_data[symbol][list(OHLCV)].to_numpy(dtype=float)
+                tasks.append((symbol, start, start + length, params[symbol]))
+                start += length
+            del bars
+
+            chunk_size = math.ceil(len(tasks) / (self.workers * CHUNKS_PER_WORKER))
+            chunks = [tasks[i:i + chunk_size] for i in range(0, len(tasks), chunk_size)]
+            try:
+                futures = [self.pool.submit(_scan_chunk, shm.name, shape, chunk, summary is not None)
+                           for chunk in chunks]
+                opportunities = []
+                for future in futures:
+                    chunk_opportunities, chunk_summary = future.result()
+                    opportunities.extend(chunk_opportunities)
+                    if summary is not None:
+                        summary.update(chunk_summary)
+                return opportunities
+            except BrokenProcessPool:
+                logger.error("Parallel scan worker died, restarting the pool")
+                self.close(wait=False)
+                raise
+        finally:
+            shm.close()
+            shm.unlink()
+
+    def close(self, wait: bool = True):
+        '''Shut the worker pool down'''
+        if self._pool is not None:
+            self._pool.shutdown(wait=wait, cancel_futures=not wait)
+            self._pool = None
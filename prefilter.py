@@ -0,0 +1,170 @@
+# prefilter.py
+'''
+AIMn Trading System - Cascading Pre-Filter
+Rejects symbols on the cheapest entry gates before the expensive indicators
+
+An entry needs every enabled gate to pass (volume, RSI, ATR and MACD), so a
+symbol that fails any one of them can never become an opportunity. The
+cascade evaluates the gates cheapest first on the latest bar only:
+
+    volume  volume ratio, last 20 bars
+    rsi     RSI Real outside the entry band, last rsi_window bars
+    atr     ATR expansion, Wilder ATR over the history
+
+and only survivors get the remaining indicators (MACD, OBV). A stage whose
+filter is switched off passes every symbol. Gates compare exactly as
+check_entry_conditions does, so no opportunity is ever filtered out.
+
+Batch scans compute the gate columns of all symbols in one pass and run
+the stages on those rows (passes); a rejected symbol's gate values still
+make up its signal summary entry (see NOT_EVALUATED and unevaluated_bits).
+'''
+
+from typing import Callable, Dict, FrozenSet, Iterable, Optional, Tuple
+
+import pandas as pd
+
+from condition_bits import BIT
+from indicators import AIMnIndicators
+from symbol_params import AIMnSymbolParams
+
+
+class _Stage:
+    '''One gate of the cascade'''
+
+    __slots__ = ('name', 'columns', 'enabled', 'passes')
+
+    def __init__(self, name: str, columns: Tuple[str, ...],
+                 enabled: Callable[[Dict], bool], passes: Callable[[Dict, Dict], bool]):
+        self.name = name
+        self.columns = columns  # Latest-row columns the gate reads
+        self.enabled = enabled  # enabled(params) -> bool
+        self.passes = passes    # passes(latest, params) -> bool
+
+
+PREFILTER_STAGES = (
+    _Stage('volume', ('volume_ratio',),
+           lambda p: p.volume_confirmation,
+           lambda latest, p: bool(latest['volume_ratio'] >= p.volume_threshold)),
+    _Stage('rsi', ('rsi_real',),
+           lambda p: True,
+           lambda latest, p: bool(latest['rsi_real'] <= p.rsi_oversold or
+                                  latest['rsi_real'] >= p.rsi_overbought)),
+    _Stage('atr', ('atr_ratio',),
+           lambda p: p.atr_filter,
+           lambda latest, p: bool(latest['atr_ratio'] >= p.atr_threshold)),
+)
+
+# Latest-row values of the indicators a rejected symbol never got; the
+# entry conditions reading them are unknown (see unevaluated_bits)
+NOT_EVALUATED = {
+    'rsi_real': float('nan'),
+    'macd_bullish_cross': False,
+    'macd_bearish_cross': False,
+    'volume_ratio': float('nan'),
+    'obv': float('nan'),
+    'obv_sma': float('nan'),
+    'atr_ratio': float('nan'),
+}
+
+
+def unevaluated_bits(latest: Dict, params: Dict) -> int:
+    '''
+    Condition bits (see condition_bits) that a rejected symbol's gate row
+    cannot decide: the MACD crosses, and the OBV trend of volume_buy /
+    volume_sell once the volume ratio itself passes
+    '''
+    params = AIMnSymbolParams.resolve(params)
+    bits = BIT['macd_buy'] | BIT['macd_sell']
+    if params.volume_confirmation and latest['volume_ratio'] >= params.volume_threshold:
+        bits |= BIT['volume_buy'] | BIT['volume_sell']
+    return bits
+
+
+class AIMnPrefilter:
+    '''Staged latest-bar screen with per-stage pass-through counts'''
+
+    def __init__(self, stages: Tuple[_Stage, ...] = PREFILTER_STAGES):
+        self.stages = stages
+        self.reset()
+
+    def reset(self):
+        '''Start counting a new scan'''
+        self.counts = {'screened': 0}
+        for stage in self.stages:
+            self.counts[stage.name] = 0
+        self.counts['survivors'] = 0
+
+    def gate_columns(self, params: Dict) -> FrozenSet[str]:
+        '''Latest-row columns read by the enabled stages'''
+        params = AIMnSymbolParams.resolve(params)
+        return frozenset(column for stage in self.stages if stage.enabled(params)
+                         for column in stage.columns)
+
+    def cascade(self, df: pd.DataFrame, params: Dict) -> Tuple[Dict, bool]:
+        '''
+        Run the stages on a symbol's bars, computing each gate's columns
+        only when the previous stages passed
+
+        Returns:
+            (latest-row dict with OHLCV and the gate columns computed, passed)
+        '''
+        params = AIMnSymbolParams.resolve(params)
+        latest: Dict = {}
+
+        def compute(needed):
+            latest.update(AIMnIndicators.calculate_latest_indicators(df, params, needed))
+
+        return latest, self._run(latest, params, compute)
+
+    def passes(self, latest: Dict, params: Dict) -> bool:
+        '''Run the stages on a latest row that has every gate column (batch scans)'''
+        return self._run(latest, AIMnSymbolParams.resolve(params))
+
+    def _run(self, latest: Dict, params: AIMnSymbolParams,
+             compute: Optional[Callable[[list], None]] = None) -> bool:
+        '''Walk the stages in order, counting pass-throughs'''
+        self.counts['screened'] += 1
+        for stage in self.stages:
+            if stage.enabled(params):
+                if compute is not None:
+                    needed = [column for column in stage.columns if column not in latest]
+                    if needed:
+                        compute(needed)
+                if not stage.passes(latest, params):
+                    return False
+            self.counts[stage.name] += 1
+        self.counts['survivors'] += 1
+        return True
+
+    def screen(self, df: pd.DataFrame, params: Dict,
+               columns: Iterable[str]) -> Optional[Dict]:
+        '''
+        Run the cascade on a symbol's bars
+
+        Args:
+            df: OHLCV DataFrame
+            params: Symbol parameters
+            columns: Columns the full latest row must have (see indicator_planner)
+
+        Returns:
+            The latest-row dict with all requested columns (as
+            calculate_latest_indicators), or None if a gate rejected it
+        '''
+        params = AIMnSymbolParams.resolve(params)
+        latest, passed = self.cascade(df, params)
+        if not passed:
+            return None
+        return self.complete(df, params, latest, columns)
+
+    @staticmethod
+    def complete(df: pd.DataFrame, params: Dict, latest: Dict, columns: Iterable[str]) -> Dict:
+        '''Add the requested columns a gate row lacks (in place)'''
+        remaining = frozenset(columns).difference(latest)
+        if remaining:
+            latest.update(AIMnIndicators.calculate_latest_indicators(df, params, remaining))
+        return latest
+
+    def stats(self) -> Dict[str, int]:
+        '''Symbols screened, passing each stage (in order) and surviving, since reset'''
+        return dict(self.counts)
@@ -0,0 +1,120 @@
+# scan_cadence.py
+'''
+AIMn Trading System - Adaptive Scan Cadence
+Scans near-trigger and volatile symbols more often than quiet ones
+
+Each scanned symbol gets an urgency in [0, 1] from its latest signal
+summary entry:
+
+    proximity   1 when RSI Real is at or beyond rsi_oversold/rsi_overbought,
+                falling linearly to 0 `rsi_band` RSI points away
+    volatility  ATR ratio between 1 (average) and atr_threshold, as 0..1
+
+A symbol the prefilter rejected is scored from the same values: its summary
+entry carries the RSI Real and ATR ratio whichever gate rejected it.
+
+urgency = max(proximity, volatility). The symbol is due again after an
+interval between max_interval (urgency 0) and min_interval (urgency 1),
+interpolated geometrically. Due symbols are fetched most urgent first,
+as far as a token-bucket budget of data requests per minute allows;
+symbols never scanned count as most urgent.
+'''
+
+import math
+import time
+from typing import Callable, Dict, Iterable, List, Optional
+
+from symbol_params import AIMnSymbolParams
+
+
+class AIMnScanCadence:
+    '''Per-symbol scan intervals from the latest indicator snapshot'''
+
+    def __init__(self, min_interval: float = 60, max_interval: float = 300,
+                 requests_per_minute: float = 60, rsi_band: float = 15.0,
+                 slack: float = 5.0, clock: Callable[[], float] = time.time):
+        '''
+        Args:
+            min_interval: Seconds between scans of the most urgent symbols
+            max_interval: Seconds between scans of the quietest symbols
+            requests_per_minute: Global budget of symbol fetches (token bucket,
+                up to one minute's worth may be spent at once)
+            rsi_band: RSI points from a threshold at which proximity reaches 0
+            slack: Seconds early a symbol may be picked up (absorbs wake-up
+                jitter, so a 60 s interval does not skip a 1-minute bar)
+            clock: Current time in epoch seconds
+        '''
+        self.min_interval = min_interval
+        self.max_interval = max(max_interval, min_interval)
+        self.requests_per_minute = requests_per_minute
+        self.rsi_band = rsi_band
+        self.slack = slack
+        self.clock = clock
+        self.tokens = float(requests_per_minute)
+        self.refilled: Optional[float] = None
+        self.urgency: Dict[str, float] = {}
+        self.selected_at: Dict[str, float] = {}
+        self.next_due: Dict[str, float] = {}
+
+    def score(self, entry: Dict, params: AIMnSymbolParams) -> float:
+        '''Urgency of a signal summary entry (see get_signal_summary)'''
+        if entry.get('status') != 'ready':
+            return 0.0
+        rsi = entry['rsi']
+        proximity = 0.0
+        if math.isfinite(rsi):
+            distance = max(min(rsi - params.rsi_oversold, params.rsi_overbought - rsi), 0.0)
+            proximity = max(0.0, 1.0 - distance / self.rsi_band)
+        atr_ratio = entry.get('atr_ratio', math.nan)
+        volatility = 0.0
+        if math.isfinite(atr_ratio):
+            if params.atr_threshold > 1:
+                volatility = min(max((atr_ratio - 1) / (params.atr_threshold - 1), 0.0), 1.0)
+            else:
+                volatility = float(atr_ratio >= params.atr_threshold)
+        return max(proximity, volatility)
+
+    def interval(self, urgency: float) -> float:
+        '''Seconds until a symbol with this urgency is scanned again'''
+        return self.max_interval * (self.min_interval / self.max_interval) ** urgency
+
+    def observe(self, summary: Dict[str, Dict],
+                get_params: Callable[[str], AIMnSymbolParams]):
+        '''Reschedule the symbols of a scan from their summary entries'''
+        now = self.clock()
+        for symbol, entry in summary.items():
+            urgency = self.score(entry, get_params(symbol))
+            self.urgency[symbol] = urgency
+            self.next_due[symbol] = self.selected_at.get(symbol, now) + self.interval(urgency)
+
+    def select(self, symbols: Iterable[str], required: Iterable[str] = (),
+               now: Optional[float] = None) -> List[str]:
+        '''
+        Due symbols to fetch now, most urgent first, within the request budget
+
+        Args:
+            symbols: Candidate symbols (e.g. those with a new bar)
+            required: Symbols always fetched (e.g. open positions); they
+                use budget but are never dropped
+
+        Returns:
+            Selected symbols in `symbols` order
+        '''
+        now = self.clock() if now is None else now
+        if self.refilled is not None:
+            self.tokens = min(self.tokens + (now - self.refilled) * self.requests_per_minute / 60,
+                              float(self.requests_per_minute))
+        self.refilled = now
+
+        symbols = list(symbols)
+        required = set(required).intersection(symbols)
+        due = [symbol for symbol in symbols
+               if symbol not in required and self.next_due.get(symbol, now) <= now + self.slack]
+        due.sort(key=lambda symbol: (-self.urgency.get(symbol, 1.0), self.next_due.get(symbol, now)))
+        self.tokens -= len(required)
+        chosen = required.union(due[:max(int(self.tokens), 0)])
+        self.tokens -= len(chosen) - len(required)
+
+        for symbol in chosen:
+            self.selected_at[symbol] = now
+        return [symbol for symbol in symbols if symbol in chosen]
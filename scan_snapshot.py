@@ -0,0 +1,44 @@
+# scan_snapshot.py
+'''
+AIMn Trading System - Scan Snapshot
+Publishes each scan's result (candidates and signal summary) for the dashboards
+
+The engine writes the result of AIMnScanner.scan once per cycle; dashboards
+read the file instead of recomputing indicators. The file is replaced
+atomically, so a reader never sees a half-written snapshot.
+'''
+
+import json
+import os
+from datetime import datetime
+from typing import Dict, Optional
+
+import numpy as np
+
+SNAPSHOT_FILE = 'aimn_scan_snapshot.json'
+
+
+def _plain(value):
+    '''JSON fallback for numpy scalars and timestamps'''
+    if isinstance(value, np.generic):
+        return value.item()
+    if isinstance(value, datetime):
+        return value.isoformat()
+    raise TypeError(f"Not JSON serializable: {type(value).__name__}")
+
+
+def publish_snapshot(result: Dict, path: str = SNAPSHOT_FILE):
+    '''Write a scan result (see AIMnScanner.scan) to path, replacing the previous one'''
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, 'w') as f:
+        json.dump(result, f, default=_plain)
+    os.replace(tmp_path, path)
+
+
+def load_snapshot(path: str = SNAPSHOT_FILE) -> Optional[Dict]:
+    '''The latest published scan result, or None if there is none yet'''
+    try:
+        with open(path, 'r') as f:
+            return json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return None
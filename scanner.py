@@ -5,40 +5,147 @@ Multi-symbol scanner for AIMn Trading System
 Scans all symbols and finds the best trading opportunity
 """
 
+import heapq
+import numpy as np
 import pandas as pd
 import logging
-from typing import Dict, List, Optional
+from concurrent.futures.process import BrokenProcessPool
+from datetime import datetime
+from typing import Dict, List, Mapping, Optional, Sequence, Tuple
 from indicators import AIMnIndicators
+from batch_indicators import AIMnBatchIndicators
+from indicator_cache import AIMnIndicatorCache, indicator_cache
+from indicator_planner import AIMnIndicatorPlanner
+from indicator_stream import AIMnStreamingIndicators
+from parallel_scan import AIMnParallelScan
+from prefilter import AIMnPrefilter, NOT_EVALUATED, unevaluated_bits
+from scan_cadence import AIMnScanCadence
+from condition_bits import ALL_BITS, AIMnConditionHistory, AIMnConditionTable, encode, missing
+from symbol_params import AIMnSymbolParams
 
 logger = logging.getLogger(__name__)
 
+# Scoring parameters (columns of the parameter matrix)
+SCORE_PARAMS = ('rsi_oversold', 'rsi_overbought', 'volume_threshold', 'atr_threshold',
+                'volume_confirmation', 'atr_filter')
+
+# Latest-row columns read by score_arrays
+SCORE_COLUMNS = ('rsi_real', 'macd_bullish_cross', 'macd_bearish_cross', 'volume_ratio', 'atr_ratio')
+
 
 class AIMnScanner:
     """Scanner to find trading opportunities across multiple symbols"""
     
-    def __init__(self, symbol_params: Dict[str, Dict]):
+    def __init__(self, symbol_params: Dict[str, Dict],
+                 cache: Optional[AIMnIndicatorCache] = None,
+                 indicator_mode: str = 'tail',
+                 workers: int = 0,
+                 parallel_min_symbols: int = 50,
+                 prefilter: bool = False,
+                 cadence: Optional[AIMnScanCadence] = None,
+                 condition_history: int = 1440,
+                 param_defaults: Optional[Dict] = None):
         """
         Initialize scanner with symbol-specific parameters
         
         Args:
             symbol_params: Dictionary of parameters for each symbol
+            cache: Indicator cache (defaults to the shared cache)
+            indicator_mode: How latest indicator values are produced:
+                'tail' - latest bar only, minimum lookback (default)
+                'stream' - incremental per-symbol state
+                'full' - full indicator frame
+            In 'tail' and 'full' mode only the indicators read by enabled
+            conditions and exit rules are calculated (see indicator_planner)
+            workers: Worker processes for parallel scans (0 = always serial;
+                not used in 'stream' mode, whose state lives in this process)
+            parallel_min_symbols: Smaller universes are scanned serially
+            prefilter: In 'tail' mode (serial, batch and parallel scans),
+                reject symbols on the cheap volume/RSI/ATR gates before
+                computing MACD and OBV (see prefilter); parallel scans run
+                the gates in one batch pass before dispatching survivors
+            cadence: Adaptive per-symbol scan frequency (see scan_cadence);
+                every scan() reschedules the symbols it scanned, observe()
+                the fetched symbols no scan covered
+            condition_history: scan() condition tables kept (see condition_bits)
+            param_defaults: Values for keys a symbol's parameters leave out,
+                before the field defaults (e.g. {'volume_confirmation':
+                VOLUME_CONFIRMATION})
+        """
+        if indicator_mode not in ('tail', 'stream', 'full'):
+            raise ValueError(f"Unknown indicator mode: {indicator_mode}")
+        
+        self.param_defaults = param_defaults
+        self.reload(symbol_params)
+        self.cache = cache if cache is not None else indicator_cache
+        self.indicator_mode = indicator_mode
+        self.stream = AIMnStreamingIndicators() if indicator_mode == 'stream' else None
+        self.planner = AIMnIndicatorPlanner()
+        self.parallel_min_symbols = parallel_min_symbols
+        self.parallel = (AIMnParallelScan(workers, indicator_mode)
+                         if workers > 0 and indicator_mode != 'stream' else None)
+        self.prefilter = AIMnPrefilter() if prefilter and indicator_mode == 'tail' else None
+        self.cadence = cadence
+        self.conditions: Optional[AIMnConditionTable] = None
+        self.condition_history = AIMnConditionHistory(condition_history)
+    
+    def reload(self, symbol_params: Dict[str, Dict]):
         """
-        self.symbol_params = symbol_params
-        self.default_params = symbol_params.get('DEFAULT', {})
+        Resolve every symbol's parameters into AIMnSymbolParams
+        
+        Missing keys get their defaults and values are validated here, once,
+        so a bad configuration fails at startup (or reload) rather than
+        mid-scan. Raises ValueError naming the symbol and parameter.
+        """
+        resolved = {}
+        for symbol, params in symbol_params.items():
+            try:
+                resolved[symbol] = AIMnSymbolParams.resolve(params, self.param_defaults)
+            except ValueError as e:
+                raise ValueError(f"{symbol}: {e}") from None
+        self.symbol_params = resolved
+        self.default_params = resolved.get('DEFAULT') or AIMnSymbolParams.resolve(None, self.param_defaults)
+        self._lookup: Dict[str, AIMnSymbolParams] = {}
+    
+    def get_symbol_params(self, symbol: str) -> AIMnSymbolParams:
+        """Get parameters for a specific symbol (shared, immutable)"""
+        params = self._lookup.get(symbol)
+        if params is None:
+            # Exact match, then without slash for crypto (BTC/USD -> BTCUSD),
+            # then the default parameters
+            params = self.symbol_params.get(symbol)
+            if params is None:
+                params = self.symbol_params.get(symbol.replace('/', ''), self.default_params)
+            self._lookup[symbol] = params
+        return params
     
-    def get_symbol_params(self, symbol: str) -> Dict:
-        """Get parameters for a specific symbol"""
-        # Try exact match first
-        if symbol in self.symbol_params:
-            return self.symbol_params[symbol]
+    def has_enough_data(self, df: pd.DataFrame, params: Dict) -> bool:
+        """Enough bars for every indicator to have a value on the latest bar"""
+        return df is not None and len(df) >= AIMnIndicators.required_lookback(params)
+    
+    def latest_indicators(self, symbol: str, df: pd.DataFrame, params: Optional[Dict] = None):
+        """
+        Latest indicator values for a symbol, using the scanner's indicator mode
+        
+        Returns:
+            Mapping with the keys of a row of calculate_all_indicators (OHLCV
+            plus the indicator columns the planner requires for params)
+        """
+        if params is None:
+            params = self.get_symbol_params(symbol)
         
-        # Try without slash for crypto (BTC/USD -> BTCUSD)
-        symbol_no_slash = symbol.replace('/', '')
-        if symbol_no_slash in self.symbol_params:
-            return self.symbol_params[symbol_no_slash]
+        if self.indicator_mode == 'stream':
+            return self.stream.update_from_frame(symbol, df, params)
         
-        # Return default parameters
-        return self.default_params.copy()
+        columns = self.planner.required_columns(params)
+        if self.indicator_mode == 'full':
+            key = AIMnIndicatorCache.make_key(symbol, df, params, ('frame', columns))
+            return self.cache.get_or_compute(
+                key, lambda: self.planner.compute(df, params, columns)).iloc[-1]
+        
+        key = AIMnIndicatorCache.make_key(symbol, df, params, ('latest', columns))
+        return self.cache.get_or_compute(
+            key, lambda: AIMnIndicators.calculate_latest_indicators(df, params, columns))
     
     def calculate_opportunity_score(self, df: pd.DataFrame, params: Dict, direction: str) -> float:
         """
@@ -48,46 +155,152 @@ class AIMnScanner:
         if len(df) < 2:
             return 0
         
-        latest = df.iloc[-1]
+        return self.score_latest(df.iloc[-1], params, direction)
+    
+    def score_latest(self, latest, params: Dict, direction: str) -> float:
+        """
+        Score the latest indicator row (DataFrame row or batch view)
+        """
+        params = AIMnSymbolParams.resolve(params)
         score = 0
         
         # RSI component (0-40 points)
         rsi = latest['rsi_real']
         if direction == 'BUY':
-            rsi_oversold = params.get('rsi_oversold', 30)
+            rsi_oversold = params.rsi_oversold
             if rsi <= rsi_oversold:
                 # The lower the RSI, the higher the score
                 rsi_score = (rsi_oversold - rsi) / rsi_oversold * 40
                 score += rsi_score
         else:  # SELL
-            rsi_overbought = params.get('rsi_overbought', 70)
+            rsi_overbought = params.rsi_overbought
             if rsi >= rsi_overbought:
                 # The higher the RSI, the higher the score
                 rsi_score = (rsi - rsi_overbought) / (100 - rsi_overbought) * 40
                 score += rsi_score
         
         # MACD component (0-30 points)
-        if direction == 'BUY' and latest.get('macd_cross_up', False):
+        if direction == 'BUY' and latest.get('macd_bullish_cross', False):
             score += 30
-        elif direction == 'SELL' and latest.get('macd_cross_down', False):
+        elif direction == 'SELL' and latest.get('macd_bearish_cross', False):
             score += 30
         
         # Volume component (0-20 points)
-        volume_ratio = latest['volume_ratio']
-        volume_threshold = params.get('volume_threshold', 1.2)
-        if volume_ratio >= volume_threshold:
-            volume_score = min((volume_ratio - 1) * 10, 20)
-            score += volume_score
+        if params.volume_confirmation:
+            volume_ratio = latest['volume_ratio']
+            volume_threshold = params.volume_threshold
+            if volume_ratio >= volume_threshold:
+                volume_score = min((volume_ratio - 1) * 10, 20)
+                score += volume_score
         
         # ATR component (0-10 points)
-        atr_ratio = latest['atr_ratio']
-        atr_threshold = params.get('atr_threshold', 1.3)
-        if atr_ratio >= atr_threshold:
-            atr_score = min((atr_ratio - 1) * 10, 10)
-            score += atr_score
+        if params.atr_filter:
+            atr_ratio = latest['atr_ratio']
+            atr_threshold = params.atr_threshold
+            if atr_ratio >= atr_threshold:
+                atr_score = min((atr_ratio - 1) * 10, 10)
+                score += atr_score
         
         return score
     
+    @staticmethod
+    def parameter_matrix(params_list: Sequence[Dict]) -> np.ndarray:
+        """(symbols x SCORE_PARAMS) float matrix of scoring thresholds and filter switches"""
+        resolve = AIMnSymbolParams.resolve
+        return np.array([[float(getattr(params, name)) for name in SCORE_PARAMS]
+                         for params in map(resolve, params_list)], dtype=float).reshape(-1, len(SCORE_PARAMS))
+    
+    @staticmethod
+    def stack_latest(latest_rows: Sequence[Mapping]) -> Dict[str, np.ndarray]:
+        """Latest-row values as one array per SCORE_COLUMNS column (NaN if not calculated)"""
+        return {column: np.array([float(latest.get(column, np.nan)) for latest in latest_rows])
+                for column in SCORE_COLUMNS}
+    
+    @staticmethod
+    def score_arrays(latest: Dict[str, np.ndarray],
+                     param_matrix: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        BUY and SELL scores for many symbols at once
+        
+        Same points as score_latest (bit-for-bit), with each symbol's
+        thresholds taken from its row of parameter_matrix.
+        
+        Args:
+            latest: Arrays of SCORE_COLUMNS values, one element per symbol
+            param_matrix: Matching parameter_matrix rows
+            
+        Returns:
+            (buy_scores, sell_scores)
+        """
+        rsi_oversold, rsi_overbought, volume_threshold, atr_threshold, \
+            volume_confirmation, atr_filter = param_matrix.T
+        rsi = latest['rsi_real']
+        bullish = np.nan_to_num(latest['macd_bullish_cross']).astype(bool)
+        bearish = np.nan_to_num(latest['macd_bearish_cross']).astype(bool)
+        
+        with np.errstate(invalid='ignore', divide='ignore'):
+            # RSI component (0-40 points)
+            rsi_buy = np.where(rsi <= rsi_oversold, (rsi_oversold - rsi) / rsi_oversold * 40, 0.0)
+            rsi_sell = np.where(rsi >= rsi_overbought,
+                                (rsi - rsi_overbought) / (100 - rsi_overbought) * 40, 0.0)
+            
+            # Volume component (0-20 points), same for both directions
+            volume_ratio = latest['volume_ratio']
+            volume = np.where((volume_confirmation != 0) & (volume_ratio >= volume_threshold),
+                              np.minimum((volume_ratio - 1) * 10, 20), 0.0)
+            
+            # ATR component (0-10 points)
+            atr_ratio = latest['atr_ratio']
+            atr = np.where((atr_filter != 0) & (atr_ratio >= atr_threshold),
+                           np.minimum((atr_ratio - 1) * 10, 10), 0.0)
+        
+        # MACD component (0-30 points)
+        buy = rsi_buy + np.where(bullish, 30.0, 0.0) + volume + atr
+        sell = rsi_sell + np.where(bearish, 30.0, 0.0) + volume + atr
+        return buy, sell
+    
+    def scan_latest(self, symbol: str, latest, params: Dict,
+                    scores: Optional[Tuple[float, float]] = None,
+                    conditions: Optional[Dict] = None) -> Optional[Dict]:
+        """
+        Evaluate a symbol from its latest indicator row
+        
+        Args:
+            scores: Precomputed (buy, sell) scores (see score_arrays)
+            conditions: Precomputed check_entry_conditions result
+        
+        Returns:
+            Dictionary with opportunity details or None
+        """
+        if conditions is None:
+            conditions = AIMnIndicators.check_entry_conditions(latest, params)
+        
+        # Create opportunity if conditions are met
+        if conditions['buy']:
+            direction = 'BUY'
+        elif conditions['sell']:
+            direction = 'SELL'
+        else:
+            return None
+        
+        return {
+            'symbol': symbol,
+            'direction': direction,
+            'entry_price': latest['close'],
+            'score': (self.score_latest(latest, params, direction) if scores is None
+                      else scores[0] if direction == 'BUY' else scores[1]),
+            'indicators': {
+                'rsi_real': latest['rsi_real'],
+                'macd': latest['macd'],
+                'signal': latest['macd_signal'],
+                # Not calculated when the volume / ATR filter is disabled
+                'volume_ratio': latest.get('volume_ratio', float('nan')),
+                'atr_ratio': latest.get('atr_ratio', float('nan')),
+                'obv_trend': (1 if latest['obv'] > latest['obv_sma'] else -1) if 'obv' in latest else 0
+            },
+            'conditions': conditions
+        }
+    
     def scan_symbol(self, symbol: str, df: pd.DataFrame) -> Optional[Dict]:
         """
         Scan a single symbol for trading opportunities
@@ -95,86 +308,304 @@ class AIMnScanner:
         Returns:
             Dictionary with opportunity details or None
         """
-        if df is None or len(df) < 50:  # Need minimum bars for indicators
+        # Get symbol-specific parameters
+        params = self.get_symbol_params(symbol)
+        
+        if not self.has_enough_data(df, params):  # Need minimum bars for indicators
             logger.debug(f"Insufficient data for {symbol}")
             return None
         
-        # Get symbol-specific parameters
-        params = self.get_symbol_params(symbol)
+        # Latest indicator values (reused if no new bar since the last scan)
+        if self.prefilter is not None:
+            latest = self.prefiltered_latest(symbol, df, params)
+            if latest is None:
+                return None
+        else:
+            latest = self.latest_indicators(symbol, df, params)
         
-        # Calculate all indicators
-        df_with_indicators = AIMnIndicators.calculate_all_indicators(df, params)
+        return self.scan_latest(symbol, latest, params)
+    
+    def prefiltered_latest(self, symbol: str, df: pd.DataFrame, params: Dict,
+                           summary: Optional[Dict] = None) -> Optional[Dict]:
+        """
+        Latest indicator values if the symbol passes the prefilter cascade
         
-        # Check entry conditions
-        conditions = AIMnIndicators.check_entry_conditions(df_with_indicators, params)
+        Survivors are cached like latest_indicators results; a cached row
+        is reused without screening again. A rejected symbol's summary
+        entry (if summary is given) is built from its gate values, with
+        the gates after the rejecting one computed as well.
+        """
+        columns = self.planner.required_columns(params)
+        key = AIMnIndicatorCache.make_key(symbol, df, params, ('latest', columns))
+        latest = self.cache.get(key)
+        if latest is None:
+            gates, passed = self.prefilter.cascade(df, params)
+            if not passed:
+                if summary is not None:
+                    self.prefilter.complete(df, params, gates, self.prefilter.gate_columns(params))
+                    summary[symbol] = self.summarize_rejected(gates, params)
+                return None
+            latest = self.cache.put(key, self.prefilter.complete(df, params, gates, columns))
+        return latest
+    
+    def batch_latest_rows(self, market_data: Dict[str, pd.DataFrame],
+                          summary: Optional[Dict] = None,
+                          errors: Optional[Dict[str, Exception]] = None) -> Dict[str, Dict]:
+        """
+        Latest-row indicator views for all symbols
+        Cached symbols are reused; the rest are computed in one batch pass,
+        limited to the planner's columns and, in 'tail' mode, evaluated on
+        the latest bar only (see AIMnBatchIndicators.calculate_latest)
         
-        # Get latest values
-        latest = df_with_indicators.iloc[-1]
+        With the prefilter, the gate columns of the uncached symbols are
+        computed first and only survivors get the remaining indicators;
+        rejected symbols are left out (with their summary entry from the
+        gate values, if summary is given).
         
-        # Create opportunity if conditions are met
-        if conditions['buy']:
-            score = self.calculate_opportunity_score(df_with_indicators, params, 'BUY')
-            return {
-                'symbol': symbol,
-                'direction': 'BUY',
-                'entry_price': latest['close'],
-                'score': score,
-                'indicators': {
-                    'rsi_real': latest['rsi_real'],
-                    'macd': latest['macd'],
-                    'signal': latest['signal'],
-                    'volume_ratio': latest['volume_ratio'],
-                    'atr_ratio': latest['atr_ratio'],
-                    'obv_trend': latest['obv_trend']
-                },
-                'conditions': conditions
-            }
+        A parameter group that fails is computed symbol by symbol; symbols
+        that fail on their own are left out too, with their exception in
+        errors if given (see AIMnBatchIndicators.latest_rows).
+        """
+        latest_rows = {}
+        keys = {}
+        for symbol, df in market_data.items():
+            params = self.get_symbol_params(symbol)
+            try:
+                key = AIMnIndicatorCache.make_key(symbol, df, params,
+                                                  ('latest', self.planner.required_columns(params)))
+            except Exception as e:
+                if errors is None:
+                    raise
+                errors[symbol] = e
+                continue
+            cached = self.cache.get(key)
+            if cached is None:
+                keys[symbol] = key
+            else:
+                latest_rows[symbol] = cached
         
-        elif conditions['sell']:
-            score = self.calculate_opportunity_score(df_with_indicators, params, 'SELL')
-            return {
-                'symbol': symbol,
-                'direction': 'SELL',
-                'entry_price': latest['close'],
-                'score': score,
-                'indicators': {
-                    'rsi_real': latest['rsi_real'],
-                    'macd': latest['macd'],
-                    'signal': latest['signal'],
-                    'volume_ratio': latest['volume_ratio'],
-                    'atr_ratio': latest['atr_ratio'],
-                    'obv_trend': latest['obv_trend']
-                },
-                'conditions': conditions
-            }
+        if keys:
+            missing = {symbol: market_data[symbol] for symbol in keys}
+            gate_rows = {}
+            if self.prefilter is not None:
+                gate_rows = self.batch_prefilter(missing, summary, errors)
+                missing = {symbol: missing[symbol] for symbol in gate_rows}
+            
+            def remaining_columns(symbol: str):
+                columns = self.planner.required_columns(self.get_symbol_params(symbol))
+                return columns.difference(gate_rows.get(symbol, ()))
+            
+            computed = AIMnBatchIndicators.latest_rows(
+                missing, self.get_symbol_params, get_columns=remaining_columns,
+                tail=self.indicator_mode == 'tail', errors=errors)
+            for symbol, latest in computed.items():
+                if symbol in gate_rows:
+                    latest = dict(gate_rows[symbol], **latest)
+                latest_rows[symbol] = self.cache.put(keys[symbol], latest)
         
-        return None
+        return latest_rows
     
-    def scan_all_symbols(self, market_data: Dict[str, pd.DataFrame]) -> Optional[Dict]:
+    def batch_prefilter(self, market_data: Dict[str, pd.DataFrame],
+                        summary: Optional[Dict] = None,
+                        errors: Optional[Dict[str, Exception]] = None) -> Dict[str, Dict]:
         """
-        Scan all symbols and return the best opportunity
+        Gate rows of the symbols that pass the prefilter, with the gate
+        columns of all symbols computed in one batch pass
+        Rejected symbols are left out (with their summary entry from the
+        gate values, if summary is given), as are symbols that fail (with
+        their exception in errors if given)
+        """
+        gate_rows = AIMnBatchIndicators.latest_rows(
+            market_data, self.get_symbol_params,
+            get_columns=lambda symbol: self.prefilter.gate_columns(self.get_symbol_params(symbol)),
+            tail=True, errors=errors)
+        survivors = {}
+        for symbol, gates in gate_rows.items():
+            params = self.get_symbol_params(symbol)
+            if self.prefilter.passes(gates, params):
+                survivors[symbol] = gates
+            elif summary is not None:
+                summary[symbol] = self.summarize_rejected(gates, params)
+        return survivors
+    
+    @staticmethod
+    def report_errors(errors: Dict[str, Exception], summary: Optional[Dict]):
+        """Log the symbols a scan failed on, with an 'error' summary entry if summary is given"""
+        for symbol, e in errors.items():
+            logger.error(f"Error scanning {symbol}: {e}")
+            if summary is not None:
+                summary[symbol] = {'status': 'error', 'error': str(e)}
+    
+    def evaluate_latest(self, symbol: str, latest, params: Dict, summary: Optional[Dict],
+                        scores: Optional[Tuple[float, float]] = None) -> Optional[Dict]:
+        """
+        Opportunity for a symbol's latest row, recording its summary entry
+        (if summary is given) from the same entry-condition check
+        """
+        conditions = AIMnIndicators.check_entry_conditions(latest, params)
+        if summary is not None:
+            summary[symbol] = self.summarize_latest(latest, conditions)
+        return self.scan_latest(symbol, latest, params, scores=scores, conditions=conditions)
+    
+    def collect_opportunities(self, market_data: Dict[str, pd.DataFrame],
+                              batch: bool = False,
+                              summary: Optional[Dict[str, Dict]] = None) -> List[Dict]:
+        """
+        All opportunities in the universe, in market_data order
         
         Args:
             market_data: Dictionary of DataFrames for each symbol
-            
-        Returns:
-            Best opportunity or None
+            batch: Compute indicators for all symbols in one vectorized pass
+            summary: If given, filled with every symbol's signal summary
+                (see get_signal_summary) in the same pass. Symbols the
+                prefilter rejects get an entry from their gate values
+                (see summarize_rejected).
         """
         opportunities = []
+        if self.prefilter is not None:
+            self.prefilter.reset()
+        if summary is not None:
+            # Overwritten below for symbols with enough data (keeps market_data order)
+            summary.update((symbol, {'status': 'insufficient_data'}) for symbol in market_data)
         
-        for symbol, df in market_data.items():
+        if self.parallel is not None and len(market_data) >= self.parallel_min_symbols:
+            ready = {symbol: df for symbol, df in market_data.items()
+                     if self.has_enough_data(df, self.get_symbol_params(symbol))}
+            if self.prefilter is not None:
+                # Cheap gates in one batch pass here; only survivors go to the workers
+                errors: Dict[str, Exception] = {}
+                survivors = self.batch_prefilter(ready, summary, errors)
+                self.report_errors(errors, summary)
+                ready = {symbol: ready[symbol] for symbol in survivors}
+            try:
+                return self.parallel.scan(
+                    ready, {symbol: self.get_symbol_params(symbol) for symbol in ready}, summary)
+            except BrokenProcessPool:
+                # The next scan gets a fresh pool
+                logger.warning("Scanning serially this cycle")
+                if self.prefilter is not None:
+                    self.prefilter.reset()
+        
+        if batch:
+            ready = {symbol: df for symbol, df in market_data.items()
+                     if self.has_enough_data(df, self.get_symbol_params(symbol))}
+            errors = {}
+            latest_rows = self.batch_latest_rows(ready, summary, errors)
+            self.report_errors(errors, summary)
+            symbols = list(latest_rows)
+            params_list = [self.get_symbol_params(symbol) for symbol in symbols]
             try:
-                opportunity = self.scan_symbol(symbol, df)
-                if opportunity:
-                    opportunities.append(opportunity)
-                    logger.debug(f"Opportunity found: {symbol} {opportunity['direction']} "
-                               f"(score: {opportunity['score']:.1f})")
+                buy_scores, sell_scores = self.score_arrays(
+                    self.stack_latest([latest_rows[symbol] for symbol in symbols]),
+                    self.parameter_matrix(params_list))
+                scores = list(zip(buy_scores, sell_scores))
             except Exception as e:
-                logger.error(f"Error scanning {symbol}: {e}")
+                # Scored one symbol at a time (score_latest) instead
+                logger.error(f"Batch scoring failed, scoring per symbol: {e}")
+                scores = [None] * len(symbols)
+            for i, symbol in enumerate(symbols):
+                try:
+                    opportunity = self.evaluate_latest(symbol, latest_rows[symbol], params_list[i],
+                                                       summary, scores[i])
+                    if opportunity:
+                        opportunities.append(opportunity)
+                except Exception as e:
+                    logger.error(f"Error scanning {symbol}: {e}")
+                    if summary is not None:
+                        summary[symbol] = {'status': 'error', 'error': str(e)}
+        else:
+            for symbol, df in market_data.items():
+                try:
+                    if summary is None:
+                        opportunity = self.scan_symbol(symbol, df)
+                    else:
+                        params = self.get_symbol_params(symbol)
+                        if not self.has_enough_data(df, params):
+                            continue
+                        if self.prefilter is not None:
+                            latest = self.prefiltered_latest(symbol, df, params, summary)
+                            if latest is None:
+                                continue
+                        else:
+                            latest = self.latest_indicators(symbol, df, params)
+                        opportunity = self.evaluate_latest(symbol, latest, params, summary)
+                    if opportunity:
+                        opportunities.append(opportunity)
+                        logger.debug(f"Opportunity found: {symbol} {opportunity['direction']} "
+                                   f"(score: {opportunity['score']:.1f})")
+                except Exception as e:
+                    logger.error(f"Error scanning {symbol}: {e}")
+                    if summary is not None:
+                        summary[symbol] = {'status': 'error', 'error': str(e)}
+        
+        return opportunities
+    
+    def scan_top_opportunities(self, market_data: Dict[str, pd.DataFrame], k: int = 5,
+                               batch: bool = False) -> List[Dict]:
+        """
+        The k highest scoring opportunities, best first
+        
+        Uses a bounded heap (O(n log k)) rather than sorting the universe.
+        Equal scores keep market_data order, so the first candidate is the
+        one scan_all_symbols returns.
+        
+        Returns:
+            Opportunities (with score and condition breakdown), at most k
+        """
+        opportunities = self.collect_opportunities(market_data, batch=batch)
+        return heapq.nlargest(k, opportunities, key=lambda x: x['score'])
+    
+    def scan(self, market_data: Dict[str, pd.DataFrame], k: int = 1,
+             batch: bool = False) -> Dict:
+        """
+        One scan pass producing the ranked candidates and the signal summary
+        
+        Args:
+            market_data: Dictionary of DataFrames for each symbol
+            k: Ranked candidates to keep
+            batch: Compute indicators for all symbols in one vectorized pass
+            
+        Returns:
+            {'time': scan time, 'best': best opportunity or None,
+             'candidates': top k opportunities, best first,
+             'summary': get_signal_summary result}
+        """
+        summary: Dict[str, Dict] = {}
+        opportunities = self.collect_opportunities(market_data, batch=batch, summary=summary)
+        candidates = heapq.nlargest(k, opportunities, key=lambda x: x['score'])
+        if self.cadence is not None:
+            self.cadence.observe(summary, self.get_symbol_params)
+        scan_time = datetime.now()
+        self.conditions = AIMnConditionTable.from_summary(scan_time, summary)
+        self.condition_history.append(self.conditions)
+        if candidates:
+            logger.info(f"Best opportunity: {candidates[0]['symbol']} "
+                       f"{candidates[0]['direction']} "
+                       f"(score: {candidates[0]['score']:.1f})")
+        return {
+            'time': scan_time,
+            'best': candidates[0] if candidates else None,
+            'candidates': candidates,
+            'summary': summary
+        }
+    
+    def scan_all_symbols(self, market_data: Dict[str, pd.DataFrame],
+                         batch: bool = False) -> Optional[Dict]:
+        """
+        Scan all symbols and return the best opportunity
+        
+        Args:
+            market_data: Dictionary of DataFrames for each symbol
+            batch: Compute indicators for all symbols in one vectorized pass
+            
+        Returns:
+            Best opportunity or None
+        """
+        ranked = self.scan_top_opportunities(market_data, k=1, batch=batch)
         
         # Return the highest scoring opportunity
-        if opportunities:
-            best_opportunity = max(opportunities, key=lambda x: x['score'])
+        if ranked:
+            best_opportunity = ranked[0]
             logger.info(f"Best opportunity: {best_opportunity['symbol']} "
                        f"{best_opportunity['direction']} "
                        f"(score: {best_opportunity['score']:.1f})")
@@ -182,60 +613,105 @@ class AIMnScanner:
         
         return None
     
-    def get_signal_summary(self, market_data: Dict[str, pd.DataFrame]) -> Dict[str, Dict]:
+    def observe(self, market_data: Dict[str, pd.DataFrame]):
         """
-        Get a summary of signals for all symbols (for dashboard/monitoring)
+        Reschedule fetched symbols on the adaptive cadence without scanning
+        them (e.g. while a position is open); scan() reschedules its own
         """
+        if self.cadence is None:
+            return
         summary = {}
-        
         for symbol, df in market_data.items():
-            if df is None or len(df) < 50:
+            params = self.get_symbol_params(symbol)
+            if not self.has_enough_data(df, params):
                 summary[symbol] = {'status': 'insufficient_data'}
                 continue
-            
-            try:
-                params = self.get_symbol_params(symbol)
-                df_with_indicators = AIMnIndicators.calculate_all_indicators(df, params)
-                latest = df_with_indicators.iloc[-1]
-                conditions = AIMnIndicators.check_entry_conditions(df_with_indicators, params)
-                
-                summary[symbol] = {
-                    'status': 'ready',
-                    'price': latest['close'],
-                    'rsi': latest['rsi_real'],
-                    'volume_ratio': latest['volume_ratio'],
-                    'atr_ratio': latest['atr_ratio'],
-                    'buy_ready': conditions['buy'],
-                    'sell_ready': conditions['sell'],
-                    'missing_buy': [],
-                    'missing_sell': []
-                }
-                
-                # Check what's missing for buy signal
-                if not conditions['buy']:
-                    if not conditions['rsi_buy']:
-                        summary[symbol]['missing_buy'].append('RSI')
-                    if not conditions['macd_buy']:
-                        summary[symbol]['missing_buy'].append('MACD')
-                    if not conditions['volume_buy']:
-                        summary[symbol]['missing_buy'].append('Volume')
-                    if not conditions['high_volatility']:
-                        summary[symbol]['missing_buy'].append('ATR')
-                
-                # Check what's missing for sell signal
-                if not conditions['sell']:
-                    if not conditions['rsi_sell']:
-                        summary[symbol]['missing_sell'].append('RSI')
-                    if not conditions['macd_sell']:
-                        summary[symbol]['missing_sell'].append('MACD')
-                    if not conditions['volume_sell']:
-                        summary[symbol]['missing_sell'].append('Volume')
-                    if not conditions['high_volatility']:
-                        summary[symbol]['missing_sell'].append('ATR')
-                        
-            except Exception as e:
-                summary[symbol] = {'status': 'error', 'error': str(e)}
+            latest = self.latest_indicators(symbol, df, params)
+            summary[symbol] = {'status': 'ready', 'rsi': latest['rsi_real'],
+                               'atr_ratio': latest.get('atr_ratio', np.nan)}
+        self.cadence.observe(summary, self.get_symbol_params)
+    
+    def due_symbols(self, symbols: List[str], required: List[str] = ()) -> List[str]:
+        """
+        Symbols to fetch and scan now: all of them, or with an adaptive
+        cadence the due ones that fit the request budget (required symbols,
+        e.g. open positions, are always included)
+        """
+        if self.cadence is None:
+            return list(symbols)
+        return self.cadence.select(symbols, required)
+    
+    def close(self):
+        """Shut down the parallel scan workers (if any)"""
+        if self.parallel is not None:
+            self.parallel.close()
+    
+    @staticmethod
+    def confirms_direction(df: pd.DataFrame, params: Dict, direction: str) -> bool:
+        """
+        Higher-timeframe confirmation of an entry: MACD on the entry's side
+        of its signal line and RSI Real not at the opposite extreme
         
+        Args:
+            df: Bars of the confirming timeframe (see bar_resampler)
+            params: Symbol parameters
+            direction: 'BUY' or 'SELL'
+            
+        Returns:
+            False as well when df is shorter than the indicator lookback
+        """
+        params = AIMnSymbolParams.resolve(params)
+        if len(df) < AIMnIndicators.required_lookback(params):
+            return False
+        latest = AIMnIndicators.calculate_latest_indicators(df, params, ('rsi_real', 'macd', 'macd_signal'))
+        if direction == 'BUY':
+            return bool(latest['macd'] > latest['macd_signal'] and latest['rsi_real'] < params.rsi_overbought)
+        return bool(latest['macd'] < latest['macd_signal'] and latest['rsi_real'] > params.rsi_oversold)
+    
+    @staticmethod
+    def summarize_latest(latest, conditions: Dict, evaluated: int = ALL_BITS) -> Dict:
+        """
+        Signal summary entry for one symbol, from its latest row and entry conditions
+        'conditions' is the condition bitmask (see condition_bits); gates
+        whose bits are clear in evaluated are left out of the missing lists
+        """
+        mask = encode(conditions)
+        return {
+            'status': 'ready',
+            'price': latest['close'],
+            'rsi': latest['rsi_real'],
+            'volume_ratio': latest.get('volume_ratio', float('nan')),
+            'atr_ratio': latest.get('atr_ratio', float('nan')),
+            'buy_ready': conditions['buy'],
+            'sell_ready': conditions['sell'],
+            'conditions': mask,
+            'missing_buy': [] if conditions['buy'] else missing(mask, 'buy', evaluated),
+            'missing_sell': [] if conditions['sell'] else missing(mask, 'sell', evaluated)
+        }
+    
+    @staticmethod
+    def summarize_rejected(gates, params: Dict) -> Dict:
+        """
+        Signal summary entry for a symbol the prefilter rejected, from the
+        values of every enabled gate; the conditions it cannot decide
+        without MACD and OBV are clear in 'evaluated' and never listed as
+        missing ('prefiltered' is True)
+        """
+        latest = dict(NOT_EVALUATED, **gates)
+        evaluated = ALL_BITS & ~unevaluated_bits(latest, params)
+        entry = AIMnScanner.summarize_latest(latest, AIMnIndicators.check_entry_conditions(latest, params),
+                                             evaluated)
+        entry['evaluated'] = evaluated
+        entry['prefiltered'] = True
+        return entry
+    
+    def get_signal_summary(self, market_data: Dict[str, pd.DataFrame]) -> Dict[str, Dict]:
+        """
+        Get a summary of signals for all symbols (for dashboard/monitoring)
+        scan() returns the same summary together with the opportunities
+        """
+        summary: Dict[str, Dict] = {}
+        self.collect_opportunities(market_data, summary=summary)
         return summary
 
 
@@ -0,0 +1,156 @@
+# symbol_params.py
+'''
+AIMn Trading System - Symbol Parameters
+Immutable, validated per-symbol parameter objects
+
+Parameter dicts from the configuration are resolved once (at startup or
+on reload) into AIMnSymbolParams: every field is filled in, converted to
+its type and range-checked, so the scanner, indicators and positions read
+plain attributes instead of params.get(key, default) on every bar. Fields
+that only make sense together are checked too (see _check_combination).
+
+AIMnSymbolParams is also a read-only Mapping, so code that still expects a
+dict (params['macd_fast'], params.get(...), dict(params)) keeps working.
+Keys that are not fields (e.g. 'rsi_period') are kept in `extras`. Nothing
+reads them, so each one gets a warning: it is usually a misspelt field
+('stop_loss' for 'stop_loss_percent') whose value is silently ignored.
+'''
+
+import warnings
+from collections.abc import Mapping
+from types import MappingProxyType
+from typing import Any, Dict, Iterator, Optional
+
+# name: (type, default, minimum, maximum); None = unbounded
+PARAM_FIELDS = {
+    # RSI Real
+    'rsi_window': (int, 100, 1, None),
+    'rsi_oversold': (float, 30.0, 0.0, 100.0),
+    'rsi_overbought': (float, 70.0, 0.0, 100.0),
+    # MACD
+    'macd_fast': (int, 12, 1, None),
+    'macd_slow': (int, 26, 1, None),
+    'macd_signal': (int, 9, 1, None),
+    # Volume
+    'volume_confirmation': (bool, True, None, None),
+    'volume_threshold': (float, 1.2, 0.0, None),
+    'obv_period': (int, 20, 1, None),
+    # ATR Filter
+    'atr_filter': (bool, True, None, None),
+    'atr_period': (int, 14, 1, None),
+    'atr_ma_period': (int, 28, 1, None),
+    'atr_multiplier': (float, 1.3, 0.0, None),
+    'atr_threshold': (float, 1.3, 0.0, None),
+    # Exits
+    'stop_loss_percent': (float, 2.0, 0.0, 100.0),
+    'early_trail_start': (float, 1.0, 0.0, None),
+    'early_trail_minus': (float, 15.0, 0.0, 100.0),
+    'peak_trail_start': (float, 5.0, 0.0, None),
+    'peak_trail_minus': (float, 0.5, 0.0, 100.0),
+    'use_rsi_exit': (bool, True, None, None),
+    'rsi_exit_min_profit': (float, 0.5, None, None),
+}
+
+
+def _convert(name: str, value: Any):
+    '''Value converted to the field's type and checked against its range'''
+    kind, _, minimum, maximum = PARAM_FIELDS[name]
+    if kind is bool:
+        return bool(value)
+    try:
+        converted = kind(value)
+    except (TypeError, ValueError):
+        raise ValueError(f"Parameter {name} must be {kind.__name__}, got {value!r}") from None
+    if kind is int and converted != value:
+        raise ValueError(f"Parameter {name} must be a whole number, got {value!r}")
+    if (minimum is not None and converted < minimum) or (maximum is not None and converted > maximum):
+        raise ValueError(f"Parameter {name}={value!r} is outside [{minimum}, {maximum}]")
+    return converted
+
+
+def _check_combination(params: 'AIMnSymbolParams'):
+    '''Checks across fields: RSI bands inside (0, 100), in order, and a slower slow MACD'''
+    if not 0 < params.rsi_oversold < params.rsi_overbought < 100:
+        raise ValueError(f"Parameters need 0 < rsi_oversold < rsi_overbought < 100, got "
+                         f"rsi_oversold={params.rsi_oversold!r}, "
+                         f"rsi_overbought={params.rsi_overbought!r}")
+    if params.macd_fast >= params.macd_slow:
+        raise ValueError(f"Parameter macd_fast={params.macd_fast!r} must be below "
+                         f"macd_slow={params.macd_slow!r}")
+
+
+class AIMnSymbolParams(Mapping):
+    '''Resolved parameters of one symbol (read-only)'''
+
+    __slots__ = tuple(PARAM_FIELDS) + ('extras',)
+
+    def __init__(self, **values):
+        '''
+        Args:
+            **values: Parameter values; missing fields get their defaults
+
+        Raises:
+            ValueError: A value has the wrong type or is out of range, or
+                values do not fit together (see _check_combination)
+        '''
+        _fill(self, values)
+        for name in self.extras:
+            warnings.warn(f"Unknown symbol parameter {name!r} is ignored", stacklevel=3)
+
+    @classmethod
+    def resolve(cls, params: Optional[Mapping],
+                defaults: Optional[Mapping] = None) -> 'AIMnSymbolParams':
+        '''
+        params as an AIMnSymbolParams (returned as is if it already is one)
+        Keys missing from params are taken from defaults (e.g. a global
+        switch of the configuration), then from PARAM_FIELDS
+        '''
+        if isinstance(params, cls):
+            return params
+        return cls(**{**(defaults or {}), **(params or {})})
+
+    def replace(self, **changes) -> 'AIMnSymbolParams':
+        '''A copy with some values changed'''
+        return _rebuild({**self, **changes})
+
+    def __setattr__(self, name, value):
+        raise AttributeError(f"{type(self).__name__} is immutable")
+
+    def __delattr__(self, name):
+        raise AttributeError(f"{type(self).__name__} is immutable")
+
+    def __reduce__(self):
+        return (_rebuild, (dict(self),))
+
+    # Read-only Mapping view: fields first, then extras
+    def __getitem__(self, key: str):
+        if key in PARAM_FIELDS:
+            return getattr(self, key)
+        return self.extras[key]
+
+    def __iter__(self) -> Iterator[str]:
+        yield from PARAM_FIELDS
+        yield from self.extras
+
+    def __len__(self) -> int:
+        return len(PARAM_FIELDS) + len(self.extras)
+
+    def __repr__(self) -> str:
+        return f"{type(self).__name__}({', '.join(f'{k}={v!r}' for k, v in self.items())})"
+
+
+def _fill(params: AIMnSymbolParams, values: Dict):
+    '''Set the fields (validated) and extras of a new AIMnSymbolParams'''
+    values = dict(values)
+    for name, (_, default, _, _) in PARAM_FIELDS.items():
+        value = values.pop(name, default)
+        object.__setattr__(params, name, _convert(name, value))
+    _check_combination(params)
+    object.__setattr__(params, 'extras', MappingProxyType(values))
+
+
+def _rebuild(values: Dict) -> AIMnSymbolParams:
+    '''Copy (replace, unpickling) without warning again about the extras'''
+    params = object.__new__(AIMnSymbolParams)
+    _fill(params, values)
+    return params
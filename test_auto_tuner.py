@@ -0,0 +1,41 @@
+# test_auto_tuner.py
+"""
+Unit tests for the sweep-driven entry parameter suggestions
+"""
+import numpy as np
+import pytest
+
+from auto_tuner import suggest_entry_params, sweep_entry_signals
+from indicators import AIMnIndicators
+from conftest import generate_sample_data
+
+
+def test_sweep_returns_match_single_parameter_runs():
+    market_data = {f'SYM{i}': generate_sample_data(n=400 + 50 * i, seed=i) for i in range(3)}
+    rsi_stats, macd_stats = sweep_entry_signals(market_data, [20, 50], [12], [26], [9],
+                                                rsi_oversold=20, rsi_overbought=80, horizon=10)
+
+    window = 50
+    buy, sell = [], []
+    for df in market_data.values():
+        rsi = AIMnIndicators.calculate_rsi_real(df, window).to_numpy()
+        close = df['close'].to_numpy()
+        forward = close[10:] / close[:-10] - 1
+        buy.extend(forward[rsi[:-10] <= 20])
+        sell.extend(forward[rsi[:-10] >= 80])
+    row = rsi_stats.set_index('rsi_window').loc[window]
+    assert row['buy_return'] == pytest.approx(np.mean(buy), rel=1e-9)
+    assert row['edge'] == pytest.approx(np.mean(buy) - np.mean(sell), rel=1e-9)
+    assert macd_stats['bullish_crosses'].iloc[0] > 0
+
+
+def test_suggestions_follow_the_best_edge():
+    market_data = {f'SYM{i}': generate_sample_data(n=600, seed=i) for i in range(4)}
+    rsi_stats, macd_stats = sweep_entry_signals(market_data, [20, 40, 60], [8, 12], [26], [5, 9])
+    params = suggest_entry_params(rsi_stats, macd_stats, min_signals=1)
+
+    best_rsi = rsi_stats.loc[rsi_stats['edge'].idxmax()]
+    best_macd = macd_stats.loc[macd_stats['edge'].idxmax()]
+    assert params == {'rsi_window': best_rsi['rsi_window'], 'macd_fast': best_macd['macd_fast'],
+                      'macd_slow': best_macd['macd_slow'], 'macd_signal': best_macd['macd_signal']}
+    assert suggest_entry_params(rsi_stats, macd_stats, min_signals=10 ** 9) == {}
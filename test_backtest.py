@@ -11,6 +11,8 @@ from indicators import AIMnIndicators
 from position_manager import AIMnPositionManager
 from scanner import AIMnScanner
 from config import SYMBOL_PARAMS
+from aimn_crypto_config import TIMEFRAME
+from bar_store import AIMnBarStore, load_market_data
 
 
 def generate_sample_data(n=300):
@@ -28,11 +30,26 @@ def generate_sample_data(n=300):
     return df
 
 
-def test_backtest_flow():
+def record_sample_bars(root, symbol, n=300):
+    """Write n sample bars into a bar store, as the live engine records them"""
+    bars = generate_sample_data(n).reset_index(drop=True)
+    bars.insert(0, 'timestamp', pd.date_range('2025-01-01', periods=n, freq='min', tz='UTC'))
+    AIMnBarStore(root).append(symbol, TIMEFRAME, bars)
+
+
+def load_backtest_data(root, symbol, n=300):
+    """Latest n bars of a symbol from a bar store (see bar_store)"""
+    stored = load_market_data([symbol], TIMEFRAME, limit=n, root=root)[symbol]
+    return stored.rename(columns={'timestamp': 'datetime'}).set_index('datetime')
+
+
+def test_backtest_flow(tmp_path):
     symbol = "BTC/USD"
     params = SYMBOL_PARAMS.get(symbol, {})
 
-    df = generate_sample_data()
+    record_sample_bars(str(tmp_path), symbol)
+    df = load_backtest_data(str(tmp_path), symbol)
+    assert len(df) == 300
     scanner = AIMnScanner(SYMBOL_PARAMS)
     manager = AIMnPositionManager(max_positions=1)
 
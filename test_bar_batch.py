@@ -0,0 +1,43 @@
+# test_bar_batch.py
+"""
+Unit tests for splitting batched multi-symbol bar responses
+"""
+import numpy as np
+import pandas as pd
+
+from bar_batch import OHLCV, split_bars
+
+
+def response(symbols, n=50, seed=0):
+    rng = np.random.default_rng(seed)
+    stamps = pd.date_range('2025-01-01', periods=n, freq='min', tz='UTC')
+    rows = []
+    for i, symbol in enumerate(symbols):
+        frame = pd.DataFrame(rng.random((n, 5)) + i, columns=list(OHLCV), index=stamps)
+        frame['symbol'] = symbol
+        rows.append(frame)
+    # The endpoint pages through symbols; rows arrive interleaved
+    bars = pd.concat(rows).sample(frac=1.0, random_state=seed)
+    return bars.rename_axis('timestamp'), rows
+
+
+def test_split_matches_per_symbol_frames():
+    bars, frames = response(['BTC/USD', 'ETH/USD', 'LTC/USD'])
+    split = split_bars(bars, limits={'ETH/USD': 20})
+
+    assert set(split) == {'BTC/USD', 'ETH/USD', 'LTC/USD'}
+    for frame in frames:
+        symbol = frame['symbol'].iloc[0]
+        expected = frame[list(OHLCV)].iloc[-20:] if symbol == 'ETH/USD' else frame[list(OHLCV)]
+        got = split[symbol]
+        assert list(got.columns) == ['timestamp'] + list(OHLCV)
+        assert (got['timestamp'].to_numpy() == expected.index.to_numpy()).all()
+        np.testing.assert_array_equal(got[list(OHLCV)].to_numpy(), expected.to_numpy())
+
+
+def test_split_accepts_multiindex_columns():
+    bars, frames = response(['AAPL', 'MSFT'], n=10)
+    wide = pd.concat({frame['symbol'].iloc[0]: frame[list(OHLCV)] for frame in frames}, axis=1)
+    split = split_bars(wide)
+    np.testing.assert_array_equal(split['MSFT']['close'].to_numpy(), frames[1]['close'].to_numpy())
+    assert split_bars(pd.DataFrame()) == {}
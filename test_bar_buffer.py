@@ -0,0 +1,49 @@
+# test_bar_buffer.py
+"""
+Unit tests for the incremental bar buffer
+"""
+import numpy as np
+import pandas as pd
+
+from bar_batch import OHLCV
+from bar_buffer import AIMnBarBuffer
+
+
+def server_bars(symbols, n=300):
+    end = pd.Timestamp.now(tz='UTC').floor('min')
+    stamps = pd.date_range(end=end, periods=n, freq='min')
+    rng = np.random.default_rng(0)
+    return {symbol: pd.DataFrame(dict(timestamp=stamps, **{c: rng.random(n) for c in OHLCV}))
+            for symbol in symbols}
+
+
+def test_incremental_updates_match_full_fetch():
+    history = server_bars(['BTC/USD', 'ETH/USD'])
+    visible = [250]  # Bars published so far
+    calls = []
+
+    def fetch_many(symbols, timeframe, limits, start=None):
+        calls.append(start)
+        out = {}
+        for symbol in symbols:
+            bars = history[symbol].iloc[:visible[0]]
+            out[symbol] = (bars.iloc[-limits[symbol]:] if start is None
+                           else bars[bars['timestamp'] >= start].reset_index(drop=True))
+        return out
+
+    limits = {'BTC/USD': 120, 'ETH/USD': 100}
+    buffer = AIMnBarBuffer(fetch_many)
+    buffer.update(list(limits), '1Min', limits)
+    assert calls == [None] and buffer.bars_fetched == 220
+
+    # The last published bar is revised and one new bar appears
+    history['BTC/USD'].loc[249, 'close'] = 99.0
+    visible[0] = 251
+    market_data = buffer.update(list(limits), '1Min', limits)
+    assert calls[1] == history['BTC/USD']['timestamp'].iloc[249]
+    assert buffer.bars_fetched == 224
+
+    for symbol, limit in limits.items():
+        expected = history[symbol].iloc[251 - limit:251].reset_index(drop=True)
+        pd.testing.assert_frame_equal(market_data[symbol], expected)
+    assert market_data['BTC/USD']['close'].iloc[-2] == 99.0
@@ -0,0 +1,55 @@
+# test_bar_resampler.py
+"""
+Unit tests for the in-memory multi-timeframe resampler
+"""
+import pandas as pd
+import pytest
+
+from bar_resampler import AIMnBarResampler, TIMEFRAME_RULES
+from indicators import AIMnIndicators
+from scanner import AIMnScanner
+from symbol_params import AIMnSymbolParams
+from conftest import PARAMS, generate_sample_data
+
+
+def expected_bars(minutes, timeframe):
+    minutes = minutes.set_index('timestamp')[['open', 'high', 'low', 'close', 'volume']]
+    bars = minutes.resample(TIMEFRAME_RULES[timeframe]).agg(
+        {'open': 'first', 'high': 'max', 'low': 'min', 'close': 'last', 'volume': 'sum'})
+    return bars.dropna(subset=['close'])
+
+
+@pytest.mark.parametrize('timeframe', ['5Min', '15Min', '1Hour'])
+def test_incremental_updates_match_one_shot_resample(timeframe):
+    minutes = generate_sample_data(n=600)
+    minutes = minutes.drop(index=range(100, 130))  # feed gap
+    resampler = AIMnBarResampler()
+
+    # Initial history, then overlapping fetches that revise the last bar
+    resampler.update('BTC/USD', minutes.iloc[:140])
+    for end in range(200, len(minutes) + 1, 37):
+        fetched = minutes.iloc[end - 60:end].copy()
+        fetched.loc[fetched.index[-1], 'close'] += 1.0
+        resampler.update('BTC/USD', fetched)
+        resampler.get_bars('BTC/USD', timeframe)
+    resampler.update('BTC/USD', minutes.iloc[-60:])
+
+    pd.testing.assert_frame_equal(resampler.get_bars('BTC/USD', timeframe),
+                                  expected_bars(minutes, timeframe), check_freq=False)
+    assert len(resampler.get_bars('BTC/USD', timeframe, limit=3)) == 3
+
+
+def test_resampled_bars_confirm_an_entry_direction():
+    resampler = AIMnBarResampler()
+    resampler.update('BTC/USD', generate_sample_data(n=3000))
+    bars = resampler.get_bars('BTC/USD', '15Min')
+    latest = AIMnIndicators.calculate_latest_indicators(bars, PARAMS)
+    params = AIMnSymbolParams.resolve(PARAMS)
+
+    assert AIMnScanner.confirms_direction(bars, PARAMS, 'BUY') == \
+        (latest['macd'] > latest['macd_signal'] and latest['rsi_real'] < params.rsi_overbought)
+    assert AIMnScanner.confirms_direction(bars, PARAMS, 'SELL') == \
+        (latest['macd'] < latest['macd_signal'] and latest['rsi_real'] > params.rsi_oversold)
+    # Too few bars for the lookback never confirm
+    assert not AIMnScanner.confirms_direction(bars.iloc[:20], PARAMS, 'BUY')
+    assert not AIMnScanner.confirms_direction(bars.iloc[:20], PARAMS, 'SELL')
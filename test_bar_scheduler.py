@@ -0,0 +1,69 @@
+# test_bar_scheduler.py
+"""
+Unit tests for the bar-close scheduler
+"""
+import pandas as pd
+
+from bar_scheduler import AIMnBarScheduler
+
+T0 = pd.Timestamp('2025-01-01 12:00', tz='UTC').timestamp()
+
+
+def bars(last_start: float, n: int = 5) -> pd.DataFrame:
+    stamps = pd.to_datetime([last_start - 60 * i for i in range(n - 1, -1, -1)], unit='s', utc=True)
+    return pd.DataFrame({'timestamp': stamps, 'open': 1.0, 'high': 1.0, 'low': 1.0,
+                         'close': 1.0, 'volume': 1.0})
+
+
+def test_wakes_after_bar_close_and_scans_only_new_bars():
+    now = [T0 + 25.0]
+    slept = []
+
+    def sleep(seconds):
+        slept.append(seconds)
+        now[0] += seconds
+
+    scheduler = AIMnBarScheduler(settle=2, retry=3, max_wait=10, clock=lambda: now[0], sleep=sleep)
+    symbols = ['A', 'B']
+
+    # First cycle runs at once for the bar that closed at T0
+    scheduler.wait()
+    assert slept == [] and scheduler.due_symbols(symbols) == symbols
+    fresh = scheduler.new_bars(symbols, {'A': bars(T0 - 60), 'B': bars(T0 - 60)})
+    assert list(fresh) == ['A', 'B']
+
+    # Next wake: T0 + 60 close plus the settle delay; B's bar is late
+    assert scheduler.wait() == T0 + 62
+    assert scheduler.due_symbols(symbols) == symbols
+    fresh = scheduler.new_bars(symbols, {'A': bars(T0), 'B': bars(T0 - 60)})
+    assert list(fresh) == ['A'] and scheduler.pending == ['B']
+
+    # Only B is retried until it arrives
+    assert scheduler.wait() == T0 + 65
+    assert scheduler.due_symbols(symbols) == ['B']
+    assert list(scheduler.new_bars(['B'], {'B': bars(T0)})) == ['B']
+    assert scheduler.wait() == T0 + 122
+
+
+def test_gives_up_on_a_missing_bar_after_max_wait():
+    now = [T0 + 2.0]
+    scheduler = AIMnBarScheduler(settle=2, retry=3, max_wait=6, clock=lambda: now[0], sleep=lambda s: None)
+    scheduler.wait()
+    scheduler.new_bars(['A'], {'A': bars(T0 - 120)})
+    assert scheduler.next_wake() == T0 + 5
+    now[0] = T0 + 5.0
+    scheduler.new_bars(['A'], {'A': bars(T0 - 120)})
+    assert scheduler.pending == ['A'] and scheduler.next_wake() == T0 + 62
+
+
+def test_revised_last_bar_counts_as_new():
+    now = [T0 + 2.0]
+    scheduler = AIMnBarScheduler(settle=2, clock=lambda: now[0], sleep=lambda s: None)
+    scheduler.wait()
+    df = bars(T0 - 60)
+    assert list(scheduler.new_bars(['A'], {'A': df})) == ['A']
+    assert scheduler.new_bars(['A'], {'A': df.copy()}) == {}
+
+    revised = df.copy()
+    revised.loc[revised.index[-1], 'close'] = 1.5
+    assert list(scheduler.new_bars(['A'], {'A': revised})) == ['A']
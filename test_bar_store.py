@@ -0,0 +1,53 @@
+# test_bar_store.py
+"""
+Unit tests for the on-disk bar store
+"""
+import numpy as np
+import pandas as pd
+
+from bar_store import AIMnBarStore, load_market_data
+from conftest import generate_sample_data
+
+
+def bars(n=300, seed=0):
+    df = generate_sample_data(n=n, seed=seed)
+    df['timestamp'] = pd.date_range('2025-01-01', periods=n, freq='min', tz='UTC').as_unit('ns')
+    return df
+
+
+def test_append_and_range_read(tmp_path):
+    store = AIMnBarStore(str(tmp_path))
+    history = bars()
+
+    # Overlapping windows, as the engine writes them each cycle
+    assert store.append('BTC/USD', '1Min', history.iloc[:200]) == 200
+    revised = history.iloc[150:260].copy()
+    revised.loc[199, 'close'] = -1.0
+    assert store.append('BTC/USD', '1Min', revised) == 60
+    assert store.append('BTC/USD', '1Min', history.iloc[100:260].drop(index=199)) == 0
+
+    expected = history.iloc[:260].copy()
+    expected.loc[199, 'close'] = -1.0
+    pd.testing.assert_frame_equal(store.read_frame('BTC/USD', '1Min'), expected.reset_index(drop=True))
+
+    arrays = store.read('BTC/USD', '1Min', start='2025-01-01 01:00', end='2025-01-01 02:00')
+    assert len(arrays['close']) == 60
+    np.testing.assert_array_equal(arrays['close'], history['close'].iloc[60:120].to_numpy())
+    assert len(store.read('BTC/USD', '1Min', limit=10)['open']) == 10
+    assert store.last_time('BTC/USD', '1Min') == history['timestamp'].iloc[259]
+
+    assert store.symbols('1Min') == ['BTC/USD']
+    market_data = load_market_data(['BTC/USD', 'ETH/USD'], limit=50, root=str(tmp_path))
+    assert list(market_data) == ['BTC/USD'] and len(market_data['BTC/USD']) == 50
+
+
+def test_partial_append_is_ignored_and_repaired(tmp_path):
+    store = AIMnBarStore(str(tmp_path))
+    history = bars(n=20)
+    store.append('AAPL', '1Min', history.iloc[:10])
+    # An interrupted append left a price without its timestamp
+    with open(store.path('AAPL', '1Min', 'close'), 'ab') as f:
+        f.write(np.float64(1.0).tobytes())
+    assert len(store.read('AAPL', '1Min')['close']) == 10
+    assert store.append('AAPL', '1Min', history) == 10
+    pd.testing.assert_frame_equal(store.read_frame('AAPL', '1Min'), history)
@@ -0,0 +1,67 @@
+# test_batch_indicators.py
+"""
+Unit tests for cross-symbol batch indicators
+"""
+import numpy as np
+import pytest
+
+from indicators import AIMnIndicators
+from batch_indicators import AIMnBatchIndicators
+from indicator_cache import AIMnIndicatorCache
+from scanner import AIMnScanner
+from conftest import PARAMS, COLUMNS, generate_sample_data
+
+
+def test_batch_matches_per_symbol(backend):
+    # Different lengths exercise the left padding
+    market_data = {f'SYM{i}': generate_sample_data(n=150 + 20 * i, seed=i) for i in range(5)}
+    arrays = AIMnBatchIndicators.stack_ohlcv(market_data)
+    results = AIMnBatchIndicators.calculate(arrays, PARAMS)
+
+    for row, (symbol, df) in enumerate(market_data.items()):
+        expected = AIMnIndicators.calculate_all_indicators(df, PARAMS)
+        start = arrays['starts'][row]
+        for column in COLUMNS:
+            np.testing.assert_array_equal(results[column][row, start:].astype(float),
+                                          expected[column].to_numpy(dtype=float),
+                                          err_msg=f"{symbol} {column}")
+
+
+def test_batch_scan_matches_serial_scan(backend):
+    market_data = {f'SYM{i}': generate_sample_data(n=200, seed=i) for i in range(40)}
+    # Loose thresholds so that some symbols produce opportunities
+    symbol_params = {'DEFAULT': dict(PARAMS, rsi_oversold=49, rsi_overbought=51,
+                                     volume_threshold=0.0, atr_threshold=0.0)}
+    symbol_params['SYM3'] = dict(symbol_params['DEFAULT'], rsi_window=50)
+    scanner = AIMnScanner(symbol_params, cache=AIMnIndicatorCache(), indicator_mode='full')
+
+    serial = {s: scanner.scan_symbol(s, df) for s, df in market_data.items()}
+    latest_rows = AIMnBatchIndicators.latest_rows(market_data, scanner.get_symbol_params)
+    batch = {s: scanner.scan_latest(s, latest_rows[s], scanner.get_symbol_params(s))
+             for s in market_data}
+
+    assert any(serial.values())
+    for symbol in market_data:
+        if serial[symbol] is None:
+            assert batch[symbol] is None
+        else:
+            assert batch[symbol]['direction'] == serial[symbol]['direction']
+            assert batch[symbol]['score'] == serial[symbol]['score']
+
+    assert scanner.scan_all_symbols(market_data, batch=True)['symbol'] == \
+        scanner.scan_all_symbols(market_data)['symbol']
+
+
+@pytest.mark.parametrize('columns', [None, ('rsi_real', 'volume_ratio', 'atr_ratio')])
+def test_batch_tail_matches_latest_indicators(backend, columns):
+    market_data = {f'SYM{i}': generate_sample_data(n=150 + 20 * i, seed=i) for i in range(5)}
+    rows = AIMnBatchIndicators.latest_rows(market_data, lambda symbol: PARAMS,
+                                           get_columns=lambda symbol: columns, tail=True)
+
+    for symbol, df in market_data.items():
+        expected = AIMnIndicators.calculate_latest_indicators(df, PARAMS, columns)
+        # Only the requested groups are calculated
+        assert set(rows[symbol]) == set(expected)
+        for column, value in expected.items():
+            np.testing.assert_allclose(float(rows[symbol][column]), float(value),
+                                       rtol=1e-12, err_msg=f"{symbol} {column}")
@@ -0,0 +1,56 @@
+# test_indicator_cache.py
+"""
+Unit tests for the indicator cache and compact indicator frames
+"""
+import numpy as np
+import pytest
+
+from indicators import AIMnIndicators, COMPACT_RTOL
+from indicator_cache import AIMnIndicatorCache
+from conftest import PARAMS, COLUMNS, generate_sample_data
+
+
+def test_compact_frame_within_tolerance(backend):
+    full = AIMnIndicators.calculate_all_indicators(generate_sample_data(n=1000), PARAMS)
+    compact = AIMnIndicators.compact_indicators(full)
+
+    assert AIMnIndicators.frame_memory(compact) < 0.6 * AIMnIndicators.frame_memory(full)
+    for column in COLUMNS + ['close', 'volume']:
+        if full[column].dtype == bool:
+            assert compact[column].equals(full[column])
+        else:
+            assert compact[column].dtype == np.float32
+            np.testing.assert_allclose(compact[column].to_numpy(dtype=float),
+                                       full[column].to_numpy(), rtol=COMPACT_RTOL, atol=0,
+                                       err_msg=column)
+
+
+def test_cache_lru_eviction_and_memory_by_symbol():
+    cache = AIMnIndicatorCache(max_entries=2, compact=True)
+    frames = {s: generate_sample_data(n=200, seed=i) for i, s in enumerate(['A', 'B', 'C'])}
+
+    first = cache.calculate_all_indicators('A', frames['A'], PARAMS)
+    assert first['rsi_real'].dtype == np.float32
+    assert cache.calculate_all_indicators('A', frames['A'], PARAMS) is first
+    cache.calculate_all_indicators('B', frames['B'], PARAMS)
+    cache.calculate_all_indicators('C', frames['C'], PARAMS)
+
+    stats = cache.stats()
+    assert (stats['hits'], stats['misses'], stats['evictions']) == (1, 3, 1)
+    usage = cache.memory_by_symbol()
+    assert set(usage) == {'B', 'C'}
+    assert sum(usage.values()) == pytest.approx(stats['memory_mb'])
+
+
+def test_revised_last_bar_misses_the_cache():
+    cache = AIMnIndicatorCache()
+    df = generate_sample_data(n=200)
+    first = cache.calculate_all_indicators('A', df, PARAMS)
+    assert cache.calculate_all_indicators('A', df.copy(), PARAMS) is first
+
+    revised = df.copy()
+    revised.loc[revised.index[-1], 'close'] += 1.0
+    result = cache.calculate_all_indicators('A', revised, PARAMS)
+    assert result is not first
+    assert result['rsi_real'].iloc[-1] == \
+        AIMnIndicators.calculate_all_indicators(revised, PARAMS)['rsi_real'].iloc[-1]
@@ -0,0 +1,55 @@
+# test_indicator_planner.py
+"""
+Unit tests for the indicator dependency planner
+"""
+import numpy as np
+import pytest
+
+from indicators import AIMnIndicators
+from indicator_cache import AIMnIndicatorCache
+from indicator_planner import AIMnIndicatorPlanner
+from scanner import AIMnScanner
+from conftest import PARAMS, COLUMNS, generate_sample_data
+
+
+def test_planned_columns_match_full_calculation(backend):
+    df = generate_sample_data()
+    planned = AIMnIndicatorPlanner().compute(df, PARAMS, COLUMNS)
+    full = AIMnIndicators.calculate_all_indicators(df, PARAMS)
+
+    for column in COLUMNS:
+        np.testing.assert_array_equal(planned[column].to_numpy(dtype=float),
+                                      full[column].to_numpy(dtype=float), err_msg=column)
+
+
+def test_disabled_filters_are_not_planned():
+    planner = AIMnIndicatorPlanner()
+    columns = planner.required_columns(dict(PARAMS, volume_confirmation=False, atr_filter=False))
+    order = planner.plan(columns)
+
+    assert 'rsi_real' in order and 'macd_bullish_cross' in order
+    assert not {'obv', 'volume_sma', 'volume_ratio', 'atr'} & set(order)
+    # Shared intermediates appear once, before their consumers
+    assert order.count('macd_lines') == 1
+    assert order.index('macd_lines') < order.index('macd_bullish_cross')
+
+
+@pytest.mark.parametrize('mode', ['tail', 'full'])
+def test_scan_without_volume_confirmation(mode):
+    market_data = {f'SYM{i}': generate_sample_data(n=200, seed=i) for i in range(20)}
+    params = dict(PARAMS, rsi_oversold=49, rsi_overbought=51, atr_threshold=0.0)
+    scanner = AIMnScanner({'DEFAULT': dict(params, volume_confirmation=False)},
+                          cache=AIMnIndicatorCache(), indicator_mode=mode)
+
+    opportunities = []
+    for symbol, df in market_data.items():
+        latest = scanner.latest_indicators(symbol, df)
+        assert 'obv' not in latest and 'volume_ratio' not in latest
+        opportunity = scanner.scan_symbol(symbol, df)
+        if opportunity is not None:
+            opportunities.append(opportunity)
+            # Disabled volume filter always passes
+            assert opportunity['conditions']['volume_buy' if opportunity['direction'] == 'BUY'
+                                              else 'volume_sell']
+
+    assert opportunities
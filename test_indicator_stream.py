@@ -0,0 +1,102 @@
+# test_indicator_stream.py
+"""
+Unit tests for the streaming indicator engine
+"""
+import numpy as np
+import pandas as pd
+import pytest
+
+import indicators
+from indicators import AIMnIndicators
+from indicator_stream import AIMnIndicatorStream, AIMnStreamingIndicators
+from conftest import PARAMS, COLUMNS, generate_sample_data
+
+RECURSION_COLUMNS = ('macd', 'macd_signal', 'macd_histogram', 'atr', 'atr_ma', 'atr_ratio')
+
+
+def stream_frame(df, params):
+    stream = AIMnIndicatorStream(params)
+    rows = [stream.update(*bar) for bar in
+            df[['open', 'high', 'low', 'close', 'volume']].to_numpy()]
+    return pd.DataFrame(rows)
+
+
+@pytest.mark.parametrize('seed', range(3))
+def test_stream_matches_batch(backend, seed):
+    df = generate_sample_data(seed=seed)
+    batch = AIMnIndicators.calculate_all_indicators(df, PARAMS)
+    streamed = stream_frame(df, PARAMS)
+
+    for column in COLUMNS:
+        expected = batch[column].to_numpy(dtype=float)
+        actual = streamed[column].to_numpy(dtype=float)
+        if backend:
+            # TA-Lib's compiled loops round the last bit differently
+            np.testing.assert_allclose(actual, expected, rtol=1e-12, atol=1e-12,
+                                       err_msg=column)
+        else:
+            np.testing.assert_array_equal(actual, expected, err_msg=column)
+
+
+def test_stream_matches_batch_past_the_recursion_kernel():
+    df = generate_sample_data(n=3 * indicators.RECURSION_KERNEL_MIN_BARS)
+    batch = AIMnIndicators.calculate_all_indicators(df, PARAMS)
+    streamed = stream_frame(df, PARAMS)
+
+    for column in COLUMNS:
+        expected = batch[column].to_numpy(dtype=float)
+        actual = streamed[column].to_numpy(dtype=float)
+        if column in RECURSION_COLUMNS:
+            # Batch MACD and ATR run in the ewm kernel: within a few ulps
+            np.testing.assert_allclose(actual, expected, rtol=1e-12, atol=1e-12, err_msg=column)
+        else:
+            np.testing.assert_array_equal(actual, expected, err_msg=column)
+
+
+def test_update_from_frame_only_pushes_new_bars(backend):
+    df = generate_sample_data(n=260)
+    engine = AIMnStreamingIndicators()
+
+    engine.update_from_frame('BTC/USD', df.iloc[:200], PARAMS)
+    stream = engine.streams['BTC/USD']
+    # Next cycle: overlapping window with 10 new bars
+    latest = engine.update_from_frame('BTC/USD', df.iloc[10:210], PARAMS)
+
+    assert engine.streams['BTC/USD'] is stream
+    assert stream.bars == 210
+    expected = AIMnIndicators.calculate_all_indicators(df.iloc[:210], PARAMS).iloc[-1]
+    assert latest['rsi_real'] == pytest.approx(expected['rsi_real'], rel=1e-12)
+    assert latest['macd'] == pytest.approx(expected['macd'], rel=1e-12)
+
+
+def test_update_from_frame_repushes_a_revised_last_bar(backend):
+    df = generate_sample_data(n=260)
+    engine = AIMnStreamingIndicators()
+    engine.update_from_frame('BTC/USD', df.iloc[:200], PARAMS)
+
+    # Same timestamp, new values: the last bar replaced in place, several
+    # times (a new window high and low, then back), before the next bars
+    revisions = []
+    for change in ([2.0, 0.0, 1.5, 100.0], [50.0, -50.0, 0.0, 0.0], [0.0, 0.0, 0.0, 0.0]):
+        revised = df.iloc[:200].copy()
+        revised.loc[revised.index[-1], ['high', 'low', 'close', 'volume']] += change
+        revisions.append(revised)
+    for frame in revisions + [pd.concat([revisions[0], df.iloc[200:210]])]:
+        latest = engine.update_from_frame('BTC/USD', frame, PARAMS)
+        expected = AIMnIndicators.calculate_all_indicators(frame, PARAMS).iloc[-1]
+        assert engine.streams['BTC/USD'].bars == len(frame)
+        for column in COLUMNS:
+            assert latest[column] == pytest.approx(expected[column], rel=1e-12, nan_ok=True), column
+
+
+def test_update_from_frame_rebuilds_on_gap_and_param_change():
+    df = generate_sample_data(n=400)
+    engine = AIMnStreamingIndicators()
+
+    engine.update_from_frame('ETH/USD', df.iloc[:200], PARAMS)
+    engine.update_from_frame('ETH/USD', df.iloc[250:], PARAMS)
+    assert engine.streams['ETH/USD'].bars == 150
+
+    engine.update_from_frame('ETH/USD', df.iloc[250:], dict(PARAMS, rsi_window=50))
+    assert engine.streams['ETH/USD'].bars == 150
+    assert engine.streams['ETH/USD'].params_key[0] == 50
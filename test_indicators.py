@@ -0,0 +1,147 @@
+# test_indicators.py
+"""
+Unit tests for AIMnIndicators calculation modes
+"""
+import numpy as np
+import pandas as pd
+import pytest
+
+import indicators
+from indicators import (AIMnIndicators, INDICATOR_COLUMNS, atr_talib, macd_talib, obv_talib,
+                        rolling_extreme, rolling_mean)
+from batch_indicators import AIMnBatchIndicators
+from conftest import PARAMS, COLUMNS, generate_sample_data
+
+
+@pytest.mark.parametrize('n', [10, 45, 200])
+@pytest.mark.parametrize('seed', range(3))
+def test_latest_indicators_match_full_frame(backend, n, seed):
+    df = generate_sample_data(n=n, seed=seed)
+    full = AIMnIndicators.calculate_all_indicators(df, PARAMS).iloc[-1]
+    latest = AIMnIndicators.calculate_latest_indicators(df, PARAMS)
+
+    for column in COLUMNS:
+        np.testing.assert_allclose(float(latest[column]), float(full[column]),
+                                   rtol=1e-12, atol=1e-12, equal_nan=True,
+                                   err_msg=column)
+
+
+@pytest.mark.parametrize('params', [{}, PARAMS, {'rsi_window': 10, 'atr_period': 30}])
+def test_required_lookback_fills_latest_bar(backend, params):
+    n = AIMnIndicators.required_lookback(params)
+    result = AIMnIndicators.calculate_all_indicators(generate_sample_data(n=n), params)
+
+    assert not result[COLUMNS].iloc[-1].isna().any()
+    assert not result[['macd', 'macd_signal']].iloc[-2].isna().any()
+
+
+@pytest.mark.parametrize('window', [1, 7, 100, 999, 2500])
+def test_rolling_extreme_matches_pandas(window):
+    values = generate_sample_data(n=1000)['high'].to_numpy(copy=True)
+    values[[5, 400, 401]] = np.nan
+    series = pd.Series(values)
+
+    np.testing.assert_array_equal(rolling_extreme(values, window, is_max=True),
+                                  series.rolling(window).max().to_numpy())
+    np.testing.assert_array_equal(rolling_extreme(values, window, is_max=False),
+                                  series.rolling(window).min().to_numpy())
+
+
+def test_rsi_real_backends_agree():
+    df = generate_sample_data(n=2000)
+    for window in (14, 500, 1500):
+        pd.testing.assert_series_equal(AIMnIndicators.calculate_rsi_real(df, window, backend='numpy'),
+                                       AIMnIndicators.calculate_rsi_real(df, window, backend='pandas'))
+
+
+def test_sweeps_match_single_parameter_runs(backend):
+    market_data = {f'SYM{i}': generate_sample_data(n=150 + 30 * i, seed=i) for i in range(3)}
+    arrays = AIMnBatchIndicators.stack_ohlcv(market_data)
+    windows = [5, 14, 30, 64, 100]
+    rsi = AIMnIndicators.sweep_rsi_real(arrays['high'], arrays['low'], arrays['close'], windows)
+    param_sets, macd = AIMnIndicators.sweep_macd(arrays['close'], [5, 12], [13, 26], [5, 9],
+                                                 starts=arrays['starts'])
+
+    assert rsi.shape == (len(windows), 3, arrays['close'].shape[1])
+    assert len(param_sets) == 8 and macd['macd'].shape[0] == 8
+    for row, df in enumerate(market_data.values()):
+        start = arrays['starts'][row]
+        for i, window in enumerate(windows):
+            np.testing.assert_array_equal(rsi[i, row, start:],
+                                          AIMnIndicators.calculate_rsi_real(df, window).to_numpy())
+        for i, (fast, slow, signal) in enumerate(param_sets):
+            expected = AIMnIndicators.calculate_macd(df, fast, slow, signal)
+            for key in ('macd', 'signal', 'histogram', 'bullish_cross', 'bearish_cross'):
+                np.testing.assert_array_equal(macd[key][i, row, start:],
+                                              expected[key].to_numpy(), err_msg=key)
+
+
+@pytest.mark.parametrize('n', [50, 1000])
+def test_rolling_mean_kernel_matches_pandas(n):
+    values = np.random.default_rng(n).standard_normal(n) * 1e6
+    values[[3, 17, 18]] = np.nan
+    values[20:40] = 5.0
+    series = pd.Series(values)
+
+    for window in (1, 20):
+        np.testing.assert_array_equal(rolling_mean(values, window),
+                                      series.rolling(window).mean().to_numpy())
+
+
+@pytest.mark.skipif(not indicators.TALIB_AVAILABLE, reason="TA-Lib not installed")
+@pytest.mark.parametrize('n', [30, 500])
+def test_wilder_kernels_match_talib(n):
+    df = generate_sample_data(n=n)
+    df.loc[df.index[10:13], 'close'] = df['close'].iloc[9]  # unchanged closes
+    high, low, close, volume = (df[c].to_numpy(dtype=float)
+                                for c in ('high', 'low', 'close', 'volume'))
+    talib = indicators.talib
+
+    # TA-Lib rounds its EMA step with a fused multiply-add: equal to the ulp
+    for fast, slow, signal in [(12, 26, 9), (5, 13, 5), (26, 12, 9)]:
+        for ours, expected in zip(macd_talib(close, fast, slow, signal),
+                                  talib.MACD(close, fastperiod=fast, slowperiod=slow,
+                                             signalperiod=signal)):
+            np.testing.assert_allclose(ours, expected, rtol=0, atol=1e-12, equal_nan=True)
+    for period in (1, 14):
+        np.testing.assert_allclose(atr_talib(high, low, close, period),
+                                   talib.ATR(high, low, close, timeperiod=period),
+                                   rtol=0, atol=1e-12, equal_nan=True)
+    np.testing.assert_array_equal(obv_talib(close, volume), talib.OBV(close, volume))
+
+
+def recursion_outputs(df):
+    high, low, close = (df[c].to_numpy(dtype=float) for c in ('high', 'low', 'close'))
+    return list(macd_talib(close, 12, 26, 9)) + [atr_talib(high, low, close, 14)]
+
+
+def test_recursion_kernel_matches_scalar_loops(monkeypatch):
+    df = generate_sample_data(n=5000)
+    kernel = recursion_outputs(df)
+    monkeypatch.setattr(indicators, 'RECURSION_KERNEL_MIN_BARS', len(df) + 1)
+    loops = recursion_outputs(df)
+
+    # Not bit-for-bit: within a few ulps of the values (of the price for MACD)
+    for ours, expected in zip(kernel, loops):
+        np.testing.assert_allclose(ours, expected, rtol=1e-12, atol=1e-12, equal_nan=True)
+    # A NaN in the recursion keeps the loops' propagation
+    df.loc[3000, 'close'] = np.nan
+    monkeypatch.setattr(indicators, 'RECURSION_KERNEL_MIN_BARS', 768)
+    macd = recursion_outputs(df)[0]
+    assert np.isnan(macd[3000:]).all() and not np.isnan(macd[2999])
+
+
+def test_array_api_fills_preallocated_buffers(backend):
+    df = generate_sample_data(n=200)
+    bars = np.zeros(len(df), dtype=[(c, 'f8') for c in ('high', 'low', 'close', 'volume')])
+    for column in bars.dtype.names:
+        bars[column] = df[column]
+    out = AIMnIndicators.allocate_outputs(len(df))
+    buffers = {column: id(buffer) for column, buffer in out.items()}
+
+    result = AIMnIndicators.calculate_all_arrays(bars, PARAMS, out=out)
+    expected = AIMnIndicators.calculate_all_indicators(df, PARAMS)
+
+    assert {column: id(buffer) for column, buffer in result.items()} == buffers
+    for column in INDICATOR_COLUMNS:
+        np.testing.assert_array_equal(result[column], expected[column].to_numpy(), err_msg=column)
@@ -0,0 +1,87 @@
+# test_parallel_scan.py
+"""
+Unit tests for the process-pool parallel scan
+"""
+import os
+import signal
+
+from indicator_cache import AIMnIndicatorCache
+from scanner import AIMnScanner
+from conftest import PARAMS, generate_sample_data
+
+KEYS = ('symbol', 'direction', 'score', 'entry_price', 'conditions')
+
+
+def summary(opportunity):
+    return {key: opportunity[key] for key in KEYS} if opportunity else None
+
+
+def test_parallel_scan_matches_serial():
+    market_data = {f'SYM{i}': generate_sample_data(n=150 + i, seed=i) for i in range(24)}
+    market_data['SHORT'] = generate_sample_data(n=20)
+    symbol_params = {'DEFAULT': dict(PARAMS, rsi_oversold=49, rsi_overbought=51, atr_threshold=0.0,
+                                    volume_confirmation=False)}
+
+    serial = AIMnScanner(symbol_params, cache=AIMnIndicatorCache())
+    parallel = AIMnScanner(symbol_params, cache=AIMnIndicatorCache(), workers=2,
+                           parallel_min_symbols=10)
+    try:
+        expected = summary(serial.scan_all_symbols(market_data))
+        assert expected is not None
+        for _ in range(2):  # the pool is reused
+            assert summary(parallel.scan_all_symbols(market_data)) == expected
+        assert parallel.parallel._pool is not None
+        summaries = [{symbol: (entry['status'], entry.get('missing_buy'), entry.get('missing_sell'))
+                      for symbol, entry in scanner.scan(market_data)['summary'].items()}
+                     for scanner in (parallel, serial)]
+        assert summaries[0] == summaries[1] and list(summaries[0]) == list(market_data)
+        # Small universes stay serial
+        small = {'SYM0': market_data['SYM0']}
+        assert summary(parallel.scan_all_symbols(small)) == summary(serial.scan_all_symbols(small))
+    finally:
+        parallel.close()
+
+
+def test_dead_worker_falls_back_to_serial_and_restarts_the_pool():
+    market_data = {f'SYM{i}': generate_sample_data(n=150, seed=i) for i in range(12)}
+    symbol_params = {'DEFAULT': dict(PARAMS, rsi_oversold=49, rsi_overbought=51, atr_threshold=0.0,
+                                    volume_confirmation=False)}
+    serial = AIMnScanner(symbol_params, cache=AIMnIndicatorCache())
+    parallel = AIMnScanner(symbol_params, cache=AIMnIndicatorCache(), workers=2,
+                           parallel_min_symbols=10)
+    try:
+        expected = summary(serial.scan_all_symbols(market_data))
+        assert summary(parallel.scan_all_symbols(market_data)) == expected
+        pool = parallel.parallel._pool
+        for process in list(pool._processes.values()):
+            os.kill(process.pid, signal.SIGTERM)
+            process.join()
+
+        # This cycle runs serially, the next one on a fresh pool
+        assert summary(parallel.scan_all_symbols(market_data)) == expected
+        assert parallel.parallel._pool is None
+        assert summary(parallel.scan_all_symbols(market_data)) == expected
+        assert parallel.parallel._pool not in (None, pool)
+    finally:
+        parallel.close()
+
+
+def test_parallel_scan_applies_the_prefilter():
+    market_data = {f'SYM{i}': generate_sample_data(n=200, seed=i) for i in range(24)}
+    symbol_params = {'DEFAULT': dict(PARAMS, rsi_oversold=49, rsi_overbought=51, volume_threshold=1.0,
+                                    atr_threshold=0.9, volume_confirmation=True)}
+    serial = AIMnScanner(symbol_params, cache=AIMnIndicatorCache(), prefilter=True)
+    parallel = AIMnScanner(symbol_params, cache=AIMnIndicatorCache(), prefilter=True, workers=2,
+                           parallel_min_symbols=10)
+    try:
+        results = [scanner.scan(market_data, k=5) for scanner in (parallel, serial)]
+        assert [summary(o) for o in results[0]['candidates']] == \
+            [summary(o) for o in results[1]['candidates']]
+        entries = [{symbol: (entry['status'], entry.get('prefiltered', False),
+                             entry.get('missing_buy'), entry.get('missing_sell'))
+                    for symbol, entry in result['summary'].items()} for result in results]
+        assert entries[0] == entries[1]
+        counts = parallel.prefilter.stats()
+        assert counts == serial.prefilter.stats() and counts['survivors'] < counts['screened']
+    finally:
+        parallel.close()
@@ -0,0 +1,83 @@
+# test_scan_cadence.py
+"""
+Unit tests for the adaptive scan cadence
+"""
+import pytest
+
+from scan_cadence import AIMnScanCadence
+from scanner import AIMnScanner
+from indicator_cache import AIMnIndicatorCache
+from conftest import PARAMS, generate_sample_data
+
+
+def entry(rsi, atr_ratio=1.0):
+    return {'status': 'ready', 'rsi': rsi, 'atr_ratio': atr_ratio}
+
+
+def test_near_trigger_and_volatile_symbols_are_scanned_more_often():
+    now = [0.0]
+    cadence = AIMnScanCadence(min_interval=60, max_interval=600, requests_per_minute=100,
+                              slack=0, clock=lambda: now[0])
+    scanner = AIMnScanner({'DEFAULT': PARAMS})
+    symbols = ['QUIET', 'NEAR', 'WILD']
+    assert cadence.select(symbols) == symbols
+
+    cadence.observe({'QUIET': entry(50.0), 'NEAR': entry(32.0), 'WILD': entry(50.0, 1.4)},
+                    scanner.get_symbol_params)
+    assert cadence.urgency['WILD'] == 1.0 and cadence.urgency['QUIET'] == 0.0
+    assert cadence.next_due['NEAR'] < cadence.next_due['QUIET'] == 600
+    assert cadence.next_due['WILD'] == 60
+
+    now[0] = 60.0
+    assert cadence.select(symbols) == ['WILD']
+    now[0] = 600.0
+    assert cadence.select(symbols, required=['QUIET']) == symbols
+
+
+def test_budget_limits_requests_most_urgent_first():
+    cadence = AIMnScanCadence(requests_per_minute=2, clock=lambda: 0.0)
+    scanner = AIMnScanner({'DEFAULT': PARAMS})
+    cadence.observe({'A': entry(50.0), 'B': entry(30.0), 'C': entry(40.0)}, scanner.get_symbol_params)
+    cadence.next_due = dict.fromkeys('ABC', 0.0)
+    assert cadence.select(['A', 'B', 'C'], now=0.0) == ['B', 'C']
+    assert cadence.select(['A'], required=['A'], now=0.0) == ['A']
+    assert cadence.select(['A', 'B', 'C'], now=30.0) == []
+
+
+def test_scanner_scan_reschedules_scanned_symbols():
+    cadence = AIMnScanCadence(clock=lambda: 0.0)
+    scanner = AIMnScanner({'DEFAULT': PARAMS}, cache=AIMnIndicatorCache(), cadence=cadence)
+    scanner.scan({'SYM': generate_sample_data(n=300, seed=1)})
+    assert 'SYM' in cadence.next_due
+    assert scanner.due_symbols(['SYM', 'NEW'], required=()) == ['NEW']
+
+
+def test_observe_reschedules_without_scanning():
+    cadence = AIMnScanCadence(clock=lambda: 0.0)
+    scanner = AIMnScanner({'DEFAULT': PARAMS}, cache=AIMnIndicatorCache(), cadence=cadence)
+    market_data = {'SYM': generate_sample_data(n=300, seed=1), 'SHORT': generate_sample_data(n=20)}
+    scanner.observe(market_data)
+
+    scanned = AIMnScanCadence(clock=lambda: 0.0)
+    AIMnScanner({'DEFAULT': PARAMS}, cache=AIMnIndicatorCache(), cadence=scanned).scan(market_data)
+    assert cadence.urgency == scanned.urgency
+    assert cadence.next_due == scanned.next_due
+    assert scanner.conditions is None
+
+
+@pytest.mark.parametrize('batch', [False, True])
+def test_prefiltered_symbols_keep_their_urgency(batch):
+    market_data = {f'SYM{i}': generate_sample_data(n=200, seed=i) for i in range(40)}
+    symbol_params = {'DEFAULT': dict(PARAMS, volume_threshold=1.0, atr_threshold=1.1,
+                                     volume_confirmation=True, atr_filter=True)}
+    plain = AIMnScanCadence(clock=lambda: 0.0)
+    AIMnScanner(symbol_params, cache=AIMnIndicatorCache(), cadence=plain).scan(market_data, batch=batch)
+    screened = AIMnScanCadence(clock=lambda: 0.0)
+    scanner = AIMnScanner(symbol_params, cache=AIMnIndicatorCache(), prefilter=True, cadence=screened)
+    scanner.scan(market_data, batch=batch)
+
+    # Symbols rejected on volume or RSI still have their ATR ratio scored
+    counts = scanner.prefilter.stats()
+    assert counts['volume'] < counts['screened'] and counts['rsi'] < counts['volume']
+    assert screened.urgency == plain.urgency
+    assert screened.next_due == plain.next_due
@@ -0,0 +1,186 @@
+# test_scanner.py
+"""
+Unit tests for AIMnScanner ranking, scoring, pre-filtering, scan snapshots and condition masks
+"""
+import pytest
+
+from batch_indicators import AIMnBatchIndicators
+from condition_bits import decode, gate_bits
+from indicators import AIMnIndicators
+from indicator_cache import AIMnIndicatorCache
+from scan_snapshot import load_snapshot, publish_snapshot
+from scanner import AIMnScanner
+from conftest import PARAMS, generate_sample_data
+
+SYMBOL_PARAMS = {'DEFAULT': dict(PARAMS, rsi_oversold=49, rsi_overbought=51, atr_threshold=0.0,
+                                 volume_confirmation=False)}
+
+
+def test_top_opportunities_are_ranked_and_bounded():
+    market_data = {f'SYM{i}': generate_sample_data(n=200, seed=i) for i in range(30)}
+    scanner = AIMnScanner(SYMBOL_PARAMS, cache=AIMnIndicatorCache())
+
+    everything = scanner.collect_opportunities(market_data)
+    top = scanner.scan_top_opportunities(market_data, k=3)
+
+    assert len(everything) > 3 and len(top) == 3
+    assert [o['score'] for o in top] == sorted((o['score'] for o in everything), reverse=True)[:3]
+    assert all('conditions' in o for o in top)
+    assert top[0]['symbol'] == scanner.scan_all_symbols(market_data)['symbol']
+
+
+def test_score_arrays_match_scalar_scoring():
+    scanner = AIMnScanner(SYMBOL_PARAMS, cache=AIMnIndicatorCache())
+    market_data = {f'SYM{i}': generate_sample_data(n=200, seed=i) for i in range(40)}
+    # Every column: the scoring parameters below switch filters on and off
+    latest_rows = AIMnBatchIndicators.latest_rows(market_data, scanner.get_symbol_params, tail=True)
+    params_list = [dict(PARAMS, rsi_oversold=30 + i % 20, rsi_overbought=70 - i % 20,
+                        volume_threshold=0.5 + i % 3 * 0.5, atr_threshold=0.5 + i % 4 * 0.25,
+                        volume_confirmation=i % 5 != 0, atr_filter=i % 7 != 0)
+                   for i in range(len(latest_rows))]
+
+    rows = list(latest_rows.values())
+    buy, sell = AIMnScanner.score_arrays(AIMnScanner.stack_latest(rows),
+                                         AIMnScanner.parameter_matrix(params_list))
+    for i, (latest, params) in enumerate(zip(rows, params_list)):
+        assert buy[i] == scanner.score_latest(latest, params, 'BUY')
+        assert sell[i] == scanner.score_latest(latest, params, 'SELL')
+
+
+@pytest.mark.parametrize('volume_confirmation', [True, False])
+def test_prefilter_keeps_every_opportunity(volume_confirmation):
+    market_data = {f'SYM{i}': generate_sample_data(n=200, seed=i) for i in range(40)}
+    symbol_params = {'DEFAULT': dict(SYMBOL_PARAMS['DEFAULT'], volume_threshold=1.0, atr_threshold=0.9,
+                                     volume_confirmation=volume_confirmation)}
+    plain = AIMnScanner(symbol_params, cache=AIMnIndicatorCache())
+    screened = AIMnScanner(symbol_params, cache=AIMnIndicatorCache(), prefilter=True)
+
+    expected = plain.collect_opportunities(market_data)
+    actual = screened.collect_opportunities(market_data)
+    assert [(o['symbol'], o['direction'], o['score']) for o in actual] == \
+        [(o['symbol'], o['direction'], o['score']) for o in expected]
+
+    counts = screened.prefilter.stats()
+    assert counts['screened'] == len(market_data)
+    assert counts['screened'] >= counts['volume'] >= counts['rsi'] >= counts['atr'] == counts['survivors']
+    assert counts['survivors'] < counts['screened']
+    assert counts['survivors'] >= len(expected)
+
+
+@pytest.mark.parametrize('batch', [False, True])
+def test_scan_applies_the_prefilter(batch):
+    market_data = {f'SYM{i}': generate_sample_data(n=200, seed=i) for i in range(40)}
+    symbol_params = {'DEFAULT': dict(SYMBOL_PARAMS['DEFAULT'], volume_threshold=1.0, atr_threshold=0.9,
+                                     volume_confirmation=True)}
+    plain = AIMnScanner(symbol_params, cache=AIMnIndicatorCache())
+    screened = AIMnScanner(symbol_params, cache=AIMnIndicatorCache(), prefilter=True)
+
+    expected = plain.scan(market_data, k=5, batch=batch)
+    result = screened.scan(market_data, k=5, batch=batch)
+
+    counts = screened.prefilter.stats()
+    rejected = [symbol for symbol, entry in result['summary'].items() if entry.get('prefiltered')]
+    assert counts['screened'] == len(market_data)
+    assert 0 < len(rejected) == counts['screened'] - counts['survivors']
+    assert [(o['symbol'], o['score']) for o in result['candidates']] == \
+        [(o['symbol'], o['score']) for o in expected['candidates']]
+    for symbol in rejected:
+        entry, full = result['summary'][symbol], expected['summary'][symbol]
+        assert not entry['buy_ready'] and not entry['sell_ready']
+        assert (entry['rsi'], entry['volume_ratio'], entry['atr_ratio']) == \
+            (full['rsi'], full['volume_ratio'], full['atr_ratio'])
+        for side in ('buy', 'sell'):
+            # Gates the prefilter never evaluated (MACD at least) are not reported missing
+            assert 'MACD' not in entry[f'missing_{side}']
+            assert entry[f'missing_{side}'] == [label for label in full[f'missing_{side}']
+                                                if gate_bits(side, [label]) & entry['evaluated']]
+    for symbol, entry in result['summary'].items():
+        if symbol not in rejected:
+            assert entry == expected['summary'][symbol]
+
+
+@pytest.mark.parametrize('batch', [False, True])
+def test_single_pass_scan_yields_best_and_summary(tmp_path, batch):
+    market_data = {f'SYM{i}': generate_sample_data(n=200, seed=i) for i in range(20)}
+    market_data['SHORT'] = generate_sample_data(n=20)
+    scanner = AIMnScanner(SYMBOL_PARAMS, cache=AIMnIndicatorCache(), prefilter=True)
+
+    result = scanner.scan(market_data, k=3, batch=batch)
+
+    assert result['best']['symbol'] == scanner.scan_all_symbols(market_data)['symbol']
+    assert list(result['summary']) == list(market_data)
+    assert result['summary']['SHORT'] == {'status': 'insufficient_data'}
+    for symbol, entry in result['summary'].items():
+        if symbol != 'SHORT':
+            params = scanner.get_symbol_params(symbol)
+            conditions = AIMnIndicators.check_entry_conditions(
+                scanner.latest_indicators(symbol, market_data[symbol], params), params)
+            assert entry['buy_ready'] == conditions['buy']
+            if not entry.get('prefiltered'):
+                assert ('MACD' in entry['missing_sell']) == (not conditions['macd_sell'])
+
+    path = str(tmp_path / 'snapshot.json')
+    publish_snapshot(result, path)
+    snapshot = load_snapshot(path)
+    assert snapshot['best']['symbol'] == result['best']['symbol']
+    assert snapshot['summary']['SYM0']['missing_buy'] == result['summary']['SYM0']['missing_buy']
+
+
+def test_condition_masks_match_the_conditions_dict():
+    market_data = {f'SYM{i}': generate_sample_data(n=300, seed=i) for i in range(6)}
+    scanner = AIMnScanner({'DEFAULT': PARAMS}, cache=AIMnIndicatorCache())
+    result = scanner.scan(market_data)
+    scanner.scan(market_data)
+
+    table = scanner.conditions
+    assert table.symbols == tuple(market_data)
+    for symbol, df in market_data.items():
+        latest = scanner.latest_indicators(symbol, df, scanner.get_symbol_params(symbol))
+        conditions = AIMnIndicators.check_entry_conditions(latest, scanner.get_symbol_params(symbol))
+        assert decode(table.mask(symbol)) == conditions
+        only_macd = result['summary'][symbol]['missing_buy'] == ['MACD']
+        assert (symbol in table.missing_exactly('buy', ['MACD'])) == only_macd
+    assert len(scanner.condition_history.series('SYM0')) == 2
+    assert scanner.condition_history.memory() == 2 * len(market_data)
+
+
+def test_condition_masks_leave_out_unevaluated_gates():
+    market_data = {f'SYM{i}': generate_sample_data(n=200, seed=i) for i in range(40)}
+    symbol_params = {'DEFAULT': dict(SYMBOL_PARAMS['DEFAULT'], volume_threshold=1.0, atr_threshold=0.9,
+                                     volume_confirmation=True)}
+    scanner = AIMnScanner(symbol_params, cache=AIMnIndicatorCache(), prefilter=True)
+    summary = scanner.scan(market_data)['summary']
+
+    table = scanner.conditions
+    rejected = [symbol for symbol, entry in summary.items() if entry.get('prefiltered')]
+    assert rejected and table.evaluated is not None
+    for side in ('buy', 'sell'):
+        assert not set(rejected).intersection(table.missing_exactly(side, ['MACD']))
+        failures = table.failure_counts(side)
+        for label, count in failures.items():
+            assert count == sum(label in entry[f'missing_{side}'] for entry in summary.values()
+                                if not entry[f'{side}_ready'])
+    symbol = rejected[0]
+    _, mask, evaluated = scanner.condition_history.series(symbol)[-1]
+    assert evaluated == summary[symbol]['evaluated'] and not evaluated & gate_bits('buy', ['MACD'])
+
+
+@pytest.mark.parametrize('prefilter', [False, True])
+def test_batch_scan_isolates_a_malformed_frame(prefilter):
+    market_data = {f'SYM{i}': generate_sample_data(n=200, seed=i) for i in range(10)}
+    broken = market_data['SYM3'].copy()
+    broken['close'] = broken['close'].astype(object)
+    broken.loc[broken.index[100], 'close'] = 'n/a'  # breaks its whole parameter group
+    market_data['SYM3'] = broken
+    healthy = {symbol: df for symbol, df in market_data.items() if symbol != 'SYM3'}
+
+    scanner = AIMnScanner(SYMBOL_PARAMS, cache=AIMnIndicatorCache(), prefilter=prefilter)
+    summary = {}
+    actual = scanner.collect_opportunities(market_data, batch=True, summary=summary)
+    expected = AIMnScanner(SYMBOL_PARAMS, cache=AIMnIndicatorCache(),
+                           prefilter=prefilter).collect_opportunities(healthy, batch=True)
+
+    assert summary['SYM3']['status'] == 'error'
+    assert [(o['symbol'], o['direction'], o['score']) for o in actual] == \
+        [(o['symbol'], o['direction'], o['score']) for o in expected]
+    assert all(summary[symbol]['status'] == 'ready' for symbol in healthy)
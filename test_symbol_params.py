@@ -0,0 +1,69 @@
+# test_symbol_params.py
+"""
+Unit tests for resolved symbol parameters
+"""
+import pickle
+import warnings
+
+import pytest
+
+from scanner import AIMnScanner
+from symbol_params import AIMnSymbolParams
+
+
+def test_resolve_fills_defaults_and_keeps_mapping_view():
+    with pytest.warns(UserWarning, match="'rsi_period'"):
+        params = AIMnSymbolParams.resolve({'rsi_window': 50, 'volume_threshold': 2, 'rsi_period': 14})
+
+    assert params.rsi_window == 50 and params.macd_slow == 26
+    assert params.volume_threshold == 2.0 and isinstance(params.volume_threshold, float)
+    assert params['rsi_period'] == 14 and params.get('missing', 'x') == 'x'
+    assert dict(params)['atr_filter'] is True
+    assert AIMnSymbolParams.resolve(params) is params
+    assert pickle.loads(pickle.dumps(params)) == params
+    assert params.replace(rsi_window=20).rsi_window == 20
+
+
+def test_invalid_or_mutated_params_are_rejected():
+    for bad in ({'rsi_window': 0}, {'macd_fast': 2.5}, {'rsi_oversold': 'low'},
+                {'stop_loss_percent': 150}, {'rsi_oversold': 0}, {'rsi_overbought': 100},
+                {'rsi_oversold': 60, 'rsi_overbought': 40}, {'macd_fast': 26, 'macd_slow': 12}):
+        with pytest.raises(ValueError):
+            AIMnSymbolParams.resolve(bad)
+
+    params = AIMnSymbolParams()
+    with pytest.raises(AttributeError):
+        params.rsi_window = 10
+    with pytest.raises(ValueError, match='BTCUSD'):
+        AIMnScanner({'BTCUSD': {'atr_period': -1}})
+
+
+def test_scanner_resolves_each_symbol_once():
+    scanner = AIMnScanner({'DEFAULT': {'rsi_window': 60}, 'BTCUSD': {'rsi_window': 80}})
+
+    assert scanner.get_symbol_params('BTC/USD').rsi_window == 80
+    assert scanner.get_symbol_params('BTC/USD') is scanner.get_symbol_params('BTCUSD')
+    assert scanner.get_symbol_params('ETH/USD') is scanner.default_params
+    assert scanner.default_params.rsi_window == 60
+
+
+def test_shipped_config_uses_only_known_fields():
+    from aimn_crypto_config import SYMBOL_PARAMS
+
+    with warnings.catch_warnings():
+        warnings.simplefilter('error')
+        scanner = AIMnScanner(SYMBOL_PARAMS)
+    assert scanner.get_symbol_params('ETH/USD').stop_loss_percent == SYMBOL_PARAMS['ETH/USD']['stop_loss_percent']
+
+
+def test_defaults_fill_only_missing_keys():
+    defaults = {'volume_confirmation': False}
+    assert AIMnSymbolParams.resolve({}, defaults).volume_confirmation is False
+    assert AIMnSymbolParams.resolve({'volume_confirmation': True}, defaults).volume_confirmation is True
+
+    config = {'DEFAULT': {'rsi_window': 60}, 'BTCUSD': {'volume_confirmation': True}}
+    scanner = AIMnScanner(config, param_defaults=defaults)
+    assert scanner.get_symbol_params('ETH/USD').volume_confirmation is False
+    assert scanner.get_symbol_params('BTC/USD').volume_confirmation is True
+    assert config == {'DEFAULT': {'rsi_window': 60}, 'BTCUSD': {'volume_confirmation': True}}
+    assert AIMnScanner({}, param_defaults=defaults).default_params.volume_confirmation is False
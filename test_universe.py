@@ -0,0 +1,57 @@
+# test_universe.py
+"""
+Unit tests for tiered universe scanning
+"""
+import logging
+
+from universe import AIMnUniverseScanner
+from conftest import PARAMS, generate_sample_data
+
+PARAMS_ALL = dict(PARAMS, rsi_oversold=49, rsi_overbought=51, atr_threshold=0.0,
+                  volume_confirmation=False)
+
+
+def test_coarse_scan_builds_watchlist(caplog):
+    universe = {f'SYM{i}': generate_sample_data(n=200, seed=i) for i in range(30)}
+    universe['THIN'] = generate_sample_data(n=200, seed=99).assign(volume=0.0)
+    fetches = []
+
+    def fetch_bars(symbol, timeframe, limit):
+        fetches.append(symbol)
+        return universe[symbol].iloc[-limit:]
+
+    tier = AIMnUniverseScanner(lambda: list(universe), fetch_bars, lambda s: PARAMS_ALL,
+                               interval=900, size=5, pinned=['SYM0'], min_dollar_volume=1.0)
+    with caplog.at_level(logging.INFO, logger='universe'):
+        watchlist = tier.refresh(now=0)
+
+    assert watchlist[0] == 'SYM0' and len(watchlist) == 6
+    assert 'THIN' not in tier.scores
+    ranked = [s for s in tier.scores if s != 'SYM0'][:5]
+    assert watchlist[1:] == ranked
+    assert list(tier.scores.values()) == sorted(tier.scores.values(), reverse=True)
+    assert any('Watchlist +' in message for message in caplog.messages)
+
+    # Not due yet: no refetch
+    fetches.clear()
+    assert tier.refresh(now=600) == watchlist and not fetches
+    tier.refresh(now=900)
+    assert len(fetches) == len(universe)
+
+
+def test_coarse_scan_uses_batched_fetch():
+    universe = {f'SYM{i}': generate_sample_data(n=200, seed=i) for i in range(8)}
+    calls = []
+
+    def fetch_many(symbols, timeframe, limits):
+        calls.append(symbols)
+        return {symbol: universe[symbol].iloc[-limits[symbol]:] for symbol in symbols}
+
+    def fetch_bars(symbol, timeframe, limit):
+        return universe[symbol].iloc[-limit:]
+
+    batched = AIMnUniverseScanner(lambda: list(universe), None, lambda s: PARAMS_ALL,
+                                  size=3, fetch_many=fetch_many)
+    serial = AIMnUniverseScanner(lambda: list(universe), fetch_bars, lambda s: PARAMS_ALL, size=3)
+    assert batched.refresh(now=0) == serial.refresh(now=0)
+    assert calls == [list(universe)]
@@ -0,0 +1,168 @@
+# universe.py
+'''
+AIMn Trading System - Tiered Universe Scanning
+Narrows the full asset universe to a watchlist for the fast scanner
+
+Coarse tier: every `interval` seconds, fetch coarse (hourly or daily) bars
+for every tradable asset, drop illiquid ones and rank the rest by the
+scanner's own BUY/SELL score on those bars (AIMnScanner.score_arrays).
+The best `size` symbols, plus pinned symbols, form the watchlist.
+
+Fast tier: the engine's 30 second AIMnScanner cycle runs on the watchlist
+only, so per-cycle cost depends on the watchlist size, not the universe.
+The coarse tier keeps its own bars and indicator cache.
+'''
+
+import logging
+import time
+from typing import Callable, Dict, Iterable, List, Optional
+
+import numpy as np
+import pandas as pd
+
+from batch_indicators import AIMnBatchIndicators
+from indicators import AIMnIndicators
+from indicator_cache import AIMnIndicatorCache
+from scanner import AIMnScanner
+
+logger = logging.getLogger(__name__)
+
+
+class AIMnUniverseScanner:
+    '''Coarse tier: periodically rebuilds the watchlist from the full universe'''
+
+    def __init__(self, list_symbols: Callable[[], List[str]],
+                 fetch_bars: Callable[[str, str, int], pd.DataFrame],
+                 get_params: Callable[[str], Dict],
+                 interval: float = 900,
+                 timeframe: str = '1Hour',
+                 size: int = 20,
+                 pinned: Iterable[str] = (),
+                 min_dollar_volume: float = 0.0,
+                 cache_mb: float = 16,
+                 fetch_many: Optional[Callable[[List[str], str, Dict[str, int]],
+                                               Dict[str, pd.DataFrame]]] = None):
+        '''
+        Args:
+            list_symbols: Returns every tradable symbol in the universe
+            fetch_bars: fetch_bars(symbol, timeframe, limit) -> OHLCV DataFrame
+            get_params: Symbol parameters (the fast scanner's get_symbol_params)
+            interval: Seconds between coarse scans
+            timeframe: Coarse bar timeframe ('1Hour' or '1Day')
+            size: Ranked symbols kept on the watchlist
+            pinned: Symbols always on the watchlist (e.g. the configured SYMBOLS)
+            min_dollar_volume: Minimum average close * volume over the coarse bars
+            cache_mb: Memory cap of the coarse tier's indicator cache
+            fetch_many: Optional batched fetch,
+                fetch_many(symbols, timeframe, limits) -> {symbol: DataFrame};
+                used instead of one fetch_bars call per symbol
+        '''
+        self.list_symbols = list_symbols
+        self.fetch_bars = fetch_bars
+        self.get_params = get_params
+        self.interval = interval
+        self.timeframe = timeframe
+        self.size = size
+        self.pinned = list(pinned)
+        self.min_dollar_volume = min_dollar_volume
+        self.cache = AIMnIndicatorCache(max_mb=cache_mb)
+        self.fetch_many = fetch_many
+        self.bars: Dict[str, pd.DataFrame] = {}
+        self.scores: Dict[str, float] = {}
+        self.watchlist: List[str] = list(self.pinned)
+        self.last_refresh: Optional[float] = None
+
+    def due(self, now: Optional[float] = None) -> bool:
+        '''True if the coarse scan has not run for `interval` seconds'''
+        now = time.time() if now is None else now
+        return self.last_refresh is None or now - self.last_refresh >= self.interval
+
+    def refresh(self, now: Optional[float] = None, force: bool = False) -> List[str]:
+        '''
+        Rerun the coarse scan if it is due and return the watchlist
+
+        Membership changes are logged; a failed coarse scan keeps the
+        previous watchlist.
+        '''
+        if not (force or self.due(now)):
+            return self.watchlist
+        self.last_refresh = time.time() if now is None else now
+
+        try:
+            symbols = self.list_symbols()
+        except Exception as e:
+            logger.error(f"Coarse scan: failed to list the universe: {e}")
+            return self.watchlist
+
+        self.bars = {}
+        limits = {symbol: AIMnIndicators.required_lookback(self.get_params(symbol)) for symbol in symbols}
+        if self.fetch_many is not None:
+            try:
+                fetched = self.fetch_many(list(symbols), self.timeframe, limits)
+            except Exception as e:
+                logger.error(f"Coarse scan: batched {self.timeframe} bar request failed: {e}")
+                fetched = {}
+            self.bars = {symbol: df for symbol, df in fetched.items()
+                         if symbol in limits and len(df) >= limits[symbol]}
+        else:
+            for symbol in symbols:
+                try:
+                    df = self.fetch_bars(symbol, self.timeframe, limits[symbol])
+                    if df is not None and len(df) >= limits[symbol]:
+                        self.bars[symbol] = df
+                except Exception as e:
+                    logger.debug(f"Coarse scan: no {self.timeframe} bars for {symbol}: {e}")
+
+        self.scores = self.rank(self.bars)
+        ranked = [symbol for symbol in self.scores if symbol not in self.pinned][:self.size]
+        self.update_watchlist(self.pinned + ranked)
+        return self.watchlist
+
+    def rank(self, market_data: Dict[str, pd.DataFrame]) -> Dict[str, float]:
+        '''
+        Coarse score (best of BUY and SELL) of each liquid symbol, best first
+        '''
+        liquid = {}
+        for symbol, df in market_data.items():
+            tail = df.iloc[-20:]
+            dollar_volume = float((tail['close'] * tail['volume']).mean())
+            if dollar_volume >= self.min_dollar_volume:
+                liquid[symbol] = df
+        if not liquid:
+            return {}
+
+        latest_rows = {}
+        missing = {}
+        for symbol, df in liquid.items():
+            key = AIMnIndicatorCache.make_key(symbol, df, self.get_params(symbol),
+                                              ('coarse', self.timeframe))
+            cached = self.cache.get(key)
+            if cached is None:
+                missing[symbol] = key
+            else:
+                latest_rows[symbol] = cached
+        if missing:
+            computed = AIMnBatchIndicators.latest_rows(
+                {symbol: liquid[symbol] for symbol in missing}, self.get_params)
+            for symbol, latest in computed.items():
+                latest_rows[symbol] = self.cache.put(missing[symbol], latest)
+
+        symbols = list(latest_rows)
+        buy, sell = AIMnScanner.score_arrays(
+            AIMnScanner.stack_latest([latest_rows[symbol] for symbol in symbols]),
+            AIMnScanner.parameter_matrix([self.get_params(symbol) for symbol in symbols]))
+        scores = np.fmax(buy, sell)
+        order = np.argsort(-np.nan_to_num(scores, nan=-np.inf), kind='stable')
+        return {symbols[i]: float(scores[i]) for i in order}
+
+    def update_watchlist(self, symbols: List[str]):
+        '''Replace the watchlist, logging who joined and who left'''
+        symbols = list(dict.fromkeys(symbols))
+        added = [symbol for symbol in symbols if symbol not in self.watchlist]
+        removed = [symbol for symbol in self.watchlist if symbol not in symbols]
+        if added:
+            logger.info(f"Watchlist + {', '.join(added)}")
+        if removed:
+            logger.info(f"Watchlist - {', '.join(removed)}")
+        logger.info(f"Watchlist: {len(symbols)} of {len(self.bars)} coarse-scanned symbols")
+        self.watchlist = symbols